@@ -6,16 +6,17 @@ Django Admin configuration for LinkCrush
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from django.db.models import Sum, Avg
 from django.utils import timezone
-from datetime import timedelta
 
 from django.contrib.auth.models import User, Group
 from django.contrib.auth.admin import UserAdmin as DefaultUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django.core.exceptions import PermissionDenied
 from django import forms
+from django.db import transaction
+from django.http import StreamingHttpResponse
 
+from . import export, moderators, owners, summary
 from .models import URLModel
 
 # Safe unregister (avoid AlreadyRegistered errors)
@@ -107,7 +108,7 @@ class CustomUserAdmin(DefaultUserAdmin):
         return request.user.is_superuser
 
     def save_model(self, request, obj, form, change):
-        """Server-side validation and group management"""
+        """Server-side validation (Moderators membership is synced in save_related)"""
         creating = not change
 
         if getattr(obj, "is_staff", False) and getattr(obj, "is_superuser", False):
@@ -118,16 +119,10 @@ class CustomUserAdmin(DefaultUserAdmin):
 
         super().save_model(request, obj, form, change)
 
-        # Manage Moderators group
-        try:
-            moderators_group, _ = Group.objects.get_or_create(name="Moderators")
-            if obj.is_staff and not obj.is_superuser:
-                if not obj.groups.filter(name="Moderators").exists():
-                    obj.groups.add(moderators_group)
-            elif not obj.is_staff and obj.groups.filter(name="Moderators").exists():
-                obj.groups.remove(moderators_group)
-        except Exception:
-            pass
+    def save_related(self, request, form, formsets, change):
+        # Saving the form's groups replaces the memberships, so reconcile afterwards
+        super().save_related(request, form, formsets, change)
+        moderators.sync_user(form.instance)
 
 # URL Model Admin with all the enhancements
 class CustomClickCountFilter(admin.SimpleListFilter):
@@ -164,7 +159,7 @@ class URLModelAdmin(admin.ModelAdmin):
         'created_at_display', 'days_active', 'action_buttons'
     ]
 
-    list_filter = ['created_at', CustomClickCountFilter]
+    list_filter = ['created_at', CustomClickCountFilter, 'track_clicks', 'redirect_status']
     search_fields = ['short_code', 'original_url']
     ordering = ['-created_at']
     list_per_page = 25
@@ -176,6 +171,7 @@ class URLModelAdmin(admin.ModelAdmin):
 
     fields = [
         'original_url', 'short_code', 'full_short_url', 'url_preview',
+        'redirect_status', 'track_clicks', 'cache_max_age', 'expires_at', 'max_clicks',
         'click_count', 'click_analytics', 'created_at', 'updated_at',
     ]
 
@@ -300,35 +296,41 @@ class URLModelAdmin(admin.ModelAdmin):
         )
     click_analytics.short_description = 'Analytics'
 
-    actions = ['reset_click_counts', 'export_selected_urls']
+    actions = ['reset_click_counts', 'export_selected_urls', 'export_selected_urls_ndjson']
 
     def reset_click_counts(self, request, queryset):
-        updated = queryset.update(click_count=0)
+        # Queryset updates bypass the signals that keep OwnerStats in step
+        owner_ids = set(queryset.filter(owner__isnull=False).values_list('owner_id', flat=True).distinct())
+        with transaction.atomic():
+            updated = queryset.update(click_count=0)
+            owners.recount(owner_ids)
+        summary.invalidate()
         self.message_user(request, f'Reset click counts for {updated} URL(s).')
     reset_click_counts.short_description = "Reset click counts"
 
-    def export_selected_urls(self, request, queryset):
-        count = queryset.count()
-        self.message_user(request, f'Would export {count} URL(s) to CSV (feature coming soon!)')
-    export_selected_urls.short_description = "Export selected URLs"
+    def _export(self, queryset, request, fmt):
+        """Stream the selection; gzip on the wire when the browser accepts it"""
+        content_type, extension = export.FORMATS[fmt]
+        gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        response = StreamingHttpResponse(export.export_chunks(queryset, fmt, gzip=gzip), content_type=content_type)
+        if gzip:
+            response['Content-Encoding'] = 'gzip'
+        filename = f"linkcrush-urls-{timezone.now():%Y%m%d-%H%M%S}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
 
-    def changelist_view(self, request, extra_context=None):
-        total_urls = URLModel.objects.count()
-        total_clicks = URLModel.objects.aggregate(Sum('click_count'))['click_count__sum'] or 0
-        avg_clicks = URLModel.objects.aggregate(Avg('click_count'))['click_count__avg'] or 0
-        top_url = URLModel.objects.order_by('-click_count').first()
+    def export_selected_urls(self, request, queryset):
+        return self._export(queryset, request, 'csv')
+    export_selected_urls.short_description = "Export selected URLs (CSV)"
 
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_urls = URLModel.objects.filter(created_at__gte=week_ago).count()
+    def export_selected_urls_ndjson(self, request, queryset):
+        return self._export(queryset, request, 'ndjson')
+    export_selected_urls_ndjson.short_description = "Export selected URLs (NDJSON)"
 
+    def changelist_view(self, request, extra_context=None):
+        # Precomputed summary (see summary.py) instead of full-table aggregates per page load
         extra_context = extra_context or {}
-        extra_context['summary_stats'] = {
-            'total_urls': total_urls,
-            'total_clicks': total_clicks,
-            'avg_clicks': round(avg_clicks, 1),
-            'top_url': top_url,
-            'recent_urls': recent_urls,
-        }
+        extra_context['summary_stats'] = summary.get_summary()
         return super().changelist_view(request, extra_context=extra_context)
 
 # Admin customization
@@ -0,0 +1,204 @@
+# backend/urls/analytics.py
+"""
+Click analytics pipeline.
+
+Redirects enqueue a lightweight event (timestamp, short code, referrer, user agent)
+on a bounded deque. A background aggregator drains it, derives the referrer host
+and user agent family, and upserts per-minute/hour/day rollups plus daily
+referrer/UA breakdowns. Timeseries reads only ever touch the rollup tables.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .buffering import BackgroundFlusher
+from .models import ClickBreakdown, ClickRollup, URLModel
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = {
+    ClickRollup.MINUTE: 60,
+    ClickRollup.HOUR: 3600,
+    ClickRollup.DAY: 86400,
+}
+
+# First match wins, so more specific tokens come first (Edge and Opera also say "Chrome/")
+UA_FAMILIES = (
+    ('bot', 'Bot'),
+    ('spider', 'Bot'),
+    ('crawl', 'Bot'),
+    ('edg/', 'Edge'),
+    ('opr/', 'Opera'),
+    ('chrome/', 'Chrome'),
+    ('crios/', 'Chrome'),
+    ('firefox/', 'Firefox'),
+    ('fxios/', 'Firefox'),
+    ('safari/', 'Safari'),
+    ('curl/', 'curl'),
+    ('python', 'Python'),
+)
+
+# Rows per INSERT ... ON CONFLICT statement
+UPSERT_BATCH_SIZE = 500
+
+
+def ua_family(user_agent):
+    if not user_agent:
+        return ''
+    ua = user_agent.lower()
+    for token, family in UA_FAMILIES:
+        if token in ua:
+            return family
+    return 'Other'
+
+
+def referrer_host(referrer):
+    if not referrer:
+        return ''
+    try:
+        return (urlsplit(referrer).hostname or '')[:255]
+    except ValueError:
+        return ''
+
+
+def _upsert_increment(model, key_columns, rows):
+    """
+    INSERT rows of (*keys, clicks), adding clicks onto rows that already exist.
+    """
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = ', '.join(qn(c) for c in [*key_columns, 'clicks'])
+    keys = ', '.join(qn(c) for c in key_columns)
+    row_sql = '(' + ', '.join(['%s'] * (len(key_columns) + 1)) + ')'
+    rows = sorted(rows)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([row_sql] * len(batch))} "
+                f"ON CONFLICT ({keys}) DO UPDATE SET clicks = {table}.clicks + EXCLUDED.clicks",
+                [value for row in batch for value in row],
+            )
+
+
+def write_rollups(rollups, breakdowns):
+    """
+    rollups:    {(short_code, granularity, bucket_epoch): clicks}
+    breakdowns: {(short_code, day_epoch, dimension, value): clicks}
+    Events for codes that no longer exist are dropped.
+    """
+    codes = {key[0] for key in rollups} | {key[0] for key in breakdowns}
+    ids = dict(URLModel.objects.filter(short_code__in=codes).values_list('short_code', 'id'))
+
+    def as_datetime(epoch):
+        return connection.ops.adapt_datetimefield_value(datetime.fromtimestamp(epoch, dt_timezone.utc))
+
+    def as_date(epoch):
+        return connection.ops.adapt_datefield_value(datetime.fromtimestamp(epoch, dt_timezone.utc).date())
+
+    rollup_rows = [
+        (ids[code], granularity, as_datetime(bucket), clicks)
+        for (code, granularity, bucket), clicks in rollups.items() if code in ids
+    ]
+    breakdown_rows = [
+        (ids[code], as_date(day), dimension, value, clicks)
+        for (code, day, dimension, value), clicks in breakdowns.items() if code in ids
+    ]
+    with transaction.atomic():
+        _upsert_increment(ClickRollup, ['url_id', 'granularity', 'bucket'], rollup_rows)
+        _upsert_increment(ClickBreakdown, ['url_id', 'day', 'dimension', 'value'], breakdown_rows)
+
+
+class ClickAggregator(BackgroundFlusher):
+    """
+    record() is a single deque append. When the queue is full the oldest
+    events are dropped (and counted) rather than blocking redirects.
+    Aggregation pauses once max_pending rollup/breakdown rows are waiting
+    (e.g. while the database is down), so the queue bound then applies.
+    """
+
+    thread_name = 'click-aggregator'
+
+    def __init__(self, interval, max_events, max_pending):
+        super().__init__(interval)
+        self.max_pending = max_pending
+        self._events = deque(maxlen=max_events)
+        self._rollups = {}
+        self._breakdowns = {}
+        self._flush_lock = threading.Lock()
+        self.dropped = 0
+
+    def record(self, short_code, referrer='', user_agent='', timestamp=None):
+        self.ensure_started()
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append((timestamp or time.time(), short_code, referrer, user_agent))
+
+    @property
+    def depth(self):
+        return len(self._events)
+
+    def reset(self):
+        self._events.clear()
+        self._rollups = {}
+        self._breakdowns = {}
+
+    def aggregate(self):
+        """Fold queued events into pending rollup deltas, up to max_pending rows"""
+        rollups, breakdowns = self._rollups, self._breakdowns
+        # An event adds at most five rows, so the cap is overshot by at most that
+        while len(rollups) + len(breakdowns) < self.max_pending:
+            try:
+                timestamp, code, referrer, user_agent = self._events.popleft()
+            except IndexError:
+                break
+            ts = int(timestamp)
+            for granularity, seconds in BUCKET_SECONDS.items():
+                key = (code, granularity, ts - ts % seconds)
+                rollups[key] = rollups.get(key, 0) + 1
+            day = ts - ts % 86400
+            for dimension, value in (
+                (ClickBreakdown.REFERRER, referrer_host(referrer)),
+                (ClickBreakdown.USER_AGENT, ua_family(user_agent)),
+            ):
+                key = (code, day, dimension, value)
+                breakdowns[key] = breakdowns.get(key, 0) + 1
+
+    def flush(self):
+        """Write pending rollups; on failure they are kept for the next flush"""
+        with self._flush_lock:
+            self.aggregate()
+            if not self._rollups and not self._breakdowns:
+                return
+            try:
+                write_rollups(self._rollups, self._breakdowns)
+            except Exception:
+                self.failures += 1
+                logger.exception("Rollup flush failed; retrying %d bucket(s) later", len(self._rollups))
+                return
+            self._rollups = {}
+            self._breakdowns = {}
+            self.flushes += 1
+
+    def stats(self):
+        return {
+            'depth': len(self._events),
+            'pending_buckets': len(self._rollups),
+            'dropped': self.dropped,
+            'flushes': self.flushes,
+            'failures': self.failures,
+        }
+
+
+click_aggregator = ClickAggregator(
+    settings.ANALYTICS_FLUSH_INTERVAL, settings.ANALYTICS_MAX_QUEUE, settings.ANALYTICS_MAX_PENDING,
+)
@@ -0,0 +1,48 @@
+# backend/urls/benchmarks.py
+"""
+Shared pieces of the hot path microbenchmarks (urls/tests/bench_hot_paths.py,
+run with pytest-benchmark) and the HTTP load driver (`manage.py loadtest`).
+
+Rows the load driver creates are tagged with BENCH_HOST so they can be told
+apart from real links and deleted afterwards.
+"""
+
+import math
+
+BENCH_HOST = 'bench.link-crush.invalid'
+
+NORMALIZE_INPUTS = (
+    'https://example.com/some/path?a=1&b=2',
+    'example.com/no-scheme',
+    '  https://www.example.org/article/2024/05/a-long-slug-for-an-article  ',
+    'https://l.facebook.com/l.php?u=https%3A%2F%2Fexample.com%2Ftarget&h=AT0',
+    'https://www.google.com/url?q=https://example.net/page&sa=D',
+    'https://track.example/r?redirect=aHR0cHM6Ly9leGFtcGxlLmNvbS9iNjQ',
+)
+
+
+def delete_bench_rows():
+    """Delete links created under BENCH_HOST; returns the number deleted"""
+    from .models import URLModel
+
+    _, per_model = URLModel.objects.filter(original_url__startswith=f'https://{BENCH_HOST}/').delete()
+    return per_model.get(URLModel._meta.label, 0)
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)), 1)
+    return sorted_samples[rank - 1]
+
+
+def latency_summary(samples):
+    samples = sorted(samples)
+    return {
+        'count': len(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': samples[-1] if samples else 0.0,
+    }
@@ -0,0 +1,335 @@
+# backend/urls/bloom.py
+"""
+Per-process Bloom filter over every existing short code (SHORT_CODE_FILTER_ENABLED).
+
+Redirects for codes the filter has definitely never seen return 404 without a
+database query, which keeps scanners probing random codes off the database.
+The filter is built in a background thread from a streamed
+values_list('short_code') and rebuilt every SHORT_CODE_FILTER_REBUILD_INTERVAL
+seconds; until the first build finishes every code is treated as possibly
+present. Deleted codes stay in the filter until the next rebuild; they only
+cost the usual database miss.
+
+Workers learn about each other's creates through a journal in the shared
+cache: publish() takes a range of sequence numbers with one atomic incr and
+stores each new code under its number. Before answering "definitely absent" a
+worker reads the sequence (and the rebuild epoch, below) and adds the codes
+journaled since its last look, so a negative answer costs one shared cache
+round trip instead of a query. If its position can't be caught up (entries
+evicted, the sequence reset, or more than JOURNAL_MAX_CATCHUP behind) it
+falls back to the database until its next rebuild. The journal needs a cache
+that is shared between workers and increments atomically (memcached, Redis);
+with any other backend at URL_CACHE_ALIAS the filter stays off.
+
+Bulk loads that bypass signals (seed_urls, import_urls) call request_rebuild(),
+which stamps an epoch in the shared cache; a newer epoch than their last
+build makes workers treat every code as possibly present until their rebuild
+finishes.
+"""
+
+import hashlib
+import logging
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+
+from .buffering import BackgroundFlusher
+from .pagination import iter_by_id
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip while building
+BUILD_CHUNK_SIZE = 10000
+
+EPOCH_KEY = 'code_filter:v1:epoch'
+SEQ_KEY = 'code_filter:v1:seq'
+JOURNAL_KEY = 'code_filter:v1:code:%d'
+
+# Journal entries a worker reads in one catch-up before waiting for its rebuild instead
+JOURNAL_MAX_CATCHUP = 10000
+
+# Per-process caches can't carry other workers' creates, and these emulate
+# incr() with a get and a set, so concurrent publishers could take the same numbers
+UNSHARED_CACHE_BACKENDS = (LocMemCache, DummyCache, FileBasedCache, DatabaseCache)
+
+
+def _initial_seq():
+    # Microseconds since the epoch: a sequence lost from the cache restarts far
+    # ahead of every position a worker holds, which forces a rebuild
+    return time.time_ns() // 1000
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter sized for `capacity` items at `error_rate`.
+    Bit positions come from one blake2b digest by double hashing.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, item):
+        bits = self.bits
+        for pos in self._positions(item):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def fill_ratio(self):
+        return int.from_bytes(self.bits, 'little').bit_count() / self.size
+
+
+class ShortCodeFilter(BackgroundFlusher):
+    """
+    Holds the current filter and rebuilds it in the background.
+    might_exist() checks the filter in memory and, for codes it rejects, the
+    journal of codes created since (one shared cache round trip).
+    """
+
+    thread_name = 'short-code-filter'
+    flush_at_exit = False
+
+    def __init__(self, interval):
+        super().__init__(interval)
+        self._filter = None
+        self._building = False
+        self._added_while_building = []
+        self._seq = None
+        self.negatives = 0
+        self.journal_codes = 0
+        self.last_build_seconds = None
+        self.built_at = None
+        self._build_epoch = 0.0
+        self._rebuild_requested = False
+        self._warned_unshared = False
+
+    @property
+    def enabled(self):
+        return settings.SHORT_CODE_FILTER_ENABLED
+
+    @property
+    def shared_cache(self):
+        return caches[settings.URL_CACHE_ALIAS]
+
+    @property
+    def active(self):
+        """Enabled, and the shared cache can carry the journal"""
+        if not self.enabled:
+            return False
+        if isinstance(self.shared_cache, UNSHARED_CACHE_BACKENDS):
+            if not self._warned_unshared:
+                self._warned_unshared = True
+                logger.warning(
+                    "SHORT_CODE_FILTER_ENABLED needs a shared cache with atomic incr "
+                    "(memcached or Redis) at URL_CACHE_ALIAS; the short code filter is off"
+                )
+            return False
+        return True
+
+    def reset(self):
+        # First pass of the background thread builds straight away
+        self._filter = None
+        self._building = False
+        self._added_while_building = []
+        self._seq = None
+        self._wakeup.set()
+
+    def might_exist(self, short_code):
+        """False only if short_code definitely doesn't exist"""
+        if not self._rejects(short_code):
+            return True
+        return self._found_after_catch_up(short_code, self._catch_up())
+
+    async def amight_exist(self, short_code):
+        """might_exist() for async views; only the journal catch-up leaves the event loop"""
+        if not self._rejects(short_code):
+            return True
+        return self._found_after_catch_up(short_code, await sync_to_async(self._catch_up)())
+
+    def _rejects(self, short_code):
+        """True if the filter, as last built and caught up, hasn't seen short_code"""
+        if not self.active:
+            return False
+        self.ensure_started()
+        bloom = self._filter
+        return bloom is not None and short_code not in bloom
+
+    def _found_after_catch_up(self, short_code, caught_up):
+        if caught_up and short_code not in self._filter:
+            self.negatives += 1
+            return False
+        return True
+
+    def _catch_up(self):
+        """
+        Add the codes other workers journaled since the last look. False if
+        the filter can't be trusted until the next rebuild.
+        """
+        cache = self.shared_cache
+        state = cache.get_many([SEQ_KEY, EPOCH_KEY])
+        seq, epoch = state.get(SEQ_KEY), state.get(EPOCH_KEY)
+        if epoch is not None and epoch > self._build_epoch:
+            return self._request_local_rebuild()
+        position = self._seq
+        if seq is None or position is None or not 0 <= seq - position <= JOURNAL_MAX_CATCHUP:
+            return self._request_local_rebuild()
+        if seq == position:
+            return True
+
+        keys = [JOURNAL_KEY % n for n in range(position + 1, seq + 1)]
+        found = cache.get_many(keys)
+        codes = []
+        for key in keys:
+            if key not in found:
+                # Evicted, or a publish between its incr and its set_many:
+                # trust what was read so far and ask again next time
+                break
+            codes.append(found[key])
+        with self._lock:
+            if self._seq != position:
+                # Rebuilt or caught up by another thread meanwhile; ask again next time
+                return False
+            self._add_locked(codes)
+            self._seq = position + len(codes)
+        self.journal_codes += len(codes)
+        return len(codes) == len(keys)
+
+    def _request_local_rebuild(self):
+        """Wake this worker's rebuild; returns False (nothing to trust until it finishes)"""
+        if not self._rebuild_requested:
+            self._rebuild_requested = True
+            self.wake()
+        return False
+
+    def request_rebuild(self):
+        """Ask every worker to rebuild (after inserts that bypassed the signals)"""
+        caches[settings.URL_CACHE_ALIAS].set(EPOCH_KEY, time.time(), None)
+
+    def publish(self, short_codes):
+        """Add codes created here to this filter and to the journal the other workers read"""
+        if not short_codes or not self.active:
+            return
+        cache = self.shared_cache
+        try:
+            cache.add(SEQ_KEY, _initial_seq(), None)
+            last = cache.incr(SEQ_KEY, len(short_codes))
+        except ValueError:
+            # Evicted between add and incr: the other workers see the gap and rebuild
+            logger.warning("Short code journal sequence lost; %d code(s) not journaled", len(short_codes))
+        else:
+            first = last - len(short_codes) + 1
+            cache.set_many(
+                {JOURNAL_KEY % (first + i): code for i, code in enumerate(short_codes)},
+                int(self.interval * 2) + 60,
+            )
+        self.add(short_codes)
+
+    def add(self, short_codes):
+        if not self.active:
+            return
+        with self._lock:
+            self._add_locked(short_codes)
+
+    def _add_locked(self, short_codes):
+        if self._filter is not None:
+            for code in short_codes:
+                self._filter.add(code)
+        if self._building:
+            self._added_while_building.extend(short_codes)
+
+    def build(self):
+        from .models import URLModel
+
+        started = time.perf_counter()
+        epoch = time.time()
+        # Codes journaled after this point may be missing from the scan below
+        cache = self.shared_cache
+        cache.add(SEQ_KEY, _initial_seq(), None)
+        seq = cache.get(SEQ_KEY)
+        with self._lock:
+            self._building = True
+            self._added_while_building = []
+        try:
+            expected = URLModel.objects.count()
+            bloom = BloomFilter(
+                max(expected * 2, settings.SHORT_CODE_FILTER_CAPACITY),
+                settings.SHORT_CODE_FILTER_ERROR_RATE,
+            )
+            for chunk in iter_by_id(URLModel.objects.all(), ('short_code',), BUILD_CHUNK_SIZE):
+                for (code,) in chunk:
+                    bloom.add(code)
+            with self._lock:
+                for code in self._added_while_building:
+                    bloom.add(code)
+                self._filter = bloom
+                self._seq = seq
+                self._build_epoch = epoch
+                self._rebuild_requested = False
+        finally:
+            with self._lock:
+                self._building = False
+                self._added_while_building = []
+        self.last_build_seconds = time.perf_counter() - started
+        self.built_at = timezone.now()
+        logger.info(
+            "Short code filter built: %d code(s), %d bits, %.2fs",
+            bloom.count, bloom.size, self.last_build_seconds,
+        )
+
+    def flush(self):
+        if not self.active:
+            return
+        try:
+            self.build()
+        except Exception:
+            self.failures += 1
+            raise
+        self.flushes += 1
+
+    def stats(self):
+        bloom = self._filter
+        fill_ratio = bloom.fill_ratio() if bloom else 0.0
+        return {
+            'enabled': self.enabled,
+            'active': self.active,
+            'ready': bloom is not None,
+            'items': bloom.count if bloom else 0,
+            'capacity': bloom.capacity if bloom else 0,
+            'bits': bloom.size if bloom else 0,
+            'hashes': bloom.hashes if bloom else 0,
+            'error_rate': bloom.error_rate if bloom else settings.SHORT_CODE_FILTER_ERROR_RATE,
+            'fill_ratio': fill_ratio,
+            'estimated_fp_rate': fill_ratio ** bloom.hashes if bloom else 0.0,
+            'last_build_seconds': self.last_build_seconds,
+            'built_at': self.built_at,
+            'rebuilds': self.flushes,
+            'failures': self.failures,
+            'negatives': self.negatives,
+            'journal_codes': self.journal_codes,
+        }
+
+
+code_filter = ShortCodeFilter(settings.SHORT_CODE_FILTER_REBUILD_INTERVAL)
@@ -0,0 +1,83 @@
+# backend/urls/buffering.py
+"""
+Base class for in-memory buffers drained to the database by a background thread.
+"""
+
+import atexit
+import logging
+import os
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_flushers = []
+
+
+class BackgroundFlusher:
+    """
+    Subclasses implement flush() (and reset() for buffered state). The thread is
+    started lazily by ensure_started() and restarted in forked children, which
+    drop whatever state they inherited from the parent. Every live flusher is
+    flushed once more at interpreter shutdown unless flush_at_exit is off.
+    """
+
+    thread_name = 'background-flusher'
+    # Run flush() once more at interpreter shutdown
+    flush_at_exit = True
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.flushes = 0
+        self.failures = 0
+        _flushers.append(self)
+
+    def ensure_started(self):
+        if self._pid != os.getpid():
+            self._start()
+
+    def _start(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self.reset()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def reset(self):
+        """Clear buffered state (called with self._lock held)"""
+
+    def wake(self):
+        self._wakeup.set()
+
+    def flush(self):
+        raise NotImplementedError
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("%s flush failed", self.thread_name)
+            finally:
+                close_old_connections()
+
+
+def _flush_all_at_exit():
+    for flusher in _flushers:
+        if flusher.flush_at_exit and flusher._pid == os.getpid():
+            try:
+                flusher.flush()
+            except Exception:
+                logger.exception("%s flush at exit failed", flusher.thread_name)
+
+
+atexit.register(_flush_all_at_exit)
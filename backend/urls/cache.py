@@ -0,0 +1,238 @@
+# backend/urls/cache.py
+"""
+Read-through cache for short code lookups.
+
+Redirects resolve a short code through two tiers before touching the database:
+- a bounded per-process LRU with a TTL (no network hop at all)
+- a shared tier backed by Django's cache framework (settings.URL_CACHE_ALIAS)
+Codes that the Bloom filter (bloom.py) has never seen, and that no other
+worker has journaled since, are answered as unknown without a query.
+
+Database lookups read from a replica when one is configured (routers.py).
+A replica may still hold a row that was just edited or deleted, so what it
+returns is cached for at most REPLICA_MAX_LAG seconds; rows read from the
+primary are cached for URL_CACHE_SHARED_TTL. Creates are written through to
+both tiers, so replica lag never hides a new link; saves and deletes
+invalidate them once committed (see signals.py). Other workers' local tiers
+are only bounded by URL_CACHE_LOCAL_TTL, so keep it short.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+
+from .bloom import code_filter
+from .routers import read_alias, read_replica
+
+# Fields copied from URLModel into a cached link entry
+LINK_FIELDS = ('original_url', 'redirect_status', 'cache_max_age', 'track_clicks', 'updated_at', 'expires_at')
+
+# Bump the version whenever LINK_FIELDS changes so stale entries are ignored
+KEY_PREFIX = 'link:v3:'
+
+SHORT_CODE_MAX_LENGTH = 10
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU mapping with a per-entry TTL and hit/miss/eviction counters.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires = entry
+            if expires < now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store value for the cache's TTL, or for ttl seconds if that is shorter"""
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + (self.ttl if ttl is None else min(ttl, self.ttl))
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+class LinkCache:
+    """
+    Local LRU -> shared cache -> database lookup for short codes.
+    Cached values are dicts of LINK_FIELDS; unknown codes are not cached.
+    """
+
+    def __init__(self):
+        self.local = LRUCache(settings.URL_CACHE_LOCAL_SIZE, settings.URL_CACHE_LOCAL_TTL)
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    @property
+    def shared(self):
+        return caches[settings.URL_CACHE_ALIAS]
+
+    def get(self, short_code):
+        """Return the cached link dict for short_code, or None if it doesn't exist"""
+        if not short_code or len(short_code) > SHORT_CODE_MAX_LENGTH:
+            return None
+
+        link = self.local.get(short_code)
+        if link is not None:
+            return link
+
+        if not code_filter.might_exist(short_code):
+            return None
+        link = self.shared.get(KEY_PREFIX + short_code)
+        if link is not None:
+            self.shared_hits += 1
+            self.local.set(short_code, link)
+            return link
+        self.shared_misses += 1
+
+        link, ttl = self.load(short_code)
+        if link is not None:
+            self.set(short_code, link, ttl)
+        return link
+
+    async def aget(self, short_code):
+        """
+        Async get(). Local hits never leave the event loop; misses go through
+        Django's async cache and ORM APIs.
+        """
+        if not short_code or len(short_code) > SHORT_CODE_MAX_LENGTH:
+            return None
+
+        link = self.local.get(short_code)
+        if link is not None:
+            return link
+
+        if not await code_filter.amight_exist(short_code):
+            return None
+        key = KEY_PREFIX + short_code
+        link = await self.shared.aget(key)
+        if link is not None:
+            self.shared_hits += 1
+            self.local.set(short_code, link)
+            return link
+        self.shared_misses += 1
+
+        link, ttl = await self.aload(short_code)
+        if link is not None:
+            await self.shared.aset(key, link, ttl)
+            self.local.set(short_code, link, ttl)
+        return link
+
+    def load(self, short_code):
+        """
+        Fetch the link fields straight from the database (a replica if configured).
+        Returns (link or None, seconds the link may be cached).
+        """
+        from .models import URLModel
+
+        with read_replica():
+            alias = read_alias()
+        if alias == DEFAULT_DB_ALIAS:
+            ttl = settings.URL_CACHE_SHARED_TTL
+        else:
+            ttl = min(settings.URL_CACHE_SHARED_TTL, max(1, math.ceil(settings.REPLICA_MAX_LAG)))
+        try:
+            return URLModel.objects.using(alias).values(*LINK_FIELDS).get(short_code=short_code), ttl
+        except URLModel.DoesNotExist:
+            return None, ttl
+
+    async def aload(self, short_code):
+        # The replica health check may query, so choosing the alias can't run on the event loop
+        return await sync_to_async(self.load)(short_code)
+
+    def set(self, short_code, link, ttl=None):
+        ttl = settings.URL_CACHE_SHARED_TTL if ttl is None else ttl
+        self.shared.set(KEY_PREFIX + short_code, link, ttl)
+        self.local.set(short_code, link, ttl)
+
+    def set_many(self, links):
+        """links: {short_code: link dict}"""
+        self.shared.set_many({KEY_PREFIX + code: link for code, link in links.items()}, settings.URL_CACHE_SHARED_TTL)
+        for code, link in links.items():
+            self.local.set(code, link)
+
+    def invalidate(self, short_code):
+        self.local.delete(short_code)
+        self.shared.delete(KEY_PREFIX + short_code)
+
+    def invalidate_many(self, short_codes):
+        for code in short_codes:
+            self.local.delete(code)
+        self.shared.delete_many([KEY_PREFIX + code for code in short_codes])
+
+    def stats(self):
+        return {
+            'local': self.local.stats(),
+            'shared': {'hits': self.shared_hits, 'misses': self.shared_misses},
+        }
+
+
+link_cache = LinkCache()
+
+
+def get_link(short_code):
+    return link_cache.get(short_code)
+
+
+async def aget_link(short_code):
+    return await link_cache.aget(short_code)
+
+
+def link_from_instance(instance):
+    return {field: getattr(instance, field) for field in LINK_FIELDS}
+
+
+def invalidate_link(short_code):
+    link_cache.invalidate(short_code)
@@ -0,0 +1,323 @@
+# backend/urls/clicklog.py
+"""
+Append-only click event log (CLICK_LOG_ENABLED), loaded into ClickEvent by
+manage.py ingest_clicks.
+
+Redirects append one NDJSON line to an in-memory buffer; a background thread
+writes it to the worker's current segment every CLICK_LOG_FLUSH_INTERVAL
+seconds (sooner once CLICK_LOG_BUFFER_BYTES are pending) and rotates segments
+by size and age. Segments are named <host>-<pid>-<ms>-<n>.ndjson and carry an
+.active suffix while their worker still writes them, so a segment only ever
+has one writer. If the disk can't keep up, events beyond
+CLICK_LOG_MAX_BUFFER_BYTES are dropped and counted.
+
+The consumer reads complete lines from each segment starting at its stored
+offset and commits the rows together with the new offset (ClickLogOffset),
+so a crash on either side neither loses nor duplicates events. Segments are
+deleted once sealed and fully loaded; an .active segment untouched for
+CLICK_LOG_STALE_SECONDS belonged to a worker that died and is treated as
+sealed, minus any partial last line.
+"""
+
+import atexit
+import csv
+import io
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from json.encoder import encode_basestring_ascii as _quote
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .buffering import BackgroundFlusher
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.ndjson'
+ACTIVE_SUFFIX = '.active'
+
+# One event per line: time, short code, referrer, country, user agent
+EVENT_FORMAT = '{"t":%.3f,"c":%s,"r":%s,"g":%s,"u":%s}\n'
+
+# Stored field lengths; longer values are truncated when logged
+MAX_REFERRER_LENGTH = 1024
+MAX_USER_AGENT_LENGTH = 512
+
+# Bytes of a segment read (and loaded in one transaction) at a time
+INGEST_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Rows per INSERT when COPY isn't available
+INGEST_BATCH_SIZE = 2000
+
+
+class ClickLog(BackgroundFlusher):
+    """
+    Buffered writer for this process's segment. append() only extends a
+    bytearray; the flusher thread does the file I/O.
+    """
+
+    thread_name = 'click-log'
+    # Sealed by seal_at_exit() instead
+    flush_at_exit = False
+
+    def __init__(self, directory, interval, buffer_bytes, max_buffer_bytes, segment_bytes, segment_seconds):
+        super().__init__(interval)
+        self.directory = directory
+        self.buffer_bytes = buffer_bytes
+        self.max_buffer_bytes = max_buffer_bytes
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.country_key = 'HTTP_' + settings.CLICK_LOG_COUNTRY_HEADER.upper().replace('-', '_')
+        self._io_lock = threading.Lock()
+        self._buffer = bytearray()
+        self._fd = None
+        self._path = None
+        self._size = 0
+        self._opened_at = 0.0
+        self.appended = 0
+        self.dropped = 0
+        self.segments = 0
+
+    def reset(self):
+        # A forked child neither writes its parent's buffer nor appends to its segment
+        self._buffer = bytearray()
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = self._path = None
+
+    def append(self, short_code, request=None):
+        meta = request.META if request is not None else {}
+        # Formatted by hand: a quarter of the cost of json.dumps() on a dict
+        line = EVENT_FORMAT % (
+            time.time(),
+            _quote(short_code),
+            _quote(meta.get('HTTP_REFERER', '')[:MAX_REFERRER_LENGTH]),
+            _quote(meta.get(self.country_key, '')[:2].upper()),
+            _quote(meta.get('HTTP_USER_AGENT', '')[:MAX_USER_AGENT_LENGTH]),
+        )
+        self.ensure_started()
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer_bytes:
+                self.dropped += 1
+                return
+            self._buffer += line.encode()
+            self.appended += 1
+            pending = len(self._buffer)
+        if pending >= self.buffer_bytes:
+            self.wake()
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.segments += 1
+        name = f'{socket.gethostname()}-{os.getpid()}-{int(time.time() * 1000)}-{self.segments}{SEGMENT_SUFFIX}'
+        self._path = os.path.join(self.directory, name)
+        self._fd = os.open(self._path + ACTIVE_SUFFIX, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+        self._size = 0
+        self._opened_at = time.monotonic()
+
+    def _seal(self):
+        # Forgotten first: if the rename fails the consumer treats the segment as stale
+        fd, path = self._fd, self._path
+        self._fd = self._path = None
+        os.close(fd)
+        os.rename(path + ACTIVE_SUFFIX, path)
+
+    def flush(self, seal=False):
+        """Write the buffer to the current segment, rotating it when due. Returns bytes written."""
+        with self._io_lock:
+            with self._lock:
+                data, self._buffer = self._buffer, bytearray()
+            written = 0
+            try:
+                if data:
+                    if self._fd is None:
+                        self._open_segment()
+                    while written < len(data):
+                        written += os.write(self._fd, data[written:])
+                    self._size += written
+                    self.flushes += 1
+                if self._fd is not None and (
+                    seal or self._size >= self.segment_bytes
+                    or time.monotonic() - self._opened_at >= self.segment_seconds
+                ):
+                    self._seal()
+            except OSError:
+                self.failures += 1
+                logger.exception("Click log write failed; keeping %d byte(s) for the next flush", len(data) - written)
+                with self._lock:
+                    self._buffer[:0] = data[written:]
+                return written
+            return written
+
+    def seal_at_exit(self):
+        if self._pid == os.getpid():
+            self.flush(seal=True)
+
+    def stats(self):
+        return {
+            'depth': len(self._buffer),
+            'appended': self.appended,
+            'dropped': self.dropped,
+            'segments': self.segments,
+            'failures': self.failures,
+        }
+
+
+click_log = ClickLog(
+    settings.CLICK_LOG_DIR,
+    settings.CLICK_LOG_FLUSH_INTERVAL,
+    settings.CLICK_LOG_BUFFER_BYTES,
+    settings.CLICK_LOG_MAX_BUFFER_BYTES,
+    settings.CLICK_LOG_SEGMENT_BYTES,
+    settings.CLICK_LOG_SEGMENT_SECONDS,
+)
+atexit.register(click_log.seal_at_exit)
+
+
+# -------------------------
+# Consumer (ingest_clicks)
+# -------------------------
+
+def list_segments(directory):
+    """[(segment name, path, sealed)] oldest first"""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    segments = []
+    for name in names:
+        path = os.path.join(directory, name)
+        if name.endswith(SEGMENT_SUFFIX):
+            segments.append((name, path, True))
+        elif name.endswith(SEGMENT_SUFFIX + ACTIVE_SUFFIX):
+            segments.append((name[:-len(ACTIVE_SUFFIX)], path, False))
+    return sorted(segments, key=lambda segment: (_created_ms(segment[0]), segment[0]))
+
+
+def _created_ms(name):
+    # <host>-<pid>-<ms>-<n>.ndjson
+    try:
+        return int(name[:-len(SEGMENT_SUFFIX)].rsplit('-', 2)[1])
+    except (ValueError, IndexError):
+        return 0
+
+
+def _read_lines(path, offset, max_bytes):
+    """Complete lines from offset on: (data, file size)"""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        f.seek(offset)
+        data = f.read(max_bytes)
+    end = data.rfind(b'\n') + 1
+    return data[:end], size
+
+
+def parse_events(data):
+    """(rows, skipped) for NDJSON event lines; rows are ClickEvent column tuples"""
+    rows = []
+    skipped = 0
+    for line in data.splitlines():
+        try:
+            event = json.loads(line)
+            rows.append((
+                event['c'][:10],
+                datetime.fromtimestamp(event['t'], dt_timezone.utc),
+                event.get('r', ''),
+                event.get('g', ''),
+                event.get('u', ''),
+            ))
+        except (ValueError, KeyError, TypeError, OverflowError, OSError):
+            skipped += 1
+    return rows, skipped
+
+
+def load_events(rows):
+    """Insert ClickEvent rows inside the caller's transaction (COPY on PostgreSQL)"""
+    from .models import ClickEvent
+
+    if not rows:
+        return
+    if connection.vendor == 'postgresql':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for short_code, clicked_at, referrer, country, user_agent in rows:
+            writer.writerow((short_code, clicked_at.isoformat(), referrer, country, user_agent))
+        buffer.seek(0)
+        table = connection.ops.quote_name(ClickEvent._meta.db_table)
+        # Unquoted empty CSV fields are NULL by default; these columns store ''
+        sql = (
+            f"COPY {table} (short_code, clicked_at, referrer, country, user_agent) FROM STDIN "
+            "WITH (FORMAT csv, FORCE_NOT_NULL (referrer, country, user_agent))"
+        )
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+    else:
+        ClickEvent.objects.bulk_create(
+            [ClickEvent(short_code=c, clicked_at=t, referrer=r, country=g, user_agent=u) for c, t, r, g, u in rows],
+            batch_size=INGEST_BATCH_SIZE,
+        )
+
+
+def ingest_segment(name, path, sealed, chunk_bytes=INGEST_CHUNK_BYTES):
+    """
+    Load a segment from its stored offset; delete it once it is sealed (or
+    stale) and fully loaded. Returns (events loaded, lines skipped).
+    """
+    from .models import ClickLogOffset
+
+    offset = ClickLogOffset.objects.filter(segment=name).values_list('offset', flat=True).first() or 0
+    loaded = skipped = 0
+    while True:
+        try:
+            data, size = _read_lines(path, offset, chunk_bytes)
+        except FileNotFoundError:
+            if sealed:
+                return loaded, skipped
+            # Sealed by its writer since it was listed
+            path, sealed = path[:-len(ACTIVE_SUFFIX)], True
+            continue
+        if not data:
+            break
+        rows, bad = parse_events(data)
+        with transaction.atomic():
+            load_events(rows)
+            ClickLogOffset.objects.update_or_create(segment=name, defaults={'offset': offset + len(data)})
+        offset += len(data)
+        loaded += len(rows)
+        skipped += bad
+
+    if not sealed:
+        try:
+            stale = time.time() - os.path.getmtime(path) > settings.CLICK_LOG_STALE_SECONDS
+        except FileNotFoundError:
+            # Sealed meanwhile; finished on the next pass
+            stale = False
+        if not stale:
+            return loaded, skipped
+
+    if offset < size:
+        logger.warning("Dropping %d byte(s) of partial event at the end of %s", size - offset, name)
+    os.remove(path)
+    ClickLogOffset.objects.filter(segment=name).delete()
+    return loaded, skipped
+
+
+def ingest(directory=None):
+    """One pass over every segment; returns (events loaded, lines skipped, segments seen)"""
+    loaded = skipped = 0
+    segments = list_segments(directory or settings.CLICK_LOG_DIR)
+    for name, path, sealed in segments:
+        n, bad = ingest_segment(name, path, sealed)
+        loaded += n
+        skipped += bad
+    return loaded, skipped, len(segments)
@@ -0,0 +1,198 @@
+# backend/urls/clicks.py
+"""
+Write-behind click counting.
+
+Redirects only bump an in-memory counter per short code. A background thread
+flushes the coalesced counts every CLICK_FLUSH_INTERVAL seconds (the durability
+window) or as soon as CLICK_FLUSH_THRESHOLD clicks are pending, using a single
+bulk UPDATE per batch and one transaction per flush. Pending counts are also flushed at interpreter shutdown.
+
+record_click() is the single entry point the redirect views call; it also
+feeds the analytics rollups (see analytics.py), the per-click event log
+(see clicklog.py) and the trending sketches (see trending.py).
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from . import owners, summary, trending
+from .buffering import BackgroundFlusher
+from .cache import link_cache
+from .clicklog import click_log
+
+logger = logging.getLogger(__name__)
+
+# Rows per UPDATE statement
+FLUSH_BATCH_SIZE = 500
+
+
+def write_click_counts(counts):
+    """
+    Add {short_code: clicks} to click_count in as few statements as possible,
+    moving the owners' and the summary's click totals along. Every batch
+    commits together, so a failed flush applies nothing and can be retried
+    whole. Links pushed to their max_clicks are expired (see expiry.py) and
+    dropped from the cache. Returns the clicks applied: codes deleted in the
+    meantime are skipped, and so left out of the totals too.
+    """
+    from .models import URLModel
+
+    # Sorted so concurrent flushers lock rows in the same order
+    items = sorted(counts.items())
+    owner_clicks = {}
+    exhausted = []
+    applied = 0
+    with transaction.atomic():
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            if connection.vendor == 'postgresql':
+                table = connection.ops.quote_name(URLModel._meta.db_table)
+                values = ', '.join(['(%s, %s::integer)'] * len(batch))
+                params = [p for item in batch for p in item]
+                with connection.cursor() as cursor:
+                    # SET expressions see the old row, RETURNING the new one
+                    cursor.execute(
+                        f"UPDATE {table} AS u SET click_count = u.click_count + v.clicks, "
+                        f"expires_at = CASE WHEN u.click_count + v.clicks >= u.max_clicks "
+                        f"AND (u.expires_at IS NULL OR u.expires_at > now()) THEN now() ELSE u.expires_at END "
+                        f"FROM (VALUES {values}) AS v(short_code, clicks) "
+                        f"WHERE u.short_code = v.short_code "
+                        f"RETURNING u.owner_id, v.clicks, u.short_code, "
+                        f"u.click_count >= u.max_clicks AND u.click_count - v.clicks < u.max_clicks",
+                        params,
+                    )
+                    for owner_id, n, short_code, reached in cursor.fetchall():
+                        applied += n
+                        if owner_id is not None:
+                            owner_clicks[owner_id] = owner_clicks.get(owner_id, 0) + n
+                        if reached:
+                            exhausted.append(short_code)
+            else:
+                delta = Case(
+                    *[When(short_code=code, then=Value(n)) for code, n in batch],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+                codes = [code for code, _ in batch]
+                URLModel.objects.filter(short_code__in=codes).update(click_count=F('click_count') + delta)
+                batch_counts = dict(batch)
+                updated = URLModel.objects.filter(short_code__in=codes)
+                for code, owner_id in updated.values_list('short_code', 'owner_id'):
+                    applied += batch_counts[code]
+                    if owner_id is not None:
+                        owner_clicks[owner_id] = owner_clicks.get(owner_id, 0) + batch_counts[code]
+                now = timezone.now()
+                reached = URLModel.objects.filter(
+                    Q(expires_at__isnull=True) | Q(expires_at__gt=now),
+                    short_code__in=codes, click_count__gte=F('max_clicks'),
+                )
+                batch_exhausted = list(reached.values_list('short_code', flat=True))
+                if batch_exhausted:
+                    URLModel.objects.filter(short_code__in=batch_exhausted).update(expires_at=now)
+                    exhausted.extend(batch_exhausted)
+        owners.adjust({owner_id: (0, n) for owner_id, n in owner_clicks.items()})
+        summary.adjust(clicks=applied)
+    if exhausted:
+        transaction.on_commit(lambda: link_cache.invalidate_many(exhausted))
+    return applied
+
+
+class ClickBuffer(BackgroundFlusher):
+    """
+    Coalesces click increments per short code and flushes them in the background.
+    record() never touches the database.
+    """
+
+    thread_name = 'click-flusher'
+
+    def __init__(self, interval, threshold):
+        super().__init__(interval)
+        self.threshold = threshold
+        self._counts = {}
+        self._pending = 0
+        self.flushed_clicks = 0
+
+    def record(self, short_code, n=1):
+        self.ensure_started()
+        with self._lock:
+            self._counts[short_code] = self._counts.get(short_code, 0) + n
+            self._pending += n
+            pending = self._pending
+        if pending >= self.threshold:
+            self.wake()
+
+    @property
+    def depth(self):
+        return self._pending
+
+    def reset(self):
+        self._counts = {}
+        self._pending = 0
+
+    def drain(self):
+        with self._lock:
+            counts = self._counts
+            self.reset()
+        return counts
+
+    def flush(self):
+        """Write all pending counts; on failure they are kept for the next flush"""
+        counts = self.drain()
+        if not counts:
+            return 0
+        try:
+            write_click_counts(counts)
+        except Exception:
+            self.failures += 1
+            logger.exception("Click flush failed; retrying %d code(s) later", len(counts))
+            with self._lock:
+                for code, n in counts.items():
+                    self._counts[code] = self._counts.get(code, 0) + n
+                    self._pending += n
+            return 0
+        total = sum(counts.values())
+        self.flushes += 1
+        self.flushed_clicks += total
+        return total
+
+    def stats(self):
+        return {
+            'depth': self._pending,
+            'codes': len(self._counts),
+            'flushes': self.flushes,
+            'flushed_clicks': self.flushed_clicks,
+            'failures': self.failures,
+        }
+
+
+click_buffer = ClickBuffer(settings.CLICK_FLUSH_INTERVAL, settings.CLICK_FLUSH_THRESHOLD)
+
+
+def record_click(short_code, request=None):
+    """
+    Count one redirect and queue its analytics event. Buffered unless
+    CLICK_BUFFER_ENABLED is off, in which case both are written immediately.
+    """
+    from .analytics import click_aggregator
+
+    buffered = settings.CLICK_BUFFER_ENABLED
+    if buffered:
+        click_buffer.record(short_code)
+    else:
+        write_click_counts({short_code: 1})
+
+    if settings.CLICK_LOG_ENABLED:
+        click_log.append(short_code, request)
+
+    if settings.TRENDING_ENABLED:
+        trending.record(short_code)
+
+    if settings.ANALYTICS_ENABLED:
+        meta = request.META if request is not None else {}
+        click_aggregator.record(short_code, meta.get('HTTP_REFERER', ''), meta.get('HTTP_USER_AGENT', ''))
+        if not buffered:
+            click_aggregator.flush()
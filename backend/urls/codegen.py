@@ -0,0 +1,264 @@
+# backend/urls/codegen.py
+"""
+Short code allocators.
+
+settings.SHORT_CODE_ALLOCATOR selects the strategy:
+- 'random':   random base62 codes (collisions resolved by the insert retry in URLModel.save)
+- 'sequence': base62 of a counter; workers reserve blocks of SHORT_CODE_BLOCK_SIZE ids
+              at a time, so allocating a code needs no database round trip
+- 'feistel':  same block-reserved counter, passed through a keyed Feistel permutation
+              so consecutive codes look unrelated (default)
+- any dotted path to a CodeAllocator subclass
+
+With SHORT_CODE_RECYCLE, codes of purged links (expiry.py) are handed out
+again before new ones once they have rested for SHORT_CODE_RECYCLE_AFTER seconds.
+"""
+
+import hashlib
+import os
+import random
+import string
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+ALPHABET = string.digits + string.ascii_lowercase + string.ascii_uppercase
+BASE = len(ALPHABET)
+MAX_CODE_LENGTH = 10
+
+
+class AllocatorExhausted(Exception):
+    """Raised when a strategy has no codes left at the configured length"""
+
+
+def base62_encode(n, length=0):
+    """Encode a non-negative integer, left-padded to `length` characters"""
+    chars = []
+    while n:
+        n, rem = divmod(n, BASE)
+        chars.append(ALPHABET[rem])
+    code = ''.join(reversed(chars)) or ALPHABET[0]
+    return code.rjust(length, ALPHABET[0])
+
+
+def base62_decode(code):
+    n = 0
+    for char in code:
+        n = n * BASE + ALPHABET.index(char)
+    return n
+
+
+@contextmanager
+def _autocommit_cursor():
+    """
+    Cursor whose statements commit on their own, even inside the caller's
+    transaction: a rollback there must not undo a reservation this process
+    keeps using. PostgreSQL gets a short-lived second connection; SQLite allows
+    one writer per database, so there the caller's connection is used.
+    """
+    if not connection.in_atomic_block or connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            yield cursor
+        return
+    side = connections.create_connection(DEFAULT_DB_ALIAS)
+    try:
+        with side.cursor() as cursor:
+            yield cursor
+    finally:
+        side.close()
+
+
+def reserve_block(name, size):
+    """
+    Atomically reserve `size` consecutive values from the named sequence,
+    committed independently of any transaction the caller has open.
+    Returns the half-open range (start, end).
+    """
+    from .models import ShortCodeSequence
+
+    qn = connection.ops.quote_name
+    table = qn(ShortCodeSequence._meta.db_table)
+    with _autocommit_cursor() as cursor:
+        # One statement, so the sequence row is only locked while it runs
+        cursor.execute(
+            f"INSERT INTO {table} ({qn('name')}, {qn('next_value')}) VALUES (%s, %s) "
+            f"ON CONFLICT ({qn('name')}) DO UPDATE SET next_value = {table}.next_value + EXCLUDED.next_value "
+            f"RETURNING next_value",
+            [name, size],
+        )
+        end = cursor.fetchone()[0]
+    return end - size, end
+
+
+class CodeAllocator:
+    """Base class: allocate() returns a new short code"""
+
+    def __init__(self, length):
+        self.length = length
+
+    def allocate(self):
+        raise NotImplementedError
+
+
+class RandomAllocator(CodeAllocator):
+    def allocate(self):
+        return ''.join(random.choices(ALPHABET, k=self.length))
+
+
+class SequenceAllocator(CodeAllocator):
+    """
+    Hands out base62-encoded sequence numbers from a locally reserved block.
+    Unused values in a block are skipped when the process exits.
+    """
+
+    def __init__(self, length, block_size=None):
+        super().__init__(length)
+        self.block_size = block_size or settings.SHORT_CODE_BLOCK_SIZE
+        self.sequence_name = f'{type(self).__name__.lower()}:{length}'
+        self._next = self._end = 0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def next_value(self):
+        with self._lock:
+            # A block reserved before a fork must not be shared with the child
+            if self._next >= self._end or self._pid != os.getpid():
+                self._next, self._end = reserve_block(self.sequence_name, self.block_size)
+                self._pid = os.getpid()
+            value = self._next
+            self._next += 1
+        return value
+
+    def encode(self, value):
+        code = base62_encode(value, self.length)
+        if len(code) > MAX_CODE_LENGTH:
+            raise AllocatorExhausted(f"Sequence '{self.sequence_name}' exceeded {MAX_CODE_LENGTH} characters")
+        return code
+
+    def allocate(self):
+        return self.encode(self.next_value())
+
+
+class FeistelAllocator(SequenceAllocator):
+    """
+    Maps the counter through a keyed Feistel network over [0, 62**length),
+    using cycle walking to stay inside the domain. The mapping is a bijection,
+    so distinct counter values always produce distinct codes.
+    """
+
+    rounds = 4
+
+    def __init__(self, length, block_size=None, key=None):
+        super().__init__(length, block_size)
+        self.domain = BASE ** length
+        bits = (self.domain - 1).bit_length()
+        self.half_bits = (bits + 1) // 2
+        self.mask = (1 << self.half_bits) - 1
+        secret = key or settings.SHORT_CODE_FEISTEL_KEY or settings.SECRET_KEY
+        self.key = hashlib.sha256(f'short-code:{secret}'.encode()).digest()
+
+    def _round(self, value, i):
+        digest = hashlib.blake2b(
+            value.to_bytes(8, 'big'), key=self.key, person=i.to_bytes(16, 'big'), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, 'big') & self.mask
+
+    def _feistel(self, value):
+        left, right = value >> self.half_bits, value & self.mask
+        for i in range(self.rounds):
+            left, right = right, left ^ self._round(right, i)
+        return (left << self.half_bits) | right
+
+    def permute(self, value):
+        if value >= self.domain:
+            raise AllocatorExhausted(
+                f"All {self.domain} codes of length {self.length} are allocated; raise SHORT_CODE_LENGTH"
+            )
+        value = self._feistel(value)
+        while value >= self.domain:
+            value = self._feistel(value)
+        return value
+
+    def encode(self, value):
+        return base62_encode(self.permute(value), self.length)
+
+
+def claim_recycled(count):
+    """Take up to `count` recycled codes that have rested long enough, oldest first"""
+    from .models import RecycledCode
+
+    cutoff = timezone.now() - timedelta(seconds=settings.SHORT_CODE_RECYCLE_AFTER)
+    with transaction.atomic():
+        codes = list(
+            RecycledCode.objects.filter(released_at__lte=cutoff).order_by('released_at')
+            .select_for_update(skip_locked=True).values_list('short_code', flat=True)[:count]
+        )
+        RecycledCode.objects.filter(short_code__in=codes).delete()
+    return codes
+
+
+class RecyclingAllocator(CodeAllocator):
+    """
+    Serves recycled codes before asking the wrapped allocator. Codes are
+    claimed a block at a time; when none are ready the table is checked again
+    after RECYCLE_RETRY_SECONDS, so most allocations need no round trip.
+    Claimed codes left unused when the process exits are not reused.
+    """
+
+    RECYCLE_RETRY_SECONDS = 60
+
+    def __init__(self, inner, block_size=None):
+        super().__init__(inner.length)
+        self.inner = inner
+        self.block_size = block_size or settings.SHORT_CODE_BLOCK_SIZE
+        self._codes = []
+        self._retry_at = 0.0
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def allocate(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._codes, self._retry_at, self._pid = [], 0.0, os.getpid()
+            if not self._codes and time.monotonic() >= self._retry_at:
+                self._codes = claim_recycled(self.block_size)
+                if not self._codes:
+                    self._retry_at = time.monotonic() + self.RECYCLE_RETRY_SECONDS
+            if self._codes:
+                return self._codes.pop()
+        return self.inner.allocate()
+
+
+ALLOCATORS = {
+    'random': RandomAllocator,
+    'sequence': SequenceAllocator,
+    'feistel': FeistelAllocator,
+}
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def get_allocator(length=None):
+    """Return the process-wide allocator for the configured strategy and length"""
+    length = length or settings.SHORT_CODE_LENGTH
+    strategy = settings.SHORT_CODE_ALLOCATOR
+    key = (strategy, length)
+    allocator = _allocators.get(key)
+    if allocator is None:
+        with _allocators_lock:
+            allocator = _allocators.get(key)
+            if allocator is None:
+                cls = ALLOCATORS.get(strategy) or import_string(strategy)
+                allocator = cls(length)
+                # Only the default-length allocator hands out recycled codes
+                if settings.SHORT_CODE_RECYCLE and length == settings.SHORT_CODE_LENGTH:
+                    allocator = RecyclingAllocator(allocator)
+                _allocators[key] = allocator
+    return allocator
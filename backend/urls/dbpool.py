@@ -0,0 +1,60 @@
+# backend/urls/dbpool.py
+"""
+Database connection reuse statistics (linkcrush_db_connections in /api/metrics).
+
+With persistent connections (CONN_MAX_AGE > 0) every worker thread keeps its
+own connection; `opened` growing much slower than request counts is the sign
+they are being reused. Pooling across workers (and under ASGI, where
+connections are closed per request) is left to PgBouncer
+(DATABASE_PGBOUNCER), whose own SHOW POOLS/SHOW STATS report the pool.
+"""
+
+import threading
+import time
+import weakref
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_lock = threading.Lock()
+_wrappers = weakref.WeakSet()
+_opened = {}
+
+
+def _track(sender, connection, **kwargs):
+    with _lock:
+        _wrappers.add(connection)
+        _opened[connection.alias] = _opened.get(connection.alias, 0) + 1
+
+
+connection_created.connect(_track)
+
+
+def _mode(settings_dict):
+    return 'persistent' if settings_dict['CONN_MAX_AGE'] != 0 else 'per_request'
+
+
+def stats():
+    """{alias: {...}} for every configured database"""
+    with _lock:
+        wrappers = list(_wrappers)
+        opened = dict(_opened)
+    now = time.monotonic()
+    result = {}
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        live = [w for w in wrappers if w.alias == alias and w.connection is not None]
+        entry = {
+            'mode': _mode(settings_dict),
+            'conn_max_age': settings_dict['CONN_MAX_AGE'],
+            'health_checks': settings_dict['CONN_HEALTH_CHECKS'],
+            'opened': opened.get(alias, 0),
+            'open': len(live),
+            # close_at is None for connections kept forever (CONN_MAX_AGE=None)
+            'oldest_seconds': max(
+                (settings_dict['CONN_MAX_AGE'] - (w.close_at - now) for w in live if w.close_at is not None),
+                default=0,
+            ),
+        }
+        result[alias] = entry
+    return result
@@ -0,0 +1,89 @@
+# backend/urls/expiry.py
+"""
+Link expiry.
+
+A link expires at expires_at, or once max_clicks clicks have been counted:
+the click flush (clicks.write_click_counts) stamps expires_at on links it
+pushes over their limit, so a redirect only compares the cached expires_at
+(redirects.link_expired). Clicks still buffered in other workers can overshoot
+max_clicks by up to one flush interval.
+
+Expired links answer 410 Gone until purge_expired deletes them. Each batch is
+a short transaction that walks the partial urls_expires_at_idx index and skips
+rows locked by concurrent writers, so the table is never locked; owner and
+summary counters and the link cache are adjusted once per batch instead of per
+row. With SHORT_CODE_RECYCLE the purged codes are queued in RecycledCode for
+codegen.RecyclingAllocator.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import owners, summary
+from .cache import link_cache
+
+logger = logging.getLogger(__name__)
+
+# Links deleted per transaction
+PURGE_BATCH_SIZE = 1000
+
+
+def delete_links(rows, recycle=None):
+    """
+    Delete links given as (id, short_code, owner_id, click_count) rows, with
+    their rollups, without per-row signals. Returns the number deleted.
+    """
+    from .models import ClickBreakdown, ClickRollup, RecycledCode, URLModel
+
+    if not rows:
+        return 0
+    if recycle is None:
+        recycle = settings.SHORT_CODE_RECYCLE
+    ids = [row[0] for row in rows]
+    codes = [row[1] for row in rows]
+    deltas = {}
+    for _, _, owner_id, click_count in rows:
+        urls, clicks = deltas.get(owner_id, (0, 0))
+        deltas[owner_id] = (urls - 1, clicks - click_count)
+
+    with transaction.atomic():
+        # No signals or dependent rows, so each is a single DELETE
+        ClickRollup.objects.filter(url_id__in=ids).delete()
+        ClickBreakdown.objects.filter(url_id__in=ids).delete()
+        table = connection.ops.quote_name(URLModel._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+            deleted = cursor.rowcount
+        owners.adjust(deltas)
+        if recycle:
+            RecycledCode.objects.bulk_create(
+                [RecycledCode(short_code=code) for code in codes], ignore_conflicts=True,
+            )
+
+    summary.adjust(urls=-len(rows), clicks=-sum(row[3] for row in rows))
+    # purge_batch holds the rows locked until it commits
+    transaction.on_commit(lambda: link_cache.invalidate_many(codes))
+    return deleted
+
+
+def purge_batch(now=None, batch_size=PURGE_BATCH_SIZE, recycle=None):
+    """Delete up to batch_size links that expired before now; returns the number deleted"""
+    from .models import URLModel
+
+    with transaction.atomic():
+        rows = list(
+            URLModel.objects.filter(expires_at__lte=now or timezone.now())
+            .order_by('expires_at')
+            .select_for_update(skip_locked=True)
+            .values_list('id', 'short_code', 'owner_id', 'click_count')[:batch_size]
+        )
+        return delete_links(rows, recycle)
+
+
+def count_expired(now=None):
+    from .models import URLModel
+
+    return URLModel.objects.filter(expires_at__lte=now or timezone.now()).count()
@@ -0,0 +1,308 @@
+# backend/urls/importer.py
+"""
+Bulk URL import (manage.py import_urls).
+
+Input records (CSV with a header, or NDJSON; .gz is decompressed on the fly)
+carry a short code, URL, click count and creation time; column names from
+export_urls and the usual short aliases are accepted. prepare_batch()
+validates and normalizes a batch and is safe to run in worker processes.
+
+Loaders write one prepared chunk per call, inside the caller's transaction:
+- PostgresCopyLoader: COPY into a temp staging table, then one set-based
+  INSERT ... SELECT ... ON CONFLICT (short_code) into urls
+- BulkCreateLoader: IN lookups plus bulk_create/bulk_update (SQLite and others)
+
+A URL already present (or repeated within the chunk) keeps url_hash NULL, like
+the legacy duplicates left by the url_hash backfill, so every code is imported.
+"""
+
+import csv
+import gzip
+import io
+import json
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import URLModel
+from .normalize import normalize_url
+
+# Accepted column names per field, first match wins
+COLUMN_ALIASES = {
+    'short_code': ('short_code', 'shortCode', 'code'),
+    'original_url': ('original_url', 'originalUrl', 'url'),
+    'click_count': ('click_count', 'clickCount', 'clicks'),
+    'created_at': ('created_at', 'createdAt'),
+}
+
+# Legacy codes may use - and _, which the redirect route accepts
+SHORT_CODE_RE = re.compile(r'[A-Za-z0-9_-]{1,%d}' % URLModel._meta.get_field('short_code').max_length)
+
+MAX_URL_LENGTH = URLModel._meta.get_field('original_url').max_length
+
+# What an existing short code does to an imported row with the same code
+CONFLICT_POLICIES = ('skip', 'add-clicks', 'replace', 'error')
+
+
+class ImportConflict(Exception):
+    """Raised by the 'error' conflict policy"""
+
+
+def open_input(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def _pick(record, field):
+    for name in COLUMN_ALIASES[field]:
+        value = record.get(name)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def read_records(f, fmt):
+    """Yield dicts from CSV (header row required) or NDJSON"""
+    if fmt == 'csv':
+        yield from csv.DictReader(f)
+        return
+    for line in f:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield {}
+
+
+def prepare_batch(records):
+    """
+    Validate and normalize raw records. Returns (rows, rejected) where rows are
+    (short_code, original_url, url_hash, click_count, created_at); the short
+    code is None when the record has none.
+    """
+    rows = []
+    rejected = 0
+    now = datetime.now(dt_timezone.utc)
+    for record in records:
+        if not isinstance(record, dict):
+            rejected += 1
+            continue
+        code = _pick(record, 'short_code')
+        raw_url = _pick(record, 'original_url')
+        url = normalize_url(raw_url) if isinstance(raw_url, str) else None
+        if not url or len(url) > MAX_URL_LENGTH or (code is not None and not SHORT_CODE_RE.fullmatch(str(code))):
+            rejected += 1
+            continue
+        try:
+            clicks = int(_pick(record, 'click_count') or 0)
+        except (TypeError, ValueError):
+            rejected += 1
+            continue
+        created = _pick(record, 'created_at')
+        created_at = parse_datetime(created) if isinstance(created, str) else None
+        if created is not None and created_at is None:
+            rejected += 1
+            continue
+        if created_at is None:
+            created_at = now
+        elif timezone.is_naive(created_at):
+            created_at = created_at.replace(tzinfo=dt_timezone.utc)
+        rows.append((
+            str(code) if code is not None else None, url, URLModel.hash_url(url), max(clicks, 0), created_at,
+        ))
+    return rows, rejected
+
+
+def prepare_chunk(records):
+    """prepare_batch() for a worker pool: (records consumed, rows, rejected)"""
+    rows, rejected = prepare_batch(records)
+    return len(records), rows, rejected
+
+
+def _field_defaults():
+    """Values for columns the import doesn't carry (the database has no defaults)"""
+    return {
+        'redirect_status': URLModel._meta.get_field('redirect_status').default,
+        'track_clicks': URLModel._meta.get_field('track_clicks').default,
+    }
+
+
+class LoadResult:
+    def __init__(self, inserted=0, updated=0, skipped=0, replaced_codes=()):
+        self.inserted = inserted
+        self.updated = updated
+        self.skipped = skipped
+        # codes whose target changed; cached links must be dropped
+        self.replaced_codes = list(replaced_codes)
+
+
+class PostgresCopyLoader:
+    staging = 'urls_import_staging'
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def _ensure_staging(self, cursor):
+        # Every chunk: behind PgBouncer the next transaction may run on another server connection
+        cursor.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {self.staging} ("
+            "short_code varchar(10) NOT NULL, original_url varchar(2048) NOT NULL, "
+            "url_hash varchar(64) NOT NULL, click_count integer NOT NULL, created_at timestamptz NOT NULL"
+            ") ON COMMIT DELETE ROWS"
+        )
+
+    def _copy(self, cursor, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for code, url, url_hash, clicks, created_at in rows:
+            writer.writerow((code, url, url_hash, clicks, created_at.isoformat()))
+        buffer.seek(0)
+        sql = f"COPY {self.staging} (short_code, original_url, url_hash, click_count, created_at) FROM STDIN WITH (FORMAT csv)"
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):  # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+    def load(self, rows):
+        from .clicks import write_click_counts
+
+        table = connection.ops.quote_name(URLModel._meta.db_table)
+        defaults = _field_defaults()
+        with connection.cursor() as cursor:
+            self._ensure_staging(cursor)
+            self._copy(cursor, rows)
+
+            # The clicks of the row that is kept for each code (the earliest, as below)
+            cursor.execute(
+                f"SELECT DISTINCT ON (s.short_code) s.short_code, s.click_count "
+                f"FROM {self.staging} s JOIN {table} u USING (short_code) "
+                f"ORDER BY s.short_code, s.created_at"
+            )
+            existing_clicks = dict(cursor.fetchall())
+            existing = list(existing_clicks)
+            if existing and self.policy == 'error':
+                raise ImportConflict(f'{len(existing)} short code(s) already exist, e.g. {existing[0]}')
+
+            if self.policy == 'add-clicks':
+                # Moves owner totals and expires links pushed over max_clicks, like a click flush
+                write_click_counts({code: clicks for code, clicks in existing_clicks.items() if clicks})
+                on_conflict = "DO NOTHING"
+            elif self.policy == 'replace':
+                on_conflict = (
+                    "DO UPDATE SET original_url = EXCLUDED.original_url, "
+                    f"url_hash = CASE WHEN {table}.original_url = EXCLUDED.original_url "
+                    f"THEN {table}.url_hash ELSE EXCLUDED.url_hash END, "
+                    "click_count = EXCLUDED.click_count, created_at = EXCLUDED.created_at, "
+                    "updated_at = EXCLUDED.updated_at"
+                )
+            else:
+                on_conflict = "DO NOTHING"
+
+            # One row per code; url_hash only for the first row of a URL not already stored
+            cursor.execute(
+                f"""
+                WITH deduped AS (
+                    SELECT DISTINCT ON (short_code) * FROM {self.staging} ORDER BY short_code, created_at
+                ), ranked AS (
+                    SELECT d.*, row_number() OVER (PARTITION BY url_hash ORDER BY created_at, short_code) AS hash_rank
+                    FROM deduped d
+                )
+                INSERT INTO {table}
+                    (short_code, original_url, url_hash, click_count, created_at, updated_at,
+                     redirect_status, track_clicks)
+                SELECT r.short_code, r.original_url,
+                       CASE WHEN r.hash_rank = 1
+                            AND NOT EXISTS (SELECT 1 FROM {table} u WHERE u.url_hash = r.url_hash)
+                            THEN r.url_hash END,
+                       r.click_count, r.created_at, now(), %s, %s
+                FROM ranked r
+                ON CONFLICT (short_code) {on_conflict}
+                """,
+                [defaults['redirect_status'], defaults['track_clicks']],
+            )
+            affected = cursor.rowcount
+
+        if self.policy == 'add-clicks':
+            return LoadResult(inserted=affected, updated=len(existing), skipped=len(rows) - affected - len(existing))
+        if self.policy == 'replace':
+            inserted = affected - len(existing)
+            return LoadResult(
+                inserted=inserted, updated=len(existing), skipped=len(rows) - inserted - len(existing),
+                replaced_codes=existing,
+            )
+        return LoadResult(inserted=affected, skipped=len(rows) - affected)
+
+
+class BulkCreateLoader:
+    # Rows per IN lookup / bulk statement (stays under SQLite's variable limit)
+    batch_size = 2000
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def load(self, rows):
+        result = LoadResult()
+        for start in range(0, len(rows), self.batch_size):
+            self._load_batch(rows[start:start + self.batch_size], result)
+        return result
+
+    def _load_batch(self, rows, result):
+        from .clicks import write_click_counts
+
+        by_code = {}
+        for row in sorted(rows, key=lambda row: row[4]):
+            if row[0] not in by_code:
+                by_code[row[0]] = row
+        result.skipped += len(rows) - len(by_code)
+
+        existing = set(URLModel.objects.filter(short_code__in=list(by_code)).values_list('short_code', flat=True))
+        if existing and self.policy == 'error':
+            raise ImportConflict(f'{len(existing)} short code(s) already exist, e.g. {min(existing)}')
+
+        new_rows = [row for code, row in by_code.items() if code not in existing]
+        taken_hashes = set(URLModel.objects.filter(
+            url_hash__in=[row[2] for row in by_code.values()]
+        ).values_list('url_hash', flat=True))
+
+        if existing and self.policy == 'add-clicks':
+            write_click_counts({code: by_code[code][3] for code in existing if by_code[code][3]})
+            result.updated += len(existing)
+        elif existing and self.policy == 'replace':
+            objs = list(URLModel.objects.filter(short_code__in=existing))
+            for obj in objs:
+                code, url, url_hash, clicks, created_at = by_code[obj.short_code]
+                if obj.original_url != url:
+                    obj.original_url = url
+                    obj.url_hash = url_hash if url_hash not in taken_hashes else None
+                    taken_hashes.add(url_hash)
+                obj.click_count = clicks
+                obj.created_at = created_at
+                obj.updated_at = timezone.now()
+            URLModel.objects.bulk_update(objs, ['original_url', 'url_hash', 'click_count', 'created_at', 'updated_at'])
+            result.updated += len(objs)
+            result.replaced_codes.extend(existing)
+        else:
+            result.skipped += len(existing)
+
+        objs = []
+        for code, url, url_hash, clicks, created_at in new_rows:
+            objs.append(URLModel(
+                short_code=code, original_url=url, click_count=clicks, created_at=created_at,
+                url_hash=url_hash if url_hash not in taken_hashes else None,
+            ))
+            taken_hashes.add(url_hash)
+        URLModel.objects.bulk_create(objs)
+        result.inserted += len(objs)
+
+
+def get_loader(policy):
+    if connection.vendor == 'postgresql':
+        return PostgresCopyLoader(policy)
+    return BulkCreateLoader(policy)
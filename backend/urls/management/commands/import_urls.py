@@ -0,0 +1,141 @@
+# backend/urls/management/commands/import_urls.py
+"""
+Bulk import links, e.g. from a legacy shortener or an export_urls dump.
+
+    python manage.py import_urls legacy.csv.gz --workers 4
+    python manage.py import_urls links.ndjson --on-conflict add-clicks --job legacy-2025
+    python manage.py import_urls legacy.csv --restart
+
+Records are normalized in worker processes and loaded in chunks, each in its own
+transaction together with the job checkpoint (see ImportCheckpoint), so an
+interrupted run resumes where it stopped without loading anything twice.
+"""
+
+import itertools
+import multiprocessing
+import os
+import time
+from collections import deque
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from urls import owners, summary
+from urls.bloom import code_filter
+from urls.cache import link_cache
+from urls.importer import (
+    CONFLICT_POLICIES, ImportConflict, get_loader, open_input, prepare_chunk, read_records,
+)
+from urls.models import ImportCheckpoint, URLModel
+
+
+class Command(BaseCommand):
+    help = 'Load (short_code, url, clicks, created_at) records from CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with header) or NDJSON file, optionally .gz')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Default: from the file extension')
+        parser.add_argument('--on-conflict', choices=CONFLICT_POLICIES, default='skip',
+                            help='When a short code already exists: keep it (skip), add the imported clicks, '
+                                 'overwrite it (replace) or abort (error)')
+        parser.add_argument('--allocate-missing', action='store_true',
+                            help='Shorten records without a short code like /api/shorten/bulk '
+                                 '(their clicks and created_at are not imported)')
+        parser.add_argument('--chunk-size', type=int, default=20000, help='Records per transaction')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Normalization processes (1 = in-process)')
+        parser.add_argument('--job', help='Checkpoint name (default: the file name)')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'No such file: {path}')
+        fmt = options['format'] or ('ndjson' if '.ndjson' in path or '.jsonl' in path else 'csv')
+        job = options['job'] or os.path.basename(path)
+
+        checkpoint, _ = ImportCheckpoint.objects.get_or_create(job=job)
+        if options['restart']:
+            checkpoint.records_done = 0
+            checkpoint.save()
+        resume_from = checkpoint.records_done
+        if resume_from:
+            self.stdout.write(f'Resuming job {job!r} after {resume_from:,} record(s)')
+
+        self.loader = get_loader(options['on_conflict'])
+        self.allocate_missing = options['allocate_missing']
+        self.totals = dict.fromkeys(('records', 'inserted', 'updated', 'skipped', 'rejected'), 0)
+        self.started = time.perf_counter()
+
+        with open_input(path) as f:
+            records = itertools.islice(read_records(f, fmt), resume_from, None)
+            chunks = iter(lambda: list(itertools.islice(records, options['chunk_size'])), [])
+            try:
+                for consumed, rows, rejected in self._prepare(chunks, options['workers']):
+                    self._load(checkpoint, consumed, rows, rejected)
+            except ImportConflict as e:
+                raise CommandError(f'{e} (use --on-conflict to choose another policy)')
+            finally:
+                summary.invalidate()
+                code_filter.request_rebuild()
+
+        t = self.totals
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {t['records']:,} record(s) in {time.perf_counter() - self.started:.1f}s; "
+            f"{t['inserted']:,} inserted, {t['updated']:,} updated, {t['skipped']:,} skipped, "
+            f"{t['rejected']:,} rejected"
+        ))
+
+    def _prepare(self, chunks, workers):
+        """Yield prepare_chunk() results in input order, at most 2 chunks per worker in flight"""
+        if workers <= 1:
+            yield from map(prepare_chunk, chunks)
+            return
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(prepare_chunk, (chunk,)))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+
+    def _load(self, checkpoint, consumed, rows, rejected):
+        with_code = [row for row in rows if row[0] is not None]
+        without_code = [row[1] for row in rows if row[0] is None]
+        if not self.allocate_missing:
+            rejected += len(without_code)
+            without_code = []
+
+        with transaction.atomic():
+            result = self.loader.load(with_code)
+            if result.replaced_codes:
+                # Overwritten click counts bypass the signals that keep OwnerStats in step
+                owners.recount(set(URLModel.objects.filter(
+                    short_code__in=result.replaced_codes, owner__isnull=False,
+                ).values_list('owner_id', flat=True)))
+            if without_code:
+                created = sum(c for _, c in URLModel.bulk_get_or_create(without_code).values())
+                result.inserted += created
+                result.skipped += len(without_code) - created
+            checkpoint.records_done += consumed
+            checkpoint.save(update_fields=['records_done', 'updated_at'])
+        if result.replaced_codes:
+            link_cache.invalidate_many(result.replaced_codes)
+
+        t = self.totals
+        t['records'] += consumed
+        t['inserted'] += result.inserted
+        t['updated'] += result.updated
+        t['skipped'] += result.skipped
+        t['rejected'] += rejected
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            f"\r{t['records']:,} records ({t['records'] / elapsed:,.0f}/s): {t['inserted']:,} inserted, "
+            f"{t['updated']:,} updated, {t['skipped']:,} skipped, {t['rejected']:,} rejected",
+            ending='',
+        )
+        self.stdout.flush()
@@ -0,0 +1,41 @@
+# backend/urls/management/commands/ingest_clicks.py
+"""
+Load the click event log into ClickEvent (see urls/clicklog.py).
+
+    python manage.py ingest_clicks                 # one pass over every segment
+    python manage.py ingest_clicks --follow        # keep tailing, every --interval seconds
+    python manage.py ingest_clicks --dir /var/log/linkcrush/clicks
+
+Offsets are committed with every chunk, so the command can be stopped and
+restarted at any point. Run one consumer per log directory.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from urls import clicklog
+
+
+class Command(BaseCommand):
+    help = 'Bulk-load click event log segments into the click_events table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Segment directory (default: CLICK_LOG_DIR)')
+        parser.add_argument('--follow', action='store_true', help='Keep tailing new events')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between passes with --follow')
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.CLICK_LOG_DIR
+        while True:
+            started = time.perf_counter()
+            loaded, skipped, segments = clicklog.ingest(directory)
+            if loaded or skipped or not options['follow']:
+                message = f'Loaded {loaded} click event(s) from {segments} segment(s) in {time.perf_counter() - started:.1f}s'
+                if skipped:
+                    message += f', skipped {skipped} malformed line(s)'
+                self.stdout.write(self.style.SUCCESS(message))
+            if not options['follow']:
+                break
+            time.sleep(options['interval'])
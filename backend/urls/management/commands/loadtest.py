@@ -0,0 +1,148 @@
+# backend/urls/management/commands/loadtest.py
+"""
+Closed-loop HTTP load driver for a running server (runserver, gunicorn, uvicorn).
+
+    python manage.py seed_urls --count 100000
+    python manage.py loadtest --url http://127.0.0.1:8000 --concurrency 32 --duration 30
+    python manage.py loadtest --shorten-ratio 0.05 --miss-ratio 0.01
+
+Short codes are read from the configured database (the most clicked --codes rows)
+and requested with a Zipf-like skew, so run it against the same database the
+server uses. Redirects are not followed. Reports p50/p95/p99 latency and req/s.
+Links created by --shorten-ratio are deleted at the end of the run.
+"""
+
+import bisect
+import http.client
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from urls.benchmarks import BENCH_HOST, delete_bench_rows, latency_summary
+from urls.models import URLModel
+
+
+class Command(BaseCommand):
+    help = 'Drive redirect/shorten traffic at a running server and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server base URL')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+        parser.add_argument('--requests', type=int, help='Stop after this many requests instead')
+        parser.add_argument('--codes', type=int, default=10_000, help='Number of distinct short codes to request')
+        parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent for code popularity (0 = uniform)')
+        parser.add_argument('--miss-ratio', type=float, default=0.0, help='Fraction of redirects to unknown codes')
+        parser.add_argument('--shorten-ratio', type=float, default=0.0, help='Fraction of requests that POST /api/shorten')
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        target = urlsplit(options['url'])
+        if target.scheme not in ('http', 'https') or not target.netloc:
+            raise CommandError('--url must be an http(s) base URL')
+
+        codes = list(
+            URLModel.objects.order_by('-click_count')
+            .values_list('short_code', flat=True)[:options['codes']]
+        )
+        if not codes and options['shorten_ratio'] < 1:
+            raise CommandError('No short codes in the database; run seed_urls first')
+
+        skew = options['skew']
+        cumulative = list(itertools.accumulate(1 / (rank + 1) ** skew for rank in range(len(codes))))
+        deadline = time.monotonic() + options['duration']
+        budget = itertools.count() if options['requests'] else None
+        shorten_counter = itertools.count()
+        run_id = f'{time.time_ns()}'
+
+        latencies = defaultdict(list)
+        statuses = Counter()
+        errors = Counter()
+        lock = threading.Lock()
+
+        def next_request(rng):
+            if options['requests'] is not None:
+                if next(budget) >= options['requests']:
+                    return None
+            elif time.monotonic() >= deadline:
+                return None
+            if rng.random() < options['shorten_ratio']:
+                body = json.dumps({'url': f'https://{BENCH_HOST}/load/{run_id}/{next(shorten_counter)}'})
+                return 'shorten', 'POST', '/api/shorten', body
+            if rng.random() < options['miss_ratio']:
+                return 'redirect', 'GET', f'/zz{rng.randrange(10 ** 7)}/', None
+            code = codes[bisect.bisect_left(cumulative, rng.random() * cumulative[-1])]
+            return 'redirect', 'GET', f'/{code}/', None
+
+        def connect():
+            cls = http.client.HTTPSConnection if target.scheme == 'https' else http.client.HTTPConnection
+            return cls(target.netloc, timeout=30)
+
+        def worker(seed):
+            rng = random.Random(seed)
+            conn = connect()
+            local_latencies = defaultdict(list)
+            local_statuses = Counter()
+            local_errors = Counter()
+            while True:
+                req = next_request(rng)
+                if req is None:
+                    break
+                kind, method, path, body = req
+                headers = {'Content-Type': 'application/json'} if body else {}
+                start = time.perf_counter()
+                try:
+                    conn.request(method, target.path.rstrip('/') + path, body=body, headers=headers)
+                    response = conn.getresponse()
+                    response.read()
+                except (OSError, http.client.HTTPException) as e:
+                    local_errors[type(e).__name__] += 1
+                    conn.close()
+                    conn = connect()
+                    continue
+                local_latencies[kind].append(time.perf_counter() - start)
+                local_statuses[response.status] += 1
+            conn.close()
+            with lock:
+                for kind, samples in local_latencies.items():
+                    latencies[kind].extend(samples)
+                statuses.update(local_statuses)
+                errors.update(local_errors)
+
+        base_seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        threads = [
+            threading.Thread(target=worker, args=(base_seed + i,), daemon=True)
+            for i in range(options['concurrency'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = sum(len(samples) for samples in latencies.values())
+        self.stdout.write(
+            f"{total:,} requests in {elapsed:.1f}s with concurrency {options['concurrency']}: "
+            f"{total / elapsed:,.0f} req/s"
+        )
+        self.stdout.write(f"{'op':<10}{'count':>10}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}{'max (ms)':>11}")
+        for kind, samples in sorted(latencies.items()):
+            s = latency_summary(samples)
+            self.stdout.write(
+                f"{kind:<10}{s['count']:>10,}{s['p50'] * 1000:>11.2f}{s['p95'] * 1000:>11.2f}"
+                f"{s['p99'] * 1000:>11.2f}{s['max'] * 1000:>11.2f}"
+            )
+        self.stdout.write('Status codes: ' + ', '.join(f'{code}={n:,}' for code, n in sorted(statuses.items())))
+        if errors:
+            self.stdout.write(self.style.WARNING(
+                'Connection errors: ' + ', '.join(f'{name}={n:,}' for name, n in errors.most_common())
+            ))
+        if options['shorten_ratio']:
+            self.stdout.write(f'Deleted {delete_bench_rows():,} link(s) created by the run')
@@ -0,0 +1,61 @@
+# backend/urls/management/commands/purge_expired.py
+"""
+Delete expired links in small batches (see urls/expiry.py).
+
+    python manage.py purge_expired
+    python manage.py purge_expired --batch-size 500 --sleep 0.1 --recycle
+    python manage.py purge_expired --interval 300   # keep running as a worker
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from urls import expiry
+
+
+class Command(BaseCommand):
+    help = 'Delete links whose expiry has passed, a bounded batch per transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=expiry.PURGE_BATCH_SIZE)
+        parser.add_argument('--limit', type=int, default=0, help='Stop after this many links (0: no limit)')
+        parser.add_argument('--sleep', type=float, default=0.0, help='Pause between batches (seconds)')
+        parser.add_argument('--interval', type=float, default=0.0,
+                            help='Purge again every N seconds instead of exiting')
+        recycle = parser.add_mutually_exclusive_group()
+        recycle.add_argument('--recycle', dest='recycle', action='store_true', default=None,
+                             help='Queue purged codes for reuse (default: SHORT_CODE_RECYCLE)')
+        recycle.add_argument('--no-recycle', dest='recycle', action='store_false')
+        parser.add_argument('--dry-run', action='store_true', help='Only count expired links')
+
+    def purge(self, options):
+        limit = options['limit']
+        purged = 0
+        while not limit or purged < limit:
+            batch_size = min(options['batch_size'], limit - purged) if limit else options['batch_size']
+            deleted = expiry.purge_batch(batch_size=batch_size, recycle=options['recycle'])
+            purged += deleted
+            if deleted < batch_size:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        return purged
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'{expiry.count_expired()} expired link(s) to purge')
+            return
+
+        recycle = settings.SHORT_CODE_RECYCLE if options['recycle'] is None else options['recycle']
+        while True:
+            started = time.perf_counter()
+            purged = self.purge(options)
+            self.stdout.write(self.style.SUCCESS(
+                f'Purged {purged} expired link(s) in {time.perf_counter() - started:.1f}s'
+                + (' (codes queued for reuse)' if recycle and purged else '')
+            ))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,104 @@
+# backend/urls/management/commands/startup_report.py
+"""
+Cold-start cost of each settings profile, measured in fresh interpreters.
+
+    python manage.py startup_report
+    python manage.py startup_report --profile urlshortener.settings_redirect --runs 5 --json
+
+For each profile a new Python process builds the WSGI application and loads
+the URLconf (everything a worker does before its first request), then reports
+its boot time, resident memory and which heavy packages it imported. The
+fastest of --runs is reported so disk cache warmup doesn't skew the numbers.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_PROFILES = ('urlshortener.settings', 'urlshortener.settings_redirect')
+
+# Packages a redirect-only worker shouldn't need
+HEAVY_MODULES = (
+    'django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages', 'django.contrib.staticfiles',
+    'rest_framework', 'rest_framework_simplejwt', 'corsheaders', 'whitenoise', 'validators',
+)
+
+PROBE = '''
+import json, resource, sys, time
+started = time.perf_counter()
+
+def rss_mb():
+    # Current RSS; ru_maxrss would include the parent's peak, inherited across fork/exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+from django.conf import settings
+print(json.dumps({
+    "django_seconds": time.perf_counter() - started,
+    "rss_mb": rss_mb(),
+    "modules": len(sys.modules),
+    "apps": len(settings.INSTALLED_APPS),
+    "middleware": len(settings.MIDDLEWARE),
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+class Command(BaseCommand):
+    help = 'Measure worker boot time, RSS and imported packages per settings profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profile', action='append', dest='profiles',
+                            help='Settings module to measure (repeatable; default: full and redirect-only)')
+        parser.add_argument('--runs', type=int, default=3)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def _probe(self, profile):
+        backend_dir = Path(__file__).resolve().parents[3]
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=profile)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(backend_dir), env.get('PYTHONPATH')]))
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-c', PROBE], cwd=backend_dir, env=env, capture_output=True, text=True,
+        )
+        elapsed = time.perf_counter() - started
+        if proc.returncode != 0:
+            raise CommandError(f'{profile} failed to start:\n{proc.stderr.strip()}')
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result['process_seconds'] = elapsed
+        return result
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in options['profiles'] or DEFAULT_PROFILES:
+            runs = [self._probe(profile) for _ in range(max(options['runs'], 1))]
+            results[profile] = min(runs, key=lambda run: run['process_seconds'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'profile':<36} {'process':>9} {'django':>9} {'rss MB':>8} {'modules':>8} {'apps':>5} {'mw':>4}"
+        )
+        for profile, r in results.items():
+            self.stdout.write(
+                f"{profile:<36} {r['process_seconds'] * 1000:>7.0f}ms {r['django_seconds'] * 1000:>7.0f}ms "
+                f"{r['rss_mb']:>8.1f} {r['modules']:>8} {r['apps']:>5} {r['middleware']:>4}"
+            )
+            self.stdout.write(f"    heavy imports: {', '.join(r['heavy']) or 'none'}")
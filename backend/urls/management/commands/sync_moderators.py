@@ -0,0 +1,27 @@
+# backend/urls/management/commands/sync_moderators.py
+"""
+Reconcile Moderators group membership for every user, e.g. after users were
+bulk imported or flags were changed with queryset.update() (no signals).
+
+    python manage.py sync_moderators
+    python manage.py sync_moderators --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+
+from urls import moderators
+
+
+class Command(BaseCommand):
+    help = 'Add staff (non-superuser) users to the Moderators group and remove everyone else'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change')
+
+    def handle(self, *args, **options):
+        added, removed = moderators.sync_all(dry_run=options['dry_run'])
+        group = moderators.MODERATORS_GROUP
+        if options['dry_run']:
+            self.stdout.write(f'Would add {added} user(s) to {group} and remove {removed}')
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Added {added} user(s) to {group} and removed {removed}'))
@@ -0,0 +1,382 @@
+# backend/urls/metrics.py
+"""
+In-process metrics in the Prometheus text exposition format (GET /api/metrics).
+
+Counters and histograms keep one shard per thread: the first observation on a
+thread registers its shard under a lock, after that recording is a plain
+dict/list update with no locking. Scrapes sum the shards. Database time is
+attributed to the current request through a context variable and an execute
+wrapper installed on every new connection. Component state is read from its
+owners at scrape time: levels (buffer depths, hit ratios, replica lag) as
+gauges, and monotonic counts (hits, flushes, failures, drops) as *_total
+counters so rate() copes with restarts.
+
+Values are per worker process; scrape each worker or aggregate upstream.
+Scrapes must come from METRICS_ALLOWED_IPS or carry METRICS_TOKEN as a
+bearer token (scrape_allowed()).
+"""
+
+import bisect
+import contextvars
+import functools
+import hmac
+import ipaddress
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+from . import dbpool
+from .ratelimit import client_ip
+
+# Seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Per-thread shards of {label values: state}, merged on read"""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshot(self):
+        with self._lock:
+            shards = list(self._shards)
+        merged = {}
+        for shard in shards:
+            for key, state in list(shard.items()):
+                merged[key] = self._merge(merged.get(key), state)
+        return merged
+
+
+class Counter(_Sharded):
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    @staticmethod
+    def _merge(total, value):
+        return value if total is None else total + value
+
+    def collect(self):
+        for labelvalues, value in sorted(self._snapshot().items()):
+            yield self.name, zip(self.labelnames, labelvalues), value
+
+
+class Histogram(_Sharded):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        shard = self._shard()
+        state = shard.get(labelvalues)
+        if state is None:
+            # one count per bucket plus +Inf, then the sum
+            state = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @staticmethod
+    def _merge(total, state):
+        return list(state) if total is None else [a + b for a, b in zip(total, state)]
+
+    def collect(self):
+        for labelvalues, state in sorted(self._snapshot().items()):
+            labels = list(zip(self.labelnames, labelvalues))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float('inf')), state):
+                cumulative += count
+                yield f'{self.name}_bucket', labels + [('le', _format_value(bound))], cumulative
+            yield f'{self.name}_sum', labels, state[-1]
+            yield f'{self.name}_count', labels, cumulative
+
+
+class Gauge:
+    """Read at scrape time from a callable returning [(labelvalues, value), ...]"""
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames, read):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.read = read
+
+    def collect(self):
+        for labelvalues, value in self.read():
+            yield self.name, zip(self.labelnames, labelvalues), value
+
+
+class ScrapedCounter(Gauge):
+    """A monotonic count kept by its owner (reset only by a restart), read at scrape time"""
+    kind = 'counter'
+
+
+REQUEST_DURATION = Histogram(
+    'linkcrush_request_duration_seconds', 'Request latency by URL name', ['view'],
+)
+REQUESTS = Counter(
+    'linkcrush_requests_total', 'Requests by URL name and status code', ['view', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'linkcrush_request_db_queries', 'Database queries per request', ['view'], buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    'linkcrush_request_db_seconds', 'Database time per request', ['view'],
+)
+
+_registry = [REQUEST_DURATION, REQUESTS, REQUEST_QUERIES, REQUEST_DB_TIME]
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render():
+    """All registered metrics in the text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for name, labels, value in metric.collect():
+            lines.append(f'{name}{_format_labels(list(labels))} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+@functools.lru_cache(maxsize=4)
+def _allowed_networks(entries):
+    return tuple(ipaddress.ip_network(entry, strict=False) for entry in entries)
+
+
+def scrape_allowed(request):
+    """True if the request carries METRICS_TOKEN or comes from METRICS_ALLOWED_IPS"""
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip().encode(), token.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(client_ip(request))
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks(tuple(settings.METRICS_ALLOWED_IPS)))
+
+
+# -------------------------
+# Per-request database time
+# -------------------------
+
+# [queries, seconds] for the request being served, None outside requests
+_request_db = contextvars.ContextVar('linkcrush_request_db', default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _request_db.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+
+
+def _install_query_recorder(sender, connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(_install_query_recorder)
+
+
+def begin_request():
+    stats = [0, 0.0]
+    return stats, _request_db.set(stats)
+
+
+def end_request(view, status, started, stats, token):
+    _request_db.reset(token)
+    REQUEST_DURATION.observe(time.perf_counter() - started, view)
+    REQUESTS.inc(view, status)
+    REQUEST_QUERIES.observe(stats[0], view)
+    REQUEST_DB_TIME.observe(stats[1], view)
+
+
+# -------------------------
+# Scrape-time gauges and counters
+# -------------------------
+
+def _link_cache_tiers():
+    from .cache import link_cache
+
+    stats = link_cache.stats()
+    return (
+        ('local', stats['local']['hits'], stats['local']['misses']),
+        ('shared', stats['shared']['hits'], stats['shared']['misses']),
+    )
+
+
+def _read_link_cache_lookups():
+    for tier, hits, misses in _link_cache_tiers():
+        yield (tier, 'hit'), hits
+        yield (tier, 'miss'), misses
+
+
+def _read_link_cache_hit_ratio():
+    for tier, hits, misses in _link_cache_tiers():
+        total = hits + misses
+        yield (tier,), round(hits / total, 6) if total else 0.0
+
+
+def _read_component_levels():
+    """Current sizes: buffered items, tracked keys"""
+    from .analytics import click_aggregator
+    from .clicklog import click_log
+    from .clicks import click_buffer
+    from .ratelimit import rate_limiter
+    from .trending import tracker as trending_tracker
+
+    yield ('click_buffer', 'depth'), click_buffer.stats()['depth']
+    yield ('analytics', 'depth'), click_aggregator.stats()['depth']
+    if settings.TRENDING_ENABLED:
+        yield ('trending', 'codes'), trending_tracker.stats()['codes']
+    if settings.CLICK_LOG_ENABLED:
+        yield ('click_log', 'depth'), click_log.stats()['depth']
+    limits = rate_limiter.stats()
+    if limits['enabled']:
+        yield ('rate_limit', 'keys'), limits['keys']
+
+
+def _read_component_events():
+    """Monotonic counts: flushes, failures, drops, hits"""
+    from .analytics import click_aggregator
+    from .bloom import code_filter
+    from .clicklog import click_log
+    from .clicks import click_buffer
+    from .normalize import stats as normalize_stats
+    from .ratelimit import rate_limiter
+    from .trending import tracker as trending_tracker
+
+    clicks = click_buffer.stats()
+    yield ('click_buffer', 'flushes'), clicks['flushes']
+    yield ('click_buffer', 'failures'), clicks['failures']
+    analytics = click_aggregator.stats()
+    yield ('analytics', 'dropped'), analytics['dropped']
+    yield ('analytics', 'failures'), analytics['failures']
+    if settings.TRENDING_ENABLED:
+        yield ('trending', 'failures'), trending_tracker.stats()['failures']
+    if settings.CLICK_LOG_ENABLED:
+        log = click_log.stats()
+        for event in ('appended', 'dropped', 'failures'):
+            yield ('click_log', event), log[event]
+    yield ('code_filter', 'negatives'), code_filter.negatives
+    yield ('code_filter', 'journal_codes'), code_filter.journal_codes
+    memo = normalize_stats()['cache']
+    yield ('normalize_memo', 'hits'), memo['hits']
+    yield ('normalize_memo', 'misses'), memo['misses']
+    limits = rate_limiter.stats()
+    if limits['enabled']:
+        for event in ('allowed', 'denied', 'leases'):
+            yield ('rate_limit', event), limits[event]
+
+
+def _read_normalize_stages(field):
+    from .normalize import stats as normalize_stats
+
+    for stage, entry in normalize_stats()['stages'].items():
+        yield (stage,), entry[field]
+
+
+def _read_replica_healthy():
+    from .routers import stats as replica_stats
+
+    for alias, replica in replica_stats().items():
+        yield (alias,), int(replica['healthy'])
+
+
+def _read_replica_lag():
+    from .routers import stats as replica_stats
+
+    for alias, replica in replica_stats().items():
+        if replica['lag_seconds'] is not None:
+            yield (alias,), replica['lag_seconds']
+
+
+def _read_db_connections():
+    for alias, entry in dbpool.stats().items():
+        yield (alias, 'open'), entry['open']
+        yield (alias, 'oldest_seconds'), entry['oldest_seconds']
+
+
+def _read_db_connections_opened():
+    for alias, entry in dbpool.stats().items():
+        yield (alias,), entry['opened']
+
+
+register(ScrapedCounter(
+    'linkcrush_link_cache_lookups_total', 'Redirect link cache lookups by tier and result',
+    ['tier', 'result'], _read_link_cache_lookups,
+))
+register(Gauge('linkcrush_link_cache_hit_ratio', 'Redirect link cache hit ratio by tier', ['tier'], _read_link_cache_hit_ratio))
+register(Gauge(
+    'linkcrush_component', 'Current size of background buffers, trending sketches and rate limiter state',
+    ['component', 'stat'], _read_component_levels,
+))
+register(ScrapedCounter(
+    'linkcrush_component_events_total', 'Flushes, failures, drops and hits of background components',
+    ['component', 'event'], _read_component_events,
+))
+register(ScrapedCounter(
+    'linkcrush_normalize_stage_calls_total', 'URL normalization stage runs (memo misses only)',
+    ['stage'], lambda: _read_normalize_stages('calls'),
+))
+register(ScrapedCounter(
+    'linkcrush_normalize_stage_seconds_total', 'Time spent in each URL normalization stage',
+    ['stage'], lambda: ((labels, us / 1e6) for labels, us in _read_normalize_stages('total_us')),
+))
+register(Gauge('linkcrush_replica_healthy', 'Whether the read replica is in use (1) or skipped (0)', ['alias'], _read_replica_healthy))
+register(Gauge('linkcrush_replica_lag_seconds', 'Replication lag at the last health check', ['alias'], _read_replica_lag))
+register(Gauge('linkcrush_db_connections', 'Open database connections and the age of the oldest, per alias', ['alias', 'stat'], _read_db_connections))
+register(ScrapedCounter(
+    'linkcrush_db_connections_opened_total', 'Database connections opened per alias', ['alias'], _read_db_connections_opened,
+))
@@ -0,0 +1,158 @@
+# backend/urls/middleware.py
+"""
+Middleware for Link Crush
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metrics, routers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+# Holds the unix time until which the client reads from the primary
+REPLICA_PIN_COOKIE = 'linkcrush_primary'
+
+
+class AsyncWhiteNoiseMiddleware:
+    """
+    WhiteNoise for both WSGI and ASGI.
+    WhiteNoise 6 is sync-only, which under ASGI would push every request
+    (redirects included) through the thread pool. Here only requests under
+    the static prefix take that hop; everything else stays on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        # Imported here so profiles without this middleware never load whitenoise
+        from whitenoise.middleware import WhiteNoiseMiddleware
+
+        self.get_response = get_response
+        self.whitenoise = WhiteNoiseMiddleware(get_response)
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.whitenoise(request)
+
+    async def __acall__(self, request):
+        if request.path_info.startswith(self.whitenoise.static_prefix):
+            response = await sync_to_async(self._serve_static, thread_sensitive=False)(request)
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def _serve_static(self, request):
+        whitenoise = self.whitenoise
+        if whitenoise.autorefresh:
+            static_file = whitenoise.find_file(request.path_info)
+        else:
+            static_file = whitenoise.files.get(request.path_info)
+        if static_file is None:
+            return None
+        return whitenoise.serve(static_file, request)
+
+
+class MetricsMiddleware:
+    """
+    Records latency, status, and database query count/time per URL name
+    (e.g. redirect_url, shorten_url, get_stats). Unresolved requests (static
+    files, 404s) share the 'other' label so scanners can't blow up cardinality.
+    Goes first in MIDDLEWARE so the timings include the rest of the stack.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        return (match.url_name if match else None) or 'other'
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        started = time.perf_counter()
+        stats, token = metrics.begin_request()
+        status = 500
+        try:
+            response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            metrics.end_request(self._view_name(request), status, started, stats, token)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        stats, token = metrics.begin_request()
+        status = 500
+        try:
+            response = await self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            metrics.end_request(self._view_name(request), status, started, stats, token)
+
+
+class ReplicaPinningMiddleware:
+    """
+    Read-your-writes for replica routing (routers.py). A successful unsafe
+    request (shorten, delete, admin edits) sets a short-lived cookie; requests
+    carrying it, and unsafe requests themselves, read from the primary.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _pinned(request):
+        if request.method not in SAFE_METHODS:
+            return True
+        try:
+            return float(request.COOKIES.get(REPLICA_PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    @staticmethod
+    def _pin(request, response):
+        if request.method in SAFE_METHODS or response.status_code >= 400:
+            return response
+        pin_seconds = settings.REPLICA_PIN_SECONDS
+        response.set_cookie(
+            REPLICA_PIN_COOKIE, str(int(time.time() + pin_seconds)), max_age=pin_seconds,
+            httponly=True, secure=settings.SESSION_COOKIE_SECURE, samesite=settings.SESSION_COOKIE_SAMESITE,
+        )
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with routers.pin_primary(self._pinned(request)):
+            response = self.get_response(request)
+        return self._pin(request, response)
+
+    async def __acall__(self, request):
+        with routers.pin_primary(self._pinned(request)):
+            response = await self.get_response(request)
+        return self._pin(request, response)
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.22 on 2026-10-17 06:59
+
+import hashlib
+
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 5000
+
+
+def backfill_url_hashes(apps, schema_editor):
+    """
+    Hash existing rows in id order, one committed batch at a time, so the
+    backfill can be interrupted and resumed on large tables. Rows whose URL
+    is already claimed by an earlier row (legacy duplicates) keep NULL.
+    """
+    URLModel = apps.get_model('urls', 'URLModel')
+    db = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        with transaction.atomic(using=db):
+            rows = list(
+                URLModel.objects.using(db)
+                .filter(id__gt=last_id, url_hash__isnull=True)
+                .order_by('id')
+                .values_list('id', 'original_url')[:BATCH_SIZE]
+            )
+            if not rows:
+                break
+            last_id = rows[-1][0]
+
+            hashes = [(pk, hashlib.sha256(url.encode('utf-8')).hexdigest()) for pk, url in rows]
+            taken = set(
+                URLModel.objects.using(db)
+                .filter(url_hash__in={h for _, h in hashes})
+                .values_list('url_hash', flat=True)
+            )
+            updates = []
+            for pk, url_hash in hashes:
+                if url_hash in taken:
+                    continue
+                taken.add(url_hash)
+                updates.append(URLModel(id=pk, url_hash=url_hash))
+            URLModel.objects.using(db).bulk_update(updates, ['url_hash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    # Each backfill batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('urls', '0002_short_code_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='urlmodel',
+            name='url_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='urlmodel',
+            constraint=models.UniqueConstraint(fields=('url_hash',), name='urls_url_hash_uniq'),
+        ),
+        # The unique index exists before the backfill so its duplicate probes are index lookups
+        migrations.RunPython(backfill_url_hashes, migrations.RunPython.noop),
+    ]
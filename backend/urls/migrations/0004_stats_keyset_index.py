@@ -0,0 +1,21 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0003_url_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='urlmodel',
+            index=models.Index(fields=['created_at', 'id'], name='urls_created_id_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='urlmodel',
+            name='urls_created_71be6f_idx',
+        ),
+    ]
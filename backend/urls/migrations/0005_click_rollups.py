@@ -0,0 +1,49 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0004_stats_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClickRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=6)),
+                ('bucket', models.DateTimeField()),
+                ('clicks', models.IntegerField(default=0)),
+                ('url', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='urls.urlmodel')),
+            ],
+            options={
+                'db_table': 'click_rollups',
+            },
+        ),
+        migrations.CreateModel(
+            name='ClickBreakdown',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(choices=[('referrer', 'Referrer host'), ('ua', 'User agent family')], max_length=8)),
+                ('value', models.CharField(blank=True, max_length=255)),
+                ('clicks', models.IntegerField(default=0)),
+                ('url', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='breakdowns', to='urls.urlmodel')),
+            ],
+            options={
+                'db_table': 'click_breakdowns',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='clickrollup',
+            constraint=models.UniqueConstraint(fields=('url', 'granularity', 'bucket'), name='click_rollups_bucket_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='clickbreakdown',
+            constraint=models.UniqueConstraint(fields=('url', 'day', 'dimension', 'value'), name='click_breakdowns_uniq'),
+        ),
+    ]
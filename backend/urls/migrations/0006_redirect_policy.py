@@ -0,0 +1,28 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0005_click_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='urlmodel',
+            name='cache_max_age',
+            field=models.PositiveIntegerField(blank=True, help_text='Cache-Control max-age in seconds for untracked links (blank: REDIRECT_CACHE_MAX_AGE)', null=True),
+        ),
+        migrations.AddField(
+            model_name='urlmodel',
+            name='redirect_status',
+            field=models.PositiveSmallIntegerField(choices=[(301, '301 Moved Permanently'), (302, '302 Found'), (307, '307 Temporary Redirect'), (308, '308 Permanent Redirect')], default=302),
+        ),
+        migrations.AddField(
+            model_name='urlmodel',
+            name='track_clicks',
+            field=models.BooleanField(default=True, help_text='Keep every visit coming back to the server so it is counted'),
+        ),
+    ]
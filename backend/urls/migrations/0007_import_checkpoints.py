@@ -0,0 +1,24 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0006_redirect_policy'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('job', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('records_done', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'import_checkpoints',
+            },
+        ),
+    ]
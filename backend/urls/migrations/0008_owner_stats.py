@@ -0,0 +1,58 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+
+
+def backfill_owner_stats(apps, schema_editor):
+    URLModel = apps.get_model('urls', 'URLModel')
+    OwnerStats = apps.get_model('urls', 'OwnerStats')
+    db = schema_editor.connection.alias
+    totals = (
+        URLModel.objects.using(db).filter(owner__isnull=False)
+        .values('owner').annotate(url_count=Count('id'), total_clicks=Sum('click_count'))
+        .order_by()
+    )
+    OwnerStats.objects.using(db).bulk_create(
+        [OwnerStats(owner_id=row['owner'], url_count=row['url_count'], total_clicks=row['total_clicks'] or 0)
+         for row in totals.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('urls', '0007_import_checkpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnerStats',
+            fields=[
+                ('owner', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='link_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('url_count', models.BigIntegerField(default=0)),
+                ('total_clicks', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'owner stats',
+                'db_table': 'owner_stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='urlmodel',
+            index=models.Index(fields=['owner', '-created_at', '-id'], name='urls_owner_created_idx'),
+        ),
+        # The composite index (owner first) replaces the FK's own index
+        migrations.AlterField(
+            model_name='urlmodel',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='urls', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_owner_stats, migrations.RunPython.noop),
+    ]
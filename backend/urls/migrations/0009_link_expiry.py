@@ -0,0 +1,38 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0008_owner_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecycledCode',
+            fields=[
+                ('short_code', models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ('released_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'recycled_codes',
+            },
+        ),
+        migrations.AddField(
+            model_name='urlmodel',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='urlmodel',
+            name='max_clicks',
+            field=models.PositiveIntegerField(blank=True, help_text='Expire the link after this many clicks (blank: unlimited)', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='urlmodel',
+            index=models.Index(condition=models.Q(('expires_at__isnull', False)), fields=['expires_at'], name='urls_expires_at_idx'),
+        ),
+    ]
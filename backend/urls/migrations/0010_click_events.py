@@ -0,0 +1,39 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0009_link_expiry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClickLogOffset',
+            fields=[
+                ('segment', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('offset', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'click_log_offsets',
+            },
+        ),
+        migrations.CreateModel(
+            name='ClickEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('short_code', models.CharField(max_length=10)),
+                ('clicked_at', models.DateTimeField()),
+                ('referrer', models.TextField(blank=True)),
+                ('country', models.CharField(blank=True, max_length=2)),
+                ('user_agent', models.TextField(blank=True)),
+            ],
+            options={
+                'db_table': 'click_events',
+                'indexes': [models.Index(fields=['short_code', 'clicked_at'], name='click_events_code_time_idx')],
+            },
+        ),
+    ]
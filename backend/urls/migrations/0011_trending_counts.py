@@ -0,0 +1,31 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0010_click_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(max_length=4)),
+                ('slot', models.DateTimeField()),
+                ('worker', models.CharField(max_length=64)),
+                ('short_code', models.CharField(max_length=10)),
+                ('clicks', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'trending_counts',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='trendingcount',
+            constraint=models.UniqueConstraint(fields=('period', 'slot', 'worker', 'short_code'), name='trending_counts_uniq'),
+        ),
+    ]
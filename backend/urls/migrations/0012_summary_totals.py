@@ -0,0 +1,26 @@
+# Generated by Django 4.2.22 on 2026-10-17 07:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('urls', '0011_trending_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SummaryTotals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_urls', models.BigIntegerField(default=0)),
+                ('total_clicks', models.BigIntegerField(default=0)),
+                ('resynced_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'summary totals',
+                'db_table': 'summary_totals',
+            },
+        ),
+    ]
@@ -3,18 +3,37 @@
 Django models for Link Crush
 """
 
+import hashlib
+
 from django.conf import settings
-from django.db import models
-from django.db.models import F
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, router, transaction
+from django.db.models import Q
+from django.dispatch import Signal
 from django.utils import timezone
-import string
-import random
+
+from .codegen import get_allocator
+
+# Sent with `instances` after URLModel rows are inserted without save() (bulk_create)
+urls_bulk_created = Signal()
+
+# Inserts retried when an allocated code collides with an existing row
+SHORT_CODE_MAX_ATTEMPTS = 5
+
+REDIRECT_STATUS_CHOICES = [
+    (301, '301 Moved Permanently'),
+    (302, '302 Found'),
+    (307, '307 Temporary Redirect'),
+    (308, '308 Permanent Redirect'),
+]
 
 class URLModel(models.Model):
     """
     Model to store shortened URLs
     """
     original_url = models.URLField(max_length=2048)
+    # sha256 of original_url; NULL only on legacy duplicates left by the backfill
+    url_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
     short_code = models.CharField(max_length=10, unique=True, db_index=True)
     click_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
@@ -25,6 +44,25 @@ class URLModel(models.Model):
         blank=True,
         on_delete=models.SET_NULL,
         related_name='urls',
+        # urls_owner_created_idx leads with owner_id
+        db_index=False,
+    )
+    # Redirect policy (see redirects.py); tracked links are always served uncacheable
+    redirect_status = models.PositiveSmallIntegerField(choices=REDIRECT_STATUS_CHOICES, default=302)
+    cache_max_age = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text='Cache-Control max-age in seconds for untracked links (blank: REDIRECT_CACHE_MAX_AGE)',
+    )
+    track_clicks = models.BooleanField(
+        default=True,
+        help_text='Keep every visit coming back to the server so it is counted',
+    )
+    # Expiry (see expiry.py): expired links answer 410 until purge_expired deletes them.
+    # Reaching max_clicks sets expires_at when the clicks are flushed.
+    expires_at = models.DateTimeField(null=True, blank=True)
+    max_clicks = models.PositiveIntegerField(
+        null=True, blank=True,
+        help_text='Expire the link after this many clicks (blank: unlimited)',
     )
 
     class Meta:
@@ -32,42 +70,336 @@ class URLModel(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['short_code']),
-            models.Index(fields=['created_at']),
+            # Keyset pagination on (created_at, id); also serves created_at range filters
+            models.Index(fields=['created_at', 'id'], name='urls_created_id_idx'),
             models.Index(fields=['click_count']),
+            # GET /api/me/urls: keyset pages over one owner's links
+            models.Index(fields=['owner', '-created_at', '-id'], name='urls_owner_created_idx'),
+            # purge_expired; partial, so links that never expire cost nothing
+            models.Index(fields=['expires_at'], name='urls_expires_at_idx', condition=Q(expires_at__isnull=False)),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['url_hash'], name='urls_url_hash_uniq'),
         ]
 
     def __str__(self):
         return f"{self.short_code} -> {self.original_url}"
 
+    @staticmethod
+    def hash_url(url):
+        """
+        Fixed-width digest used to dedupe URLs through an index probe
+        """
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_original_url = instance.__dict__.get('original_url')
+        # Compared on save to keep OwnerStats in step (see signals.py)
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        instance._loaded_click_count = instance.__dict__.get('click_count')
+        return instance
+
+    def is_expired(self, now=None):
+        return self.expires_at is not None and self.expires_at <= (now or timezone.now())
+
+    def _original_url_changed(self):
+        return self._state.adding or self.original_url != getattr(self, '_loaded_original_url', None)
+
+    def clean(self):
+        super().clean()
+        if self.original_url and self._original_url_changed():
+            duplicate = type(self).objects.filter(url_hash=self.hash_url(self.original_url)).exclude(pk=self.pk)
+            if duplicate.exists():
+                raise ValidationError({'original_url': 'A short link for this URL already exists.'})
+
     def save(self, *args, **kwargs):
         """
-        Generate short code if not provided
+        Keep url_hash in sync with original_url.
+
+        Generate short code if not provided.
+        Allocated codes are inserted without an existence probe; the unique
+        constraint catches the rare collision (e.g. with legacy random codes)
+        and the insert is retried with a fresh code.
         """
-        if not self.short_code:
+        if self._original_url_changed():
+            self.url_hash = self.hash_url(self.original_url)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'original_url' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'url_hash'}
+        self._loaded_original_url = self.original_url
+        if (self.max_clicks is not None and self.click_count >= self.max_clicks
+                and not self.is_expired() and kwargs.get('update_fields') is None):
+            # Limit lowered below the current count (admin edit)
+            self.expires_at = timezone.now()
+
+        if self.short_code:
+            super().save(*args, **kwargs)
+            return
+
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        connection = transaction.get_connection(using)
+        for attempt in range(SHORT_CODE_MAX_ATTEMPTS):
             self.short_code = self.generate_short_code()
-        super().save(*args, **kwargs)
+            try:
+                if connection.in_atomic_block:
+                    # A failed INSERT would otherwise poison the outer transaction
+                    with transaction.atomic(using=using):
+                        super().save(*args, **kwargs)
+                else:
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                collided = type(self).objects.using(using).filter(short_code=self.short_code).exists()
+                self.short_code = ''
+                if not collided or attempt == SHORT_CODE_MAX_ATTEMPTS - 1:
+                    raise
 
-    def generate_short_code(self, length=6):
+    @classmethod
+    def bulk_get_or_create(cls, urls, owner=None, expires_at=None, max_clicks=None):
         """
-        Generate a random short code
+        Resolve many normalized URLs at once: one IN lookup for the existing
+        ones and one bulk_create for the rest. Returns {url: (short_code, created)}.
+        Expired matches are deleted and replaced; expires_at/max_clicks only
+        apply to created links.
         """
-        characters = string.ascii_letters + string.digits
-        while True:
-            short_code = ''.join(random.choice(characters) for _ in range(length))
-            if not URLModel.objects.filter(short_code=short_code).exists():
-                return short_code
+        from .expiry import delete_links
+
+        pending = {cls.hash_url(url): url for url in dict.fromkeys(urls)}
+        result = {}
+        now = timezone.now()
+        expired = []
+        existing = cls.objects.filter(url_hash__in=list(pending)).values_list(
+            'url_hash', 'short_code', 'expires_at', 'id', 'owner_id', 'click_count',
+        )
+        for url_hash, short_code, expires_at, pk, owner_id, click_count in existing:
+            if expires_at is not None and expires_at <= now:
+                # Not purged yet; shorten the URL afresh
+                expired.append((pk, short_code, owner_id, click_count))
+            else:
+                result[pending.pop(url_hash)] = (short_code, False)
+        delete_links(expired)
+
+        allocator = get_allocator()
+        created_objs = []
+        for _ in range(SHORT_CODE_MAX_ATTEMPTS):
+            if not pending:
+                break
+            objs = [
+                cls(original_url=url, url_hash=url_hash, short_code=allocator.allocate(), owner=owner,
+                    expires_at=expires_at, max_clicks=max_clicks)
+                for url_hash, url in pending.items()
+            ]
+            # Rows losing a url_hash race or a short_code collision are skipped here,
+            # then either found below (race) or retried with fresh codes (collision)
+            cls.objects.bulk_create(objs, ignore_conflicts=True, batch_size=1000)
+            assigned = {obj.url_hash: obj for obj in objs}
+            for url_hash, short_code in cls.objects.filter(url_hash__in=list(pending)).values_list('url_hash', 'short_code'):
+                created = short_code == assigned[url_hash].short_code
+                result[pending.pop(url_hash)] = (short_code, created)
+                if created:
+                    created_objs.append(assigned[url_hash])
+
+        if created_objs:
+            urls_bulk_created.send(sender=cls, instances=created_objs)
+        if pending:
+            raise IntegrityError(f'Could not allocate unique short codes for {len(pending)} URL(s)')
+        return result
 
-    def increment_click_count(self):
+    def generate_short_code(self, length=None):
         """
-        Atomically increment click_count using a queryset update to avoid race conditions,
-        then refresh the instance from the database so `self.click_count` is up-to-date.
+        Allocate a short code (settings.SHORT_CODE_ALLOCATOR, settings.SHORT_CODE_LENGTH)
         """
-        # Perform atomic increment at DB level
-        type(self).objects.filter(pk=self.pk).update(click_count=F('click_count') + 1)
-
-        # Refresh only the click_count field for this instance
-        try:
-            self.refresh_from_db(fields=['click_count'])
-        except Exception:
-            # Fallback to full refresh if fields param not supported (depends on Django version)
-            self.refresh_from_db()
+        return get_allocator(length).allocate()
+
+
+class ShortCodeSequence(models.Model):
+    """
+    Named counter that short code allocators reserve blocks of ids from
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    next_value = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'short_code_sequences'
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
+
+class RecycledCode(models.Model):
+    """
+    Short code of a purged link, handed out again once it has been released
+    for SHORT_CODE_RECYCLE_AFTER seconds (see codegen.RecyclingAllocator)
+    """
+    short_code = models.CharField(max_length=10, primary_key=True)
+    released_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'recycled_codes'
+
+    def __str__(self):
+        return f"{self.short_code} (released {self.released_at:%Y-%m-%d})"
+
+
+class ClickRollup(models.Model):
+    """
+    Pre-aggregated click counts per URL and time bucket
+    """
+    MINUTE = 'minute'
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [(MINUTE, 'Minute'), (HOUR, 'Hour'), (DAY, 'Day')]
+
+    url = models.ForeignKey(URLModel, on_delete=models.CASCADE, related_name='rollups')
+    granularity = models.CharField(max_length=6, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    clicks = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'click_rollups'
+        constraints = [
+            # Also the index behind timeseries range reads
+            models.UniqueConstraint(fields=['url', 'granularity', 'bucket'], name='click_rollups_bucket_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.url_id} {self.granularity} {self.bucket:%Y-%m-%d %H:%M}: {self.clicks}"
+
+
+class ClickBreakdown(models.Model):
+    """
+    Daily click counts per URL by referrer host or user agent family
+    """
+    REFERRER = 'referrer'
+    USER_AGENT = 'ua'
+    DIMENSION_CHOICES = [(REFERRER, 'Referrer host'), (USER_AGENT, 'User agent family')]
+
+    url = models.ForeignKey(URLModel, on_delete=models.CASCADE, related_name='breakdowns')
+    day = models.DateField()
+    dimension = models.CharField(max_length=8, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=255, blank=True)
+    clicks = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'click_breakdowns'
+        constraints = [
+            models.UniqueConstraint(fields=['url', 'day', 'dimension', 'value'], name='click_breakdowns_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.url_id} {self.day} {self.dimension}={self.value}: {self.clicks}"
+
+
+class ClickEvent(models.Model):
+    """
+    One redirect, loaded from the click event log by ingest_clicks (see clicklog.py).
+    Keyed by short code rather than a foreign key so events outlive purged links.
+    """
+    id = models.BigAutoField(primary_key=True)
+    short_code = models.CharField(max_length=10)
+    clicked_at = models.DateTimeField()
+    referrer = models.TextField(blank=True)
+    # ISO 3166 alpha-2 from CLICK_LOG_COUNTRY_HEADER
+    country = models.CharField(max_length=2, blank=True)
+    user_agent = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'click_events'
+        indexes = [
+            # Per-link usage over a billing period
+            models.Index(fields=['short_code', 'clicked_at'], name='click_events_code_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.short_code} at {self.clicked_at:%Y-%m-%d %H:%M:%S}"
+
+
+class ClickLogOffset(models.Model):
+    """
+    Bytes of a click log segment already loaded into ClickEvent, committed with each chunk
+    """
+    segment = models.CharField(max_length=255, primary_key=True)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'click_log_offsets'
+
+    def __str__(self):
+        return f"{self.segment}: {self.offset}"
+
+
+class TrendingCount(models.Model):
+    """
+    One worker's heavy-hitter count for a short code in a trending time slot (see trending.py)
+    """
+    period = models.CharField(max_length=4)
+    slot = models.DateTimeField()
+    worker = models.CharField(max_length=64)
+    short_code = models.CharField(max_length=10)
+    clicks = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'trending_counts'
+        constraints = [
+            # Also the index behind window reads (period, slot range)
+            models.UniqueConstraint(fields=['period', 'slot', 'worker', 'short_code'], name='trending_counts_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.slot:%Y-%m-%d %H:%M} {self.short_code}: {self.clicks}"
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Input records consumed by a resumable import_urls job, committed with each chunk
+    """
+    job = models.CharField(max_length=255, primary_key=True)
+    records_done = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'import_checkpoints'
+
+    def __str__(self):
+        return f"{self.job}: {self.records_done}"
+
+
+class SummaryTotals(models.Model):
+    """
+    Single row holding the dashboard's link and click totals (see summary.py)
+    """
+    total_urls = models.BigIntegerField(default=0)
+    total_clicks = models.BigIntegerField(default=0)
+    resynced_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'summary_totals'
+        verbose_name_plural = 'summary totals'
+
+    def __str__(self):
+        return f"{self.total_urls} links, {self.total_clicks} clicks"
+
+
+class OwnerStats(models.Model):
+    """
+    Denormalized link count and click total per owner, maintained incrementally (see owners.py)
+    """
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='link_stats',
+    )
+    url_count = models.BigIntegerField(default=0)
+    total_clicks = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'owner_stats'
+        verbose_name_plural = 'owner stats'
+
+    def __str__(self):
+        return f"{self.owner_id}: {self.url_count} links, {self.total_clicks} clicks"
@@ -0,0 +1,70 @@
+# backend/urls/moderators.py
+"""
+Moderators group membership: staff users who aren't superusers belong to it,
+everyone else doesn't.
+
+The group id is looked up once per process. sync_user() is called from the
+User post_save signal only when is_staff/is_superuser actually changed, so
+logins (which save last_login) cost nothing extra. sync_all() reconciles every
+user with set-based queries (manage.py sync_moderators).
+"""
+
+import logging
+
+from django.contrib.auth.models import Group, User
+
+logger = logging.getLogger(__name__)
+
+MODERATORS_GROUP = 'Moderators'
+
+# Rows per bulk insert in sync_all()
+SYNC_BATCH_SIZE = 1000
+
+_group_id = None
+
+
+def group_id():
+    global _group_id
+    if _group_id is None:
+        _group_id = Group.objects.get_or_create(name=MODERATORS_GROUP)[0].pk
+    return _group_id
+
+
+def forget_group():
+    """Drop the cached id (the group was renamed or deleted)"""
+    global _group_id
+    _group_id = None
+
+
+def should_moderate(user):
+    return user.is_staff and not user.is_superuser
+
+
+def sync_user(user):
+    """Add or remove user's membership; one query either way"""
+    if should_moderate(user):
+        # No m2m_changed listeners, so this is a single INSERT ... ON CONFLICT DO NOTHING
+        user.groups.add(group_id())
+        logger.info("%s added to %s group", user.username, MODERATORS_GROUP)
+    else:
+        user.groups.remove(group_id())
+
+
+def sync_all(dry_run=False):
+    """Reconcile every user's membership. Returns (added, removed)."""
+    Membership = User.groups.through
+    gid = group_id()
+    missing = list(
+        User.objects.filter(is_staff=True, is_superuser=False)
+        .exclude(groups=gid)
+        .values_list('pk', flat=True)
+    )
+    extra = Membership.objects.filter(group_id=gid).exclude(user__is_staff=True, user__is_superuser=False)
+    if dry_run:
+        return len(missing), extra.count()
+    Membership.objects.bulk_create(
+        [Membership(user_id=pk, group_id=gid) for pk in missing],
+        batch_size=SYNC_BATCH_SIZE, ignore_conflicts=True,
+    )
+    removed, _ = extra.delete()
+    return len(missing), removed
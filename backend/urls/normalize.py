@@ -0,0 +1,224 @@
+# backend/urls/normalize.py
+"""
+URL normalization for the shorten endpoints.
+
+Each input is split once; the tracking parameter extractor and the final
+scheme/netloc check reuse that parse instead of re-parsing the string. The
+common case, an http(s) URL whose query has none of TRACKING_KEYS, is accepted
+straight from the parse: the validator and extractor could not change the
+result for it. Results are memoized per raw input (NORMALIZE_CACHE_SIZE
+entries, oldest evicted first), so repeated URLs in bulk requests cost a dict
+lookup. stats() reports memo hits and the time spent in each stage.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that tracking/redirect URLs carry the real target in, in priority order
+TRACKING_KEYS = ('u', 'url', 'q', 'redirect', 'target')
+
+# Cheap pre-filter for the query string. parse_qs unquotes keys, so any
+# percent-encoded query also goes through the full extraction.
+_TRACKING_KEY_RE = re.compile(r'(?:^|&)(?:%s)=|%%' % '|'.join(TRACKING_KEYS))
+
+WEB_SCHEMES = ('http', 'https')
+
+# Inputs longer than this are normalized but not memoized
+MEMO_MAX_INPUT_LENGTH = 2048
+
+STAGES = ('parse', 'validate', 'extract')
+
+
+class _Stats:
+    """Per-stage call counts and cumulative seconds (approximate under threads)"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.calls = dict.fromkeys(STAGES, 0)
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+
+    def add(self, stage, seconds):
+        self.calls[stage] += 1
+        self.seconds[stage] += seconds
+
+
+_stats = _Stats()
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _is_web_url(parts):
+    return parts.scheme in WEB_SCHEMES and bool(parts.netloc)
+
+
+def _try_base64_decode(s: str):
+    """
+    Try to base64-decode a string and return decoded text if possible.
+    Return None on failure.
+    """
+    import base64
+    import binascii
+
+    try:
+        padded = s + '=' * (-len(s) % 4)
+        return base64.b64decode(padded).decode('utf-8')
+    except (binascii.Error, ValueError):
+        return None
+
+
+def _extract_from_query(query):
+    """
+    Look for a real target URL in the tracking parameters of an already split query.
+    Parameter values may be base64 encoded.
+    """
+    qs = parse_qs(query)
+    for key in TRACKING_KEYS:
+        if key in qs and qs[key]:
+            value = unquote(qs[key][0])
+
+            decoded = _try_base64_decode(value)
+            if decoded:
+                try:
+                    if _is_web_url(urlsplit(decoded)):
+                        return decoded
+                except ValueError:
+                    pass
+
+            try:
+                if _is_web_url(urlsplit(value)):
+                    return value
+            except ValueError:
+                pass
+    return None
+
+
+def extract_redirect_target(candidate_url: str):
+    """
+    If candidate_url is a redirect/tracking URL containing parameters like
+    'u', 'url', 'q', 'redirect', try to extract and return a real target URL.
+    """
+    try:
+        return _extract_from_query(urlsplit(candidate_url).query)
+    except Exception:
+        logger.exception("extract_redirect_target failed for: %s", candidate_url)
+    return None
+
+
+def _normalize(raw_url):
+    raw = raw_url.strip()
+    if not raw:
+        return None
+    timer = time.perf_counter
+
+    # ensure scheme exists before parsing
+    start = timer()
+    try:
+        parts = urlsplit(raw)
+        if not parts.scheme:
+            raw = 'http://' + raw
+            parts = urlsplit(raw)
+    except ValueError:
+        # e.g. an unbalanced IPv6 bracket; the validator still gets a say
+        parts = None
+    _stats.add('parse', timer() - start)
+
+    # Without tracking parameters the validator can't change the outcome for
+    # http(s) URLs (they are accepted by the parse-only check either way)
+    has_tracking = parts is None or bool(parts.query and _TRACKING_KEY_RE.search(parts.query))
+    if not has_tracking and _is_web_url(parts):
+        return raw
+
+    # strict validator: a valid URL is kept as is, even if it is a tracking URL.
+    # Imported here: most inputs never get this far, and redirect-only workers never do
+    import validators
+
+    start = timer()
+    try:
+        valid = validators.url(raw)
+    except Exception:
+        logger.debug("validators.url raised; falling back to parse-only check")
+        valid = False
+    _stats.add('validate', timer() - start)
+    if valid:
+        return raw
+    if not has_tracking or parts is None:
+        return None
+
+    # then the target of a tracking URL
+    start = timer()
+    try:
+        target = _extract_from_query(parts.query)
+    except Exception:
+        logger.exception("extract_redirect_target failed for: %s", raw)
+        target = None
+    _stats.add('extract', timer() - start)
+    if target:
+        return target
+
+    # last-resort: accept basic parse with scheme/netloc
+    if _is_web_url(parts):
+        return raw
+
+    return None
+
+
+def normalize_url(raw_url: str):
+    """
+    Normalize and validate the incoming URL string.
+    Returns a normalized URL string (with scheme) or None if invalid.
+    """
+    if not raw_url:
+        return None
+    if len(raw_url) > MEMO_MAX_INPUT_LENGTH:
+        return _normalize(raw_url)
+
+    result = _memo.get(raw_url, _memo)
+    if result is not _memo:
+        _stats.hits += 1
+        return result
+    _stats.misses += 1
+
+    result = _normalize(raw_url)
+    maxsize = settings.NORMALIZE_CACHE_SIZE
+    if maxsize > 0:
+        with _memo_lock:
+            _memo[raw_url] = result
+            while len(_memo) > maxsize:
+                _memo.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    with _memo_lock:
+        _memo.clear()
+
+
+def stats():
+    """Memo hit/miss counts plus calls, total and mean microseconds per stage"""
+    return {
+        'cache': {'size': len(_memo), 'hits': _stats.hits, 'misses': _stats.misses},
+        'stages': {
+            stage: {
+                'calls': _stats.calls[stage],
+                'total_us': round(_stats.seconds[stage] * 1e6, 1),
+                'mean_us': round(_stats.seconds[stage] * 1e6 / _stats.calls[stage], 2) if _stats.calls[stage] else 0.0,
+            }
+            for stage in STAGES
+        },
+    }
+
+
+def reset_stats():
+    _stats.reset()
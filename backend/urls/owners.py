@@ -0,0 +1,77 @@
+# backend/urls/owners.py
+"""
+Per-owner link totals (OwnerStats) for GET /api/me/urls.
+
+The counters move with every change instead of being aggregated per request:
+creates and deletes (signals.py) and click flushes (clicks.write_click_counts)
+apply deltas. Edits that reassign a link or overwrite its click count, and
+owners without a row yet, are recounted from the table, which is one range
+scan on urls_owner_created_idx.
+"""
+
+from django.db import connection
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+# Owners per UPDATE statement
+ADJUST_BATCH_SIZE = 500
+
+
+def adjust(deltas):
+    """Apply {owner_id: (urls, clicks)} to the owners' counters"""
+    from .models import OwnerStats
+
+    # Sorted so concurrent writers lock rows in the same order
+    items = sorted((owner_id, d) for owner_id, d in deltas.items() if owner_id is not None and any(d))
+    missing = []
+    for start in range(0, len(items), ADJUST_BATCH_SIZE):
+        batch = items[start:start + ADJUST_BATCH_SIZE]
+        if connection.vendor == 'postgresql':
+            table = connection.ops.quote_name(OwnerStats._meta.db_table)
+            values = ', '.join(['(%s::bigint, %s::bigint, %s::bigint)'] * len(batch))
+            params = [p for owner_id, (urls, clicks) in batch for p in (owner_id, urls, clicks)]
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} AS s SET url_count = s.url_count + v.urls, "
+                    f"total_clicks = s.total_clicks + v.clicks, updated_at = now() "
+                    f"FROM (VALUES {values}) AS v(owner_id, urls, clicks) "
+                    f"WHERE s.owner_id = v.owner_id RETURNING s.owner_id",
+                    params,
+                )
+                updated = {owner_id for (owner_id,) in cursor.fetchall()}
+        else:
+            updated = set()
+            now = timezone.now()
+            for owner_id, (urls, clicks) in batch:
+                if OwnerStats.objects.filter(pk=owner_id).update(
+                    url_count=F('url_count') + urls, total_clicks=F('total_clicks') + clicks, updated_at=now,
+                ):
+                    updated.add(owner_id)
+        missing.extend(owner_id for owner_id, _ in batch if owner_id not in updated)
+    if missing:
+        recount(missing)
+
+
+def recount(owner_ids):
+    """Rebuild the counters of owner_ids from the urls table"""
+    from .models import OwnerStats, URLModel
+
+    for owner_id in sorted(set(owner_ids) - {None}):
+        totals = URLModel.objects.filter(owner_id=owner_id).aggregate(
+            url_count=Count('id'), total_clicks=Sum('click_count'),
+        )
+        OwnerStats.objects.update_or_create(owner_id=owner_id, defaults={
+            'url_count': totals['url_count'],
+            'total_clicks': totals['total_clicks'] or 0,
+        })
+
+
+def get_totals(owner_id):
+    """(url_count, total_clicks) for owner_id; one primary key lookup"""
+    from .models import OwnerStats
+
+    totals = OwnerStats.objects.filter(pk=owner_id).values_list('url_count', 'total_clicks').first()
+    if totals is None:
+        recount([owner_id])
+        totals = OwnerStats.objects.filter(pk=owner_id).values_list('url_count', 'total_clicks').first()
+    return totals
@@ -0,0 +1,227 @@
+# backend/urls/ratelimit.py
+"""
+Token bucket rate limiting (RATE_LIMIT_ENABLED, policies in RATE_LIMITS).
+
+Buckets use GCRA: one "theoretical arrival time" float per key, so memory per
+active key is O(1) and a key whose bucket has refilled is dropped (idle
+eviction), as is the least recently used key beyond RATE_LIMIT_MAX_KEYS.
+
+With RATE_LIMIT_BACKEND=local each worker limits on its own. With 'cache' the
+bucket lives in the shared cache and workers lease small batches of tokens
+from it, so most allowed requests are decided in-process without a cache
+round trip; a denied key is also remembered locally until its retry time. The
+shared read-modify-write isn't atomic, so concurrent leases can overshoot by
+a lease or two per worker. Cache errors fail open.
+
+This module stays free of DRF: the redirect views call check() directly,
+throttling.py wraps it for the API views.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'ratelimit:v1:'
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class Policy:
+    """'<requests>/<s|m|h|d>[:<burst>]', e.g. '60/m' or '600/m:100'"""
+
+    __slots__ = ('name', 'interval', 'burst', 'tau', 'lease')
+
+    def __init__(self, name, spec):
+        rate, _, burst = spec.partition(':')
+        count, _, period = rate.partition('/')
+        count = int(count)
+        if count <= 0 or period not in PERIODS:
+            raise ValueError(f'Invalid rate limit for {name!r}: {spec!r}')
+        self.name = name
+        self.interval = PERIODS[period] / count
+        self.burst = int(burst) if burst else count
+        # Seconds of credit a full bucket holds
+        self.tau = self.burst * self.interval
+        # Tokens a worker takes from the shared bucket at once
+        self.lease = max(1, min(self.burst // 10, 50))
+
+
+class _Entry:
+    __slots__ = ('tat', 'tokens', 'lease_until', 'blocked_until')
+
+    def __init__(self):
+        self.tat = 0.0
+        self.tokens = 0
+        self.lease_until = 0.0
+        self.blocked_until = 0.0
+
+    def idle(self, now):
+        return self.tat <= now and self.lease_until <= now and self.blocked_until <= now
+
+
+class RateLimiter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._policies = None
+        self.allowed = 0
+        self.denied = 0
+        self.leases = 0
+
+    @property
+    def policies(self):
+        if self._policies is None:
+            self._policies = {
+                name: Policy(name, spec) for name, spec in settings.RATE_LIMITS.items() if spec
+            }
+        return self._policies
+
+    def _entry(self, scope, key, now):
+        buckets = self._buckets.get(scope)
+        if buckets is None:
+            buckets = self._buckets[scope] = OrderedDict()
+        entry = buckets.get(key)
+        if entry is not None:
+            buckets.move_to_end(key)
+            return entry
+        entry = buckets[key] = _Entry()
+        # Amortized O(1): drop refilled buckets from the cold end, and the
+        # coldest ones beyond the cap
+        max_keys = settings.RATE_LIMIT_MAX_KEYS
+        while len(buckets) > 1:
+            oldest_key = next(iter(buckets))
+            if len(buckets) <= max_keys and not buckets[oldest_key].idle(now):
+                break
+            del buckets[oldest_key]
+        return entry
+
+    def _policy(self, scope):
+        if not settings.RATE_LIMIT_ENABLED:
+            return None
+        return self.policies.get(scope)
+
+    def _check_local(self, policy, scope, key, now):
+        """Decision without I/O, or None when the shared bucket must be asked"""
+        with self._lock:
+            entry = self._entry(scope, key, now)
+            if settings.RATE_LIMIT_BACKEND != 'cache':
+                tat = max(entry.tat, now)
+                if tat + policy.interval - now > policy.tau:
+                    self.denied += 1
+                    return False, tat + policy.interval - policy.tau - now
+                entry.tat = tat + policy.interval
+                self.allowed += 1
+                return True, 0.0
+            if entry.blocked_until > now:
+                self.denied += 1
+                return False, entry.blocked_until - now
+            if entry.tokens > 0 and entry.lease_until > now:
+                entry.tokens -= 1
+                self.allowed += 1
+                return True, 0.0
+        return None
+
+    def _check_shared(self, policy, scope, key, now):
+        # Out of leased tokens: take a batch from the shared bucket (outside the lock)
+        granted, retry_after = self._take_shared(policy, key, now)
+        with self._lock:
+            entry = self._entry(scope, key, now)
+            self.leases += 1
+            if not granted:
+                entry.blocked_until = now + retry_after
+                self.denied += 1
+                return False, retry_after
+            if entry.lease_until <= now:
+                entry.tokens = 0
+            entry.tokens += granted - 1
+            entry.lease_until = max(entry.lease_until, now + granted * policy.interval)
+            self.allowed += 1
+            return True, 0.0
+
+    def check(self, scope, key):
+        """(allowed, retry_after_seconds) for one request by key under scope's policy"""
+        policy = self._policy(scope)
+        if policy is None:
+            return True, 0.0
+        now = time.time()
+        return self._check_local(policy, scope, key, now) or self._check_shared(policy, scope, key, now)
+
+    async def acheck(self, scope, key):
+        """check() for async views; only a lease from the shared bucket leaves the event loop"""
+        policy = self._policy(scope)
+        if policy is None:
+            return True, 0.0
+        now = time.time()
+        result = self._check_local(policy, scope, key, now)
+        if result is None:
+            result = await sync_to_async(self._check_shared)(policy, scope, key, now)
+        return result
+
+    def _take_shared(self, policy, key, now):
+        """Up to policy.lease tokens from the shared bucket: (granted, retry_after)"""
+        cache_key = f'{KEY_PREFIX}{policy.name}:{key}'
+        try:
+            cache = caches[settings.RATE_LIMIT_CACHE_ALIAS]
+            tat = cache.get(cache_key)
+            tat = now if tat is None or tat < now else tat
+            available = int((policy.tau - (tat - now)) / policy.interval + 1e-9)
+            if available < 1:
+                return 0, tat + policy.interval - policy.tau - now
+            granted = min(policy.lease, available)
+            tat += granted * policy.interval
+            cache.set(cache_key, tat, math.ceil(tat - now) + 1)
+            return granted, 0.0
+        except Exception:
+            logger.warning("Rate limit cache unavailable; allowing request", exc_info=True)
+            return 1, 0.0
+
+    def reset(self):
+        with self._lock:
+            self._buckets = {}
+            self._policies = None
+
+    def stats(self):
+        return {
+            'enabled': settings.RATE_LIMIT_ENABLED,
+            'keys': sum(len(b) for b in self._buckets.values()),
+            'allowed': self.allowed,
+            'denied': self.denied,
+            'leases': self.leases,
+        }
+
+
+rate_limiter = RateLimiter()
+
+
+def client_ip(request):
+    """REMOTE_ADDR, or the address RATE_LIMIT_TRUSTED_PROXIES hops back in X-Forwarded-For"""
+    proxies = settings.RATE_LIMIT_TRUSTED_PROXIES
+    if proxies:
+        forwarded = [p.strip() for p in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if p.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request):
+    """user:<id> for authenticated API requests, ip:<address> otherwise"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'ip:{client_ip(request)}'
+
+
+def too_many_requests(retry_after):
+    from django.http import JsonResponse
+
+    response = JsonResponse({'error': 'Too many requests'}, status=429)
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
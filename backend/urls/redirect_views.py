@@ -0,0 +1,104 @@
+# backend/urls/redirect_views.py
+"""
+Plain Django views (no DRF) shared by the full and the redirect-only profile
+(urlshortener/settings_redirect.py): redirects, health checks and metrics.
+Keep this module free of rest_framework imports so redirect-only workers never
+load it.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from . import metrics
+from .cache import aget_link, get_link
+from .clicks import record_click
+from .ratelimit import client_ip, rate_limiter, too_many_requests
+from .redirects import link_expired, redirect_response
+
+logger = logging.getLogger(__name__)
+
+HEALTH = {
+    'status': 'healthy',
+    'service': 'link-crush',
+    'version': '1.0.0'
+}
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class RedirectView(View):
+    def get(self, request, short_code):
+        """Handle URL redirection (target and policy resolved through the link cache)"""
+        try:
+            allowed, retry_after = rate_limiter.check('redirect', f'ip:{client_ip(request)}')
+            if not allowed:
+                return too_many_requests(retry_after)
+            link = get_link(short_code)
+            if link is None:
+                return JsonResponse({'error': 'Short URL not found'}, status=404)
+            if link_expired(link):
+                return JsonResponse({'error': 'Short URL has expired'}, status=410)
+            record_click(short_code, request)
+            return redirect_response(request, short_code, link)
+        except Exception as e:
+            logger.exception("Error in RedirectView")
+            return JsonResponse({'error': f'Server error: {str(e)}'}, status=500)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncRedirectView(View):
+    """
+    ASGI-native redirect (used when settings.ASYNC_REDIRECTS is on).
+    Hot links resolve from the per-process LRU and buffered click recording is
+    an in-memory append, so they are served without a sync thread pool hop;
+    cache misses await Django's async cache/ORM APIs.
+    """
+    async def get(self, request, short_code):
+        try:
+            allowed, retry_after = await rate_limiter.acheck('redirect', f'ip:{client_ip(request)}')
+            if not allowed:
+                return too_many_requests(retry_after)
+            link = await aget_link(short_code)
+            if link is None:
+                return JsonResponse({'error': 'Short URL not found'}, status=404)
+            if link_expired(link):
+                return JsonResponse({'error': 'Short URL has expired'}, status=410)
+            if settings.CLICK_BUFFER_ENABLED:
+                record_click(short_code, request)
+            else:
+                await sync_to_async(record_click)(short_code, request)
+            return redirect_response(request, short_code, link)
+        except Exception as e:
+            logger.exception("Error in AsyncRedirectView")
+            return JsonResponse({'error': f'Server error: {str(e)}'}, status=500)
+
+
+def health_check_sync(request):
+    """
+    Health check endpoint for redirect-only WSGI workers (no DRF)
+    """
+    return JsonResponse(HEALTH)
+
+
+async def health_check_async(request):
+    """
+    Health check endpoint for ASGI deployments (plain async view, no DRF)
+    """
+    return JsonResponse(HEALTH)
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of this worker's metrics
+    GET /metrics
+    """
+    if not settings.METRICS_ENABLED:
+        return JsonResponse({'error': 'Metrics are disabled'}, status=404)
+    if not metrics.scrape_allowed(request):
+        return JsonResponse({'error': 'Not allowed'}, status=403)
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,66 @@
+# backend/urls/redirects.py
+"""
+Redirect response policy.
+
+Each link picks its status code (301/302/307/308). Untracked links are
+cacheable by browsers and CDN edges for cache_max_age seconds (default
+REDIRECT_CACHE_MAX_AGE), so repeat visits never reach the server and are not
+counted. Tracked links (the default) are downgraded to the matching temporary
+status and sent with `no-cache`, so every visit comes back and is counted; a
+revalidation with a matching ETag gets a bodyless 304.
+
+The ETag is derived from updated_at, which changes on every save. Links with
+an expiry are never cached past it, and answer 410 Gone once it has passed.
+"""
+
+from django.conf import settings
+from django.http import HttpResponseNotModified, HttpResponseRedirect
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+# Permanent statuses and the temporary status with the same method semantics
+TEMPORARY_STATUS = {301: 302, 308: 307}
+
+
+def link_etag(short_code, link):
+    return '"%s-%x"' % (short_code, int(link['updated_at'].timestamp() * 1_000_000))
+
+
+def link_expired(link):
+    expires_at = link['expires_at']
+    return expires_at is not None and expires_at <= timezone.now()
+
+
+def cache_control(link):
+    if link['track_clicks']:
+        return 'private, no-cache'
+    max_age = link['cache_max_age']
+    if max_age is None:
+        max_age = settings.REDIRECT_CACHE_MAX_AGE
+    if link['expires_at'] is not None:
+        max_age = min(max_age, max(int((link['expires_at'] - timezone.now()).total_seconds()), 0))
+    return f'public, max-age={max_age}' if max_age else 'no-cache'
+
+
+def redirect_response(request, short_code, link):
+    """
+    Build the redirect (or 304) for a cached link dict (see cache.LINK_FIELDS)
+    """
+    etag = link_etag(short_code, link)
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        if etag in etags or '*' in etags:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Cache-Control'] = cache_control(link)
+            return response
+
+    status = link['redirect_status']
+    if link['track_clicks']:
+        status = TEMPORARY_STATUS.get(status, status)
+    response = HttpResponseRedirect(link['original_url'])
+    response.status_code = status
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control(link)
+    return response
@@ -0,0 +1,115 @@
+# backend/urls/routers.py
+"""
+Read-replica routing (DATABASE_REPLICA_HOSTS).
+
+Only reads inside read_replica() go to a replica: redirect lookups, /api/stats
+and the dashboard summary. Everything else, and every write, stays on the
+primary. A replica is skipped while its replication lag exceeds REPLICA_MAX_LAG
+or it can't be reached; each process re-checks at most every
+REPLICA_HEALTH_INTERVAL seconds. Clients that just wrote something are pinned
+to the primary for REPLICA_PIN_SECONDS (ReplicaPinningMiddleware) so they
+always read their own writes.
+"""
+
+import contextvars
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+_use_replica = contextvars.ContextVar('linkcrush_use_replica', default=False)
+_pinned = contextvars.ContextVar('linkcrush_primary_pinned', default=False)
+
+# Seconds behind the primary; 0 when fully replayed (an idle primary isn't lag)
+PG_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+# alias -> (healthy, lag seconds or None, monotonic time of the check)
+_health = {}
+
+
+@contextmanager
+def read_replica():
+    """Route reads in this block to a healthy replica, unless the client is pinned"""
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def pin_primary(pinned=True):
+    token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+def _check(alias):
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(PG_LAG_SQL if connection.vendor == 'postgresql' else 'SELECT 1')
+            lag = float(cursor.fetchone()[0]) if connection.vendor == 'postgresql' else 0.0
+    except DatabaseError as e:
+        logger.warning("Replica %s unavailable: %s", alias, e)
+        connection.close()
+        return False, None
+    if lag > settings.REPLICA_MAX_LAG:
+        logger.warning("Replica %s is %.1fs behind, reading from the primary", alias, lag)
+        return False, lag
+    return True, lag
+
+
+def is_healthy(alias):
+    healthy, lag, checked_at = _health.get(alias, (False, None, None))
+    now = time.monotonic()
+    if checked_at is None or now - checked_at >= settings.REPLICA_HEALTH_INTERVAL:
+        # Record the attempt first so concurrent requests don't all probe
+        _health[alias] = (healthy, lag, now)
+        healthy, lag = _check(alias)
+        _health[alias] = (healthy, lag, now)
+    return healthy
+
+
+def read_alias():
+    """Database alias reads should use right now ('default' outside read_replica())"""
+    if not _use_replica.get() or _pinned.get():
+        return DEFAULT_DB_ALIAS
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if is_healthy(alias)]
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+def stats():
+    return {
+        alias: {'healthy': healthy, 'lag_seconds': lag}
+        for alias, (healthy, lag, _) in _health.items()
+    }
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
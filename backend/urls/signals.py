@@ -1,15 +1,21 @@
 # signals.py
-from django.db.models.signals import post_migrate, post_save
+from django.db.models.signals import post_delete, post_init, post_migrate, post_save
 from django.contrib.auth.models import Group, Permission, User
 from django.apps import apps
+from django.db import transaction
 from django.dispatch import receiver
 
+from . import moderators, owners, summary
+from .bloom import code_filter
+from .cache import invalidate_link, link_cache, link_from_instance
+from .models import URLModel, urls_bulk_created
+
 
 @receiver(post_migrate)
 def create_default_groups(sender, **kwargs):
     if sender.name == "urls":  # replace with your actual app name
         # Create or get "Moderators" group
-        moderators_group, _ = Group.objects.get_or_create(name="Moderators")
+        moderators_group, _ = Group.objects.get_or_create(name=moderators.MODERATORS_GROUP)
 
         # Get permissions for your URL model
         url_model = apps.get_model("urls", "URLModel")
@@ -24,19 +30,112 @@ def create_default_groups(sender, **kwargs):
         print("✅ Moderators group ensured with permissions.")
 
 
+@receiver(post_init, sender=User)
+def remember_staff_flags(sender, instance, **kwargs):
+    # __dict__ so deferred fields aren't loaded just for this
+    instance._loaded_staff_flags = (instance.__dict__.get('is_staff'), instance.__dict__.get('is_superuser'))
+
+
 @receiver(post_save, sender=User)
-def enforce_staff_group(sender, instance, **kwargs):
+def enforce_staff_group(sender, instance, created, update_fields=None, **kwargs):
     """
     Ensure all staff are always in the Moderators group.
+    Only runs when is_staff/is_superuser changed (not on last_login updates).
+    """
+    if update_fields is not None and not {'is_staff', 'is_superuser'} & set(update_fields):
+        return
+    flags = (instance.is_staff, instance.is_superuser)
+    changed = flags != instance._loaded_staff_flags
+    instance._loaded_staff_flags = flags
+    if created:
+        # A new user has no memberships to remove
+        if moderators.should_moderate(instance):
+            moderators.sync_user(instance)
+    elif changed:
+        moderators.sync_user(instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def forget_moderators_group(sender, instance, **kwargs):
+    if instance.pk == moderators._group_id or instance.name == moderators.MODERATORS_GROUP:
+        moderators.forget_group()
+
+
+@receiver(post_save, sender=URLModel)
+@receiver(post_delete, sender=URLModel)
+def invalidate_cached_link(sender, instance, created=False, **kwargs):
+    """
+    Drop the cached redirect target whenever a URL is edited (admin or API) or deleted.
+    New links are written through instead, and journaled for the other
+    workers' short code filters (bloom.py). Both happen once
+    the change is committed: invalidating earlier would let a concurrent
+    redirect cache the old row again before the commit.
     """
-    moderators_group, _ = Group.objects.get_or_create(name="Moderators")
+    short_code = instance.short_code
+    if created:
+        link = link_from_instance(instance)
 
-    if instance.is_staff and not instance.is_superuser:
-        if not instance.groups.filter(name="Moderators").exists():
-            instance.groups.add(moderators_group)
-            print(f"🔒 {instance.username} added to Moderators group.")
+        def publish():
+            code_filter.publish([short_code])
+            link_cache.set(short_code, link)
+        transaction.on_commit(publish)
     else:
-        # If they’re no longer staff, just remove them from the group
-        if instance.groups.filter(name="Moderators").exists():
-            instance.groups.remove(moderators_group)
-            print(f"🚫 {instance.username} removed from Moderators group (not staff).")
+        transaction.on_commit(lambda: invalidate_link(short_code))
+
+
+@receiver(post_save, sender=URLModel)
+def count_created_url(sender, instance, created, **kwargs):
+    if created:
+        summary.adjust(urls=1, clicks=instance.click_count)
+
+
+@receiver(post_delete, sender=URLModel)
+def count_deleted_url(sender, instance, **kwargs):
+    summary.adjust(urls=-1, clicks=-instance.click_count)
+
+
+@receiver(urls_bulk_created)
+def count_bulk_created_urls(sender, instances, **kwargs):
+    summary.adjust(urls=len(instances), clicks=sum(obj.click_count for obj in instances))
+
+
+@receiver(post_save, sender=URLModel)
+def count_owner_url(sender, instance, created, **kwargs):
+    """
+    Keep OwnerStats in step: new links add to their owner's totals; edits that
+    change the owner or overwrite click_count recount the owners involved.
+    """
+    if created:
+        owners.adjust({instance.owner_id: (1, instance.click_count)})
+    else:
+        previous_owner_id = getattr(instance, '_loaded_owner_id', instance.owner_id)
+        if (previous_owner_id != instance.owner_id
+                or getattr(instance, '_loaded_click_count', None) != instance.click_count):
+            owners.recount([previous_owner_id, instance.owner_id])
+    instance._loaded_owner_id = instance.owner_id
+    instance._loaded_click_count = instance.click_count
+
+
+@receiver(post_delete, sender=URLModel)
+def count_owner_deleted_url(sender, instance, **kwargs):
+    owners.adjust({instance.owner_id: (-1, -instance.click_count)})
+
+
+@receiver(urls_bulk_created)
+def count_owner_bulk_created_urls(sender, instances, **kwargs):
+    deltas = {}
+    for obj in instances:
+        urls, clicks = deltas.get(obj.owner_id, (0, 0))
+        deltas[obj.owner_id] = (urls + 1, clicks + obj.click_count)
+    owners.adjust(deltas)
+
+
+@receiver(urls_bulk_created)
+def publish_bulk_created_urls(sender, instances, **kwargs):
+    links = {obj.short_code: link_from_instance(obj) for obj in instances}
+
+    def publish():
+        code_filter.publish(list(links))
+        link_cache.set_many(links)
+    transaction.on_commit(publish)
@@ -0,0 +1,110 @@
+# backend/urls/summary.py
+"""
+Precomputed dashboard summary for the admin and /api/stats/summary.
+
+total_urls and total_clicks live in a single SummaryTotals row, so every
+worker reads the same numbers. Deltas are applied on create/delete and on
+every click flush once the change they describe has committed. The totals
+are recounted from the table every SUMMARY_RESYNC_INTERVAL seconds to absorb
+drift (e.g. a worker dying between a commit and its delta). The top URL and
+the 7-day creation count can't be maintained incrementally, so they are
+recomputed at most every SUMMARY_REFRESH_INTERVAL seconds and cached in the
+default cache; with a per-process cache each worker refreshes its own copy.
+Reads are one primary key lookup plus a cache get.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .routers import read_replica
+
+TOTALS_ID = 1
+KEY_SNAPSHOT = 'summary:v1:snapshot'
+
+RECENT_DAYS = 7
+
+
+def _compute_snapshot():
+    from .models import URLModel
+
+    with read_replica():
+        top_url = (
+            URLModel.objects.order_by('-click_count')
+            .values('short_code', 'original_url', 'click_count')
+            .first()
+        )
+        recent_urls = URLModel.objects.filter(
+            created_at__gte=timezone.now() - timedelta(days=RECENT_DAYS)
+        ).count()
+    snapshot = {
+        'top_url': top_url,
+        'recent_urls': recent_urls,
+        'computed_at': timezone.now(),
+    }
+    cache.set(KEY_SNAPSHOT, snapshot, settings.SUMMARY_REFRESH_INTERVAL)
+    return snapshot
+
+
+def _compute_totals():
+    """Recount the totals on the primary (a lagging replica would bake its lag into the counters)"""
+    from .models import SummaryTotals, URLModel
+
+    totals = URLModel.objects.aggregate(total_urls=Count('id'), total_clicks=Sum('click_count'))
+    totals['total_clicks'] = totals['total_clicks'] or 0
+    SummaryTotals.objects.update_or_create(pk=TOTALS_ID, defaults={**totals, 'resynced_at': timezone.now()})
+    return totals['total_urls'], totals['total_clicks']
+
+
+def get_summary():
+    """
+    Return the dashboard summary dict, recomputing only the parts that are missing
+    """
+    from .models import SummaryTotals
+
+    totals = SummaryTotals.objects.filter(pk=TOTALS_ID).values_list('total_urls', 'total_clicks', 'resynced_at').first()
+    resync_before = timezone.now() - timedelta(seconds=settings.SUMMARY_RESYNC_INTERVAL)
+    if totals is None or totals[2] < resync_before:
+        total_urls, total_clicks = _compute_totals()
+    else:
+        total_urls, total_clicks, _ = totals
+    snapshot = cache.get(KEY_SNAPSHOT) or _compute_snapshot()
+
+    return {
+        'total_urls': total_urls,
+        'total_clicks': total_clicks,
+        'avg_clicks': round(total_clicks / total_urls, 1) if total_urls else 0,
+        'top_url': snapshot['top_url'],
+        'recent_urls': snapshot['recent_urls'],
+        'computed_at': snapshot['computed_at'],
+    }
+
+
+def _apply(urls, clicks):
+    from .models import SummaryTotals
+
+    # A missing row is left alone; the next read recounts it
+    SummaryTotals.objects.filter(pk=TOTALS_ID).update(
+        total_urls=F('total_urls') + urls, total_clicks=F('total_clicks') + clicks,
+    )
+
+
+def adjust(urls=0, clicks=0):
+    """
+    Apply deltas to the totals once the current transaction commits
+    (immediately outside one); they are dropped if it rolls back.
+    """
+    if urls or clicks:
+        transaction.on_commit(lambda: _apply(urls, clicks))
+
+
+def invalidate():
+    """Force a full recompute on the next read (after bulk changes)"""
+    from .models import SummaryTotals
+
+    SummaryTotals.objects.filter(pk=TOTALS_ID).delete()
+    cache.delete(KEY_SNAPSHOT)
@@ -0,0 +1,85 @@
+# backend/urls/tests/bench_hot_paths.py
+"""
+pytest-benchmark microbenchmarks for the request hot paths.
+
+    pytest urls/tests/bench_hot_paths.py --benchmark-autosave
+    pytest urls/tests/bench_hot_paths.py --benchmark-compare --benchmark-compare-fail=median:10%
+"""
+
+import itertools
+from unittest import mock
+
+import pytest
+from django.test import RequestFactory, override_settings
+
+from urls.benchmarks import BENCH_HOST, NORMALIZE_INPUTS
+from urls.buffering import BackgroundFlusher
+from urls.cache import get_link, link_cache
+from urls.clicks import click_buffer
+from urls.codegen import get_allocator
+from urls.models import URLModel
+from urls.normalize import _normalize, normalize_url
+from urls.redirect_views import RedirectView
+from urls.views import shorten_url
+
+pytest.importorskip('pytest_benchmark')
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('quiet_side_effects'),
+]
+
+
+@pytest.fixture
+def quiet_side_effects():
+    """Buffered clicks only, and no background threads or rate limits in the timings"""
+    with override_settings(
+        CLICK_BUFFER_ENABLED=True, ANALYTICS_ENABLED=False, TRENDING_ENABLED=False,
+        CLICK_LOG_ENABLED=False, RATE_LIMIT_ENABLED=False,
+    ), mock.patch.object(BackgroundFlusher, 'ensure_started'):
+        link_cache.local.clear()
+        yield
+        click_buffer.drain()
+
+
+@pytest.fixture
+def link():
+    return URLModel.objects.create(original_url=f'https://{BENCH_HOST}/target')
+
+
+def test_normalize_url(benchmark):
+    """The full pipeline on every call (memo bypassed)"""
+    inputs = itertools.cycle(NORMALIZE_INPUTS)
+    benchmark(lambda: _normalize(next(inputs)))
+
+
+def test_normalize_url_memo(benchmark):
+    inputs = itertools.cycle(NORMALIZE_INPUTS)
+    benchmark(lambda: normalize_url(next(inputs)))
+
+
+def test_generate_short_code(benchmark):
+    benchmark(get_allocator().allocate)
+
+
+def test_get_link(benchmark, link):
+    get_link(link.short_code)
+    assert benchmark(get_link, link.short_code) is not None
+
+
+def test_redirect(benchmark, link):
+    request = RequestFactory().get(f'/{link.short_code}/', HTTP_USER_AGENT='bench/1.0')
+    view = RedirectView()
+    response = benchmark(view.get, request, link.short_code)
+    assert response.status_code == 302
+
+
+def test_shorten_url(benchmark):
+    factory = RequestFactory()
+    counter = itertools.count()
+
+    def shorten():
+        url = f'https://{BENCH_HOST}/{next(counter)}'
+        return shorten_url(factory.post('/api/shorten', {'url': url}, content_type='application/json'))
+
+    assert benchmark(shorten).status_code == 201
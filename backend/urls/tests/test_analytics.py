@@ -0,0 +1,152 @@
+# backend/urls/tests/test_analytics.py
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.test import override_settings
+
+from urls.analytics import ClickAggregator, click_aggregator, referrer_host, ua_family
+from urls.models import ClickBreakdown, ClickRollup, URLModel
+
+from .utils import LinkCrushTestCase
+
+# 2025-09-14T10:15:30Z
+TS = datetime(2025, 9, 14, 10, 15, 30, tzinfo=dt_timezone.utc).timestamp()
+CHROME = 'Mozilla/5.0 Chrome/120.0 Safari/537.36'
+FIREFOX = 'Mozilla/5.0 Gecko/20100101 Firefox/121.0'
+
+
+class ClassifierTests(LinkCrushTestCase):
+    def test_ua_family(self):
+        self.assertEqual(ua_family(CHROME), 'Chrome')
+        self.assertEqual(ua_family('Mozilla/5.0 Chrome/120.0 Edg/120.0'), 'Edge')
+        self.assertEqual(ua_family('Googlebot/2.1'), 'Bot')
+        self.assertEqual(ua_family('something else'), 'Other')
+        self.assertEqual(ua_family(''), '')
+
+    def test_referrer_host(self):
+        self.assertEqual(referrer_host('https://news.example.com/item?id=1'), 'news.example.com')
+        self.assertEqual(referrer_host(''), '')
+        self.assertEqual(referrer_host('http://[bad'), '')
+
+
+class RollupTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = URLModel.objects.create(original_url='https://example.com/page')
+        self.aggregator = ClickAggregator(interval=60, max_events=100, max_pending=1000)
+
+    def record(self, offset, referrer='', user_agent=''):
+        self.aggregator.record(self.url.short_code, referrer, user_agent, timestamp=TS + offset)
+
+    def rollups(self, granularity):
+        return list(
+            ClickRollup.objects.filter(url=self.url, granularity=granularity)
+            .order_by('bucket').values_list('bucket', 'clicks')
+        )
+
+    def test_events_fold_into_buckets(self):
+        self.record(0, 'https://a.example/x', CHROME)
+        self.record(20, 'https://a.example/y', CHROME)
+        self.record(60, '', FIREFOX)
+        self.aggregator.flush()
+
+        minute = datetime(2025, 9, 14, 10, 15, tzinfo=dt_timezone.utc)
+        self.assertEqual(self.rollups(ClickRollup.MINUTE), [
+            (minute, 2),
+            (minute.replace(minute=16), 1),
+        ])
+        self.assertEqual(self.rollups(ClickRollup.HOUR), [(minute.replace(minute=0), 3)])
+        self.assertEqual(self.rollups(ClickRollup.DAY), [(minute.replace(hour=0, minute=0), 3)])
+        self.assertEqual(
+            dict(ClickBreakdown.objects.filter(dimension=ClickBreakdown.REFERRER).values_list('value', 'clicks')),
+            {'a.example': 2, '': 1},
+        )
+        self.assertEqual(
+            dict(ClickBreakdown.objects.filter(dimension=ClickBreakdown.USER_AGENT).values_list('value', 'clicks')),
+            {'Chrome': 2, 'Firefox': 1},
+        )
+
+    def test_flushes_add_onto_existing_rows(self):
+        self.record(0)
+        self.aggregator.flush()
+        self.record(5)
+        self.record(10)
+        self.aggregator.flush()
+        self.assertEqual([clicks for _, clicks in self.rollups(ClickRollup.MINUTE)], [3])
+        self.assertEqual(self.aggregator.flushes, 2)
+
+    def test_unknown_codes_are_dropped(self):
+        self.aggregator.record('gone42', timestamp=TS)
+        self.aggregator.flush()
+        self.assertFalse(ClickRollup.objects.exists())
+
+    def test_full_queue_drops_oldest(self):
+        aggregator = ClickAggregator(interval=60, max_events=2, max_pending=1000)
+        for offset in (0, 60, 120):
+            aggregator.record(self.url.short_code, timestamp=TS + offset)
+        self.assertEqual(aggregator.dropped, 1)
+        aggregator.flush()
+        self.assertEqual(ClickRollup.objects.filter(granularity=ClickRollup.MINUTE).count(), 2)
+
+    def test_aggregation_stops_at_max_pending(self):
+        aggregator = ClickAggregator(interval=60, max_events=100, max_pending=1)
+        aggregator.record(self.url.short_code, timestamp=TS)
+        aggregator.record(self.url.short_code, timestamp=TS + 60)
+        aggregator.aggregate()
+        self.assertEqual(aggregator.depth, 1)
+
+    def test_failed_flush_keeps_deltas(self):
+        self.record(0)
+        with self.assertLogs('urls.analytics', 'ERROR'), \
+                mock.patch('urls.analytics.write_rollups', side_effect=RuntimeError):
+            self.aggregator.flush()
+        self.assertEqual(self.aggregator.failures, 1)
+        self.aggregator.flush()
+        self.assertEqual(self.rollups(ClickRollup.HOUR)[0][1], 1)
+
+
+@override_settings(ANALYTICS_ENABLED=True)
+class TimeseriesViewTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = URLModel.objects.create(original_url='https://example.com/page')
+        self.addCleanup(click_aggregator.reset)
+        for offset, user_agent in ((0, CHROME), (30, CHROME), (3600, FIREFOX)):
+            click_aggregator.record(self.url.short_code, 'https://ref.example/', user_agent, timestamp=TS + offset)
+        click_aggregator.flush()
+
+    def get(self, **params):
+        return self.client.get(f'/api/urls/{self.url.short_code}/timeseries', params)
+
+    def test_hour_buckets(self):
+        response = self.get(granularity='hour', start='2025-09-14T10:30:00Z', end='2025-09-14T12:00:00Z')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        # start is aligned down to its bucket
+        self.assertEqual(data['start'], '2025-09-14T10:00:00+00:00')
+        self.assertEqual(data['buckets'], [
+            {'bucket': '2025-09-14T10:00:00+00:00', 'clicks': 2},
+            {'bucket': '2025-09-14T11:00:00+00:00', 'clicks': 1},
+        ])
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(data['referrers'], [{'value': 'ref.example', 'clicks': 3}])
+        self.assertEqual(data['userAgents'], [{'value': 'Chrome', 'clicks': 2}, {'value': 'Firefox', 'clicks': 1}])
+
+    def test_redirect_is_recorded(self):
+        self.client.get(f'/{self.url.short_code}/', HTTP_USER_AGENT=CHROME)
+        today = self.get(granularity='day').json()
+        self.assertEqual(today['total'], 1)
+        self.assertEqual(today['userAgents'], [{'value': 'Chrome', 'clicks': 1}])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.get(granularity='week').status_code, 400)
+        self.assertEqual(self.get(start='yesterday').status_code, 400)
+        self.assertEqual(self.get(start='2025-09-14T12:00:00Z', end='2025-09-14T10:00:00Z').status_code, 400)
+        response = self.get(granularity='minute', start='2025-01-01T00:00:00Z', end='2025-09-14T00:00:00Z')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Range too large', response.json()['error'])
+
+    def test_unknown_code(self):
+        response = self.client.get('/api/urls/nope42/timeseries')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Short URL not found'})
@@ -0,0 +1,100 @@
+# backend/urls/tests/test_async_redirects.py
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.test import AsyncRequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+from dotenv import dotenv_values
+
+from urls.cache import link_cache
+from urls.clicks import click_buffer
+from urls.models import URLModel
+from urls.redirect_views import AsyncRedirectView, health_check_async
+
+from .utils import LinkCrushTestCase
+
+
+class AsyncRedirectViewTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = URLModel.objects.create(original_url='https://example.com/target')
+        self.view = AsyncRedirectView.as_view()
+        self.factory = AsyncRequestFactory()
+
+    async def get(self, short_code, **headers):
+        return await self.view(self.factory.get(f'/{short_code}/', **headers), short_code=short_code)
+
+    async def test_redirects_and_counts(self):
+        response = await self.get(self.url.short_code)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], 'https://example.com/target')
+        await self.url.arefresh_from_db()
+        self.assertEqual(self.url.click_count, 1)
+
+    @override_settings(CLICK_BUFFER_ENABLED=True)
+    async def test_hot_link_skips_the_database_and_thread_pool(self):
+        self.addCleanup(click_buffer.drain)
+        await self.get(self.url.short_code)
+        self.assertIsNotNone(link_cache.local.get(self.url.short_code))
+        with mock.patch.object(link_cache, 'aload', side_effect=AssertionError), \
+                mock.patch('urls.redirect_views.sync_to_async', side_effect=AssertionError):
+            response = await self.get(self.url.short_code)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(click_buffer.drain(), {self.url.short_code: 2})
+
+    async def test_unknown_code(self):
+        response = await self.get('nope42')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_expired_link(self):
+        await URLModel.objects.filter(pk=self.url.pk).aupdate(expires_at=timezone.now() - timedelta(seconds=1))
+        response = await self.get(self.url.short_code)
+        self.assertEqual(response.status_code, 410)
+
+    async def test_health_check(self):
+        response = await health_check_async(self.factory.get('/api/health'))
+        self.assertEqual(response.status_code, 200)
+
+
+class EntryPointDefaultsTests(SimpleTestCase):
+    """asgi.py changes some defaults (settings.IS_ASGI), but a configured value wins"""
+
+    def resolve(self, entry_point, setting='ASYNC_REDIRECTS', **env):
+        """setting as seen by a fresh process started through entry_point"""
+        env = {
+            **{k: v for k, v in os.environ.items()
+               if k not in ('ASYNC_REDIRECTS', 'DATABASE_CONN_MAX_AGE', 'URLSHORTENER_ASGI')},
+            'DJANGO_SETTINGS_MODULE': 'urlshortener.settings',
+            **env,
+        }
+        code = f'import urlshortener.{entry_point}; from django.conf import settings; print(settings.{setting})'
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=settings.BASE_DIR / 'backend', env=env, capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip().splitlines()[-1]
+
+    def conn_max_age(self, entry_point, **env):
+        return self.resolve(entry_point, 'DATABASES["default"]["CONN_MAX_AGE"]', **env)
+
+    def test_default_follows_the_entry_point(self):
+        if 'ASYNC_REDIRECTS' in dotenv_values(settings.BASE_DIR / '.env'):
+            self.skipTest('ASYNC_REDIRECTS is set in .env')
+        self.assertEqual(self.resolve('wsgi'), 'False')
+        self.assertEqual(self.resolve('asgi'), 'True')
+
+    def test_configured_value_wins_under_asgi(self):
+        self.assertEqual(self.resolve('asgi', ASYNC_REDIRECTS='False'), 'False')
+
+    def test_conn_max_age_follows_the_entry_point(self):
+        if 'DATABASE_CONN_MAX_AGE' in dotenv_values(settings.BASE_DIR / '.env'):
+            self.skipTest('DATABASE_CONN_MAX_AGE is set in .env')
+        self.assertEqual(self.conn_max_age('wsgi'), '60')
+        self.assertEqual(self.conn_max_age('asgi'), '0')
+
+    def test_configured_conn_max_age_wins_under_asgi(self):
+        self.assertEqual(self.conn_max_age('asgi', DATABASE_CONN_MAX_AGE='30'), '30')
@@ -0,0 +1,139 @@
+# backend/urls/tests/test_bloom.py
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+
+from urls import bloom
+from urls.bloom import BloomFilter, ShortCodeFilter, code_filter
+from urls.cache import KEY_PREFIX, link_cache
+from urls.models import URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class BloomFilterTests(LinkCrushTestCase):
+    def test_no_false_negatives(self):
+        bf = BloomFilter(1000, 0.01)
+        codes = [f'code{i}' for i in range(1000)]
+        for code in codes:
+            bf.add(code)
+        self.assertTrue(all(code in bf for code in codes))
+        false_positives = sum(f'other{i}' in bf for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+@override_settings(SHORT_CODE_FILTER_ENABLED=True)
+class ShortCodeFilterTests(LinkCrushTestCase):
+    """Two filters on one cache stand in for two workers sharing memcached/Redis"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(bloom, 'UNSHARED_CACHE_BACKENDS', ())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.existing = URLModel.objects.create(original_url='https://example.com/')
+        self.worker_a = ShortCodeFilter(interval=3600)
+        self.worker_b = ShortCodeFilter(interval=3600)
+        self.worker_a.build()
+        self.worker_b.build()
+        self.shared = caches[settings.URL_CACHE_ALIAS]
+
+    def test_existing_code(self):
+        self.assertTrue(self.worker_b.might_exist(self.existing.short_code))
+
+    def test_unknown_code_is_refused_without_a_query(self):
+        with self.assertNumQueries(0):
+            self.assertFalse(self.worker_b.might_exist('nope42'))
+        self.assertEqual(self.worker_b.negatives, 1)
+
+    def test_other_workers_creates_are_seen(self):
+        self.worker_a.publish(['new001', 'new002'])
+        self.assertTrue(self.worker_a.might_exist('new001'))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.worker_b.might_exist('new002'))
+            self.assertFalse(self.worker_b.might_exist('nope42'))
+        self.assertEqual(self.worker_b.journal_codes, 2)
+
+    async def test_async_check(self):
+        self.worker_a.publish(['new001'])
+        self.assertTrue(await self.worker_b.amight_exist('new001'))
+        self.assertFalse(await self.worker_b.amight_exist('nope42'))
+
+    def test_created_during_build_is_seen(self):
+        def create_elsewhere():
+            self.worker_a.publish(['mid001'])
+            return 1
+
+        # The count() query runs after the build has taken its journal position
+        with mock.patch.object(URLModel.objects, 'count', side_effect=create_elsewhere):
+            self.worker_b.build()
+        self.assertTrue(self.worker_b.might_exist('mid001'))
+
+    def test_missing_journal_entry_falls_back_to_database(self):
+        self.worker_a.publish(['new001', 'new002'])
+        self.shared.delete(bloom.JOURNAL_KEY % self.shared.get(bloom.SEQ_KEY))
+        self.assertTrue(self.worker_b.might_exist('nope42'))
+        self.assertTrue(self.worker_b.might_exist('new001'))
+
+    def test_lost_sequence_forces_rebuild(self):
+        self.shared.delete(bloom.SEQ_KEY)
+        with mock.patch.object(self.worker_b, 'wake') as wake:
+            self.assertTrue(self.worker_b.might_exist('nope42'))
+        wake.assert_called_once()
+        self.worker_b.build()
+        self.assertFalse(self.worker_b.might_exist('nope42'))
+
+    def test_too_far_behind_forces_rebuild(self):
+        self.shared.incr(bloom.SEQ_KEY, bloom.JOURNAL_MAX_CATCHUP + 1)
+        with mock.patch.object(self.worker_b, 'wake'):
+            self.assertTrue(self.worker_b.might_exist('nope42'))
+
+    def test_requested_rebuild(self):
+        URLModel.objects.bulk_create([URLModel(original_url='https://example.com/bulk', short_code='bulk01')])
+        self.worker_a.request_rebuild()
+        with mock.patch.object(self.worker_b, 'wake') as wake:
+            self.assertTrue(self.worker_b.might_exist('bulk01'))
+        wake.assert_called_once()
+        self.worker_b.build()
+        self.assertTrue(self.worker_b.might_exist('bulk01'))
+        self.assertFalse(self.worker_b.might_exist('nope42'))
+
+    def test_unshared_cache_turns_the_filter_off(self):
+        with mock.patch.object(bloom, 'UNSHARED_CACHE_BACKENDS', (type(self.shared),)), \
+                self.assertLogs('urls.bloom', 'WARNING'):
+            worker = ShortCodeFilter(interval=3600)
+            self.assertFalse(worker.active)
+            self.assertTrue(worker.might_exist('nope42'))
+
+
+@override_settings(SHORT_CODE_FILTER_ENABLED=True)
+class RedirectFilterTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(bloom, 'UNSHARED_CACHE_BACKENDS', ())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(code_filter.reset)
+        code_filter.build()
+
+    def test_unknown_code_is_404_without_a_query(self):
+        with self.assertNumQueries(0):
+            response = self.client.get('/nope42/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_link_created_on_another_worker_redirects(self):
+        journal_codes = code_filter.journal_codes
+        # Journaled only, as if published by another worker's filter
+        with mock.patch.object(code_filter, 'add'), self.captureOnCommitCallbacks(execute=True):
+            url = URLModel.objects.create(original_url='https://example.com/new')
+        link_cache.local.clear()
+        caches[settings.URL_CACHE_ALIAS].delete(KEY_PREFIX + url.short_code)
+        self.assertEqual(self.client.get(f'/{url.short_code}/').status_code, 302)
+        self.assertEqual(code_filter.journal_codes, journal_codes + 1)
+
+    def test_status_endpoint(self):
+        data = self.client.get('/api/health/code-filter').json()
+        self.assertTrue(data['active'])
+        self.assertTrue(data['ready'])
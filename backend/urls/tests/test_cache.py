@@ -0,0 +1,87 @@
+# backend/urls/tests/test_cache.py
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from urls.cache import KEY_PREFIX, LRUCache, get_link, link_cache
+from urls.models import URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class LRUCacheTests(LinkCrushTestCase):
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(maxsize=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.evictions, 1)
+
+    def test_entries_expire_after_the_shorter_ttl(self):
+        lru = LRUCache(maxsize=10, ttl=60)
+        with mock.patch('urls.cache.time.monotonic', return_value=1000.0):
+            lru.set('short', 1, ttl=5)
+            lru.set('long', 2, ttl=600)
+        with mock.patch('urls.cache.time.monotonic', return_value=1010.0):
+            self.assertIsNone(lru.get('short'))
+            self.assertEqual(lru.get('long'), 2)
+        with mock.patch('urls.cache.time.monotonic', return_value=1061.0):
+            # Capped at the cache's own TTL
+            self.assertIsNone(lru.get('long'))
+        self.assertEqual(len(lru), 0)
+
+
+class LinkCacheInvalidationTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = URLModel.objects.create(original_url='https://example.com/before')
+        self.code = self.url.short_code
+        self.shared = caches[settings.URL_CACHE_ALIAS]
+
+    def test_lookup_fills_both_tiers(self):
+        self.assertEqual(get_link(self.code)['original_url'], 'https://example.com/before')
+        self.assertIsNotNone(link_cache.local.get(self.code))
+        self.assertIsNotNone(self.shared.get(KEY_PREFIX + self.code))
+
+    def test_unknown_code_is_not_cached(self):
+        self.assertIsNone(get_link('nope42'))
+        self.assertIsNone(self.shared.get(KEY_PREFIX + 'nope42'))
+
+    def test_edit_invalidates_once_committed(self):
+        get_link(self.code)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.url.original_url = 'https://example.com/after'
+            self.url.save()
+            # Still the committed row until the transaction commits
+            self.assertEqual(get_link(self.code)['original_url'], 'https://example.com/before')
+        self.assertIsNone(self.shared.get(KEY_PREFIX + self.code))
+        self.assertEqual(get_link(self.code)['original_url'], 'https://example.com/after')
+
+    def test_rolled_back_edit_keeps_cache(self):
+        get_link(self.code)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.url.original_url = 'https://example.com/after'
+                    self.url.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertIsNotNone(self.shared.get(KEY_PREFIX + self.code))
+
+    def test_delete_invalidates(self):
+        get_link(self.code)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.url.delete()
+        self.assertIsNone(get_link(self.code))
+
+    def test_create_writes_through(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            url = URLModel.objects.create(original_url='https://example.com/new')
+        self.assertEqual(self.shared.get(KEY_PREFIX + url.short_code)['original_url'], 'https://example.com/new')
@@ -0,0 +1,156 @@
+# backend/urls/tests/test_clicklog.py
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+
+from urls import clicklog
+from urls.clicklog import ACTIVE_SUFFIX, ClickLog
+from urls.models import ClickEvent, ClickLogOffset, URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class ClickLogTestCase(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.log = self.make_log()
+
+    def make_log(self, **options):
+        options = {
+            'interval': 3600, 'buffer_bytes': 1 << 20, 'max_buffer_bytes': 1 << 20,
+            'segment_bytes': 1 << 20, 'segment_seconds': 3600, **options,
+        }
+        log = ClickLog(self.directory, **options)
+        self.addCleanup(log.reset)
+        return log
+
+    def files(self):
+        return sorted(os.listdir(self.directory))
+
+
+class ClickLogWriterTests(ClickLogTestCase):
+    def test_events_are_buffered_until_flushed(self):
+        request = RequestFactory().get('/abc123/', HTTP_REFERER='https://ref.example/', HTTP_CF_IPCOUNTRY='de',
+                                       HTTP_USER_AGENT='Mozilla/5.0 "quoted"')
+        self.log.append('abc123', request)
+        self.assertEqual(self.files(), [])
+        self.log.flush()
+        [name] = self.files()
+        self.assertTrue(name.endswith('.ndjson' + ACTIVE_SUFFIX))
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            rows, skipped = clicklog.parse_events(f.read())
+        self.assertEqual(skipped, 0)
+        self.assertEqual([row[:1] + row[2:] for row in rows],
+                         [('abc123', 'https://ref.example/', 'DE', 'Mozilla/5.0 "quoted"')])
+
+    def test_seal_renames_the_segment(self):
+        self.log.append('abc123')
+        self.log.flush(seal=True)
+        [name] = self.files()
+        self.assertTrue(name.endswith('.ndjson'))
+        # The next flush starts a new segment
+        self.log.append('def456')
+        self.log.flush()
+        self.assertEqual(len(self.files()), 2)
+
+    def test_rotates_by_size(self):
+        log = self.make_log(segment_bytes=1)
+        for code in ('a1', 'b2', 'c3'):
+            log.append(code)
+            log.flush()
+        self.assertEqual(len(self.files()), 3)
+        self.assertFalse(any(name.endswith(ACTIVE_SUFFIX) for name in self.files()))
+
+    def test_events_beyond_the_buffer_limit_are_dropped(self):
+        log = self.make_log(max_buffer_bytes=1)
+        log.append('a1')
+        log.append('b2')
+        self.assertEqual((log.appended, log.dropped), (1, 1))
+
+    def test_failed_write_is_kept_for_the_next_flush(self):
+        self.log.append('abc123')
+        with mock.patch('urls.clicklog.os.write', side_effect=OSError('disk full')), \
+                self.assertLogs('urls.clicklog', 'ERROR'):
+            self.assertEqual(self.log.flush(), 0)
+        self.assertEqual(self.log.failures, 1)
+        self.assertGreater(self.log.stats()['depth'], 0)
+        self.assertGreater(self.log.flush(), 0)
+
+
+class IngestTests(ClickLogTestCase):
+    def write_segment(self, *codes, seal=True):
+        for code in codes:
+            self.log.append(code)
+        self.log.flush(seal=seal)
+
+    def ingest(self):
+        out = StringIO()
+        call_command('ingest_clicks', '--dir', self.directory, stdout=out)
+        return out.getvalue()
+
+    def test_loads_and_deletes_sealed_segments(self):
+        self.write_segment('a1', 'b2')
+        self.write_segment('c3')
+        self.assertIn('Loaded 3 click event(s) from 2 segment(s)', self.ingest())
+        self.assertEqual(sorted(ClickEvent.objects.values_list('short_code', flat=True)), ['a1', 'b2', 'c3'])
+        self.assertEqual(self.files(), [])
+        self.assertFalse(ClickLogOffset.objects.exists())
+
+    def test_active_segment_resumes_from_its_offset(self):
+        self.write_segment('a1', seal=False)
+        self.ingest()
+        [name] = self.files()
+        self.assertTrue(name.endswith(ACTIVE_SUFFIX))
+        self.assertTrue(ClickLogOffset.objects.exists())
+        self.write_segment('b2')
+        self.assertIn('Loaded 1 click event(s)', self.ingest())
+        self.assertEqual(sorted(ClickEvent.objects.values_list('short_code', flat=True)), ['a1', 'b2'])
+        self.assertEqual(self.files(), [])
+
+    def test_partial_line_waits_for_the_rest(self):
+        path = os.path.join(self.directory, f'host-1-{int(time.time() * 1000)}-1.ndjson' + ACTIVE_SUFFIX)
+        with open(path, 'w') as f:
+            f.write('{"t":1700000000.0,"c":"a1","r":"","g":"","u":""}\n{"t":17000')
+        self.ingest()
+        self.assertEqual(ClickEvent.objects.count(), 1)
+        self.assertEqual(ClickLogOffset.objects.get().offset, len('{"t":1700000000.0,"c":"a1","r":"","g":"","u":""}\n'))
+
+    @override_settings(CLICK_LOG_STALE_SECONDS=0)
+    def test_stale_active_segment_is_finished(self):
+        self.write_segment('a1', seal=False)
+        with open(os.path.join(self.directory, self.files()[0]), 'a') as f:
+            f.write('{"t":17000')
+        time.sleep(0.01)
+        with self.assertLogs('urls.clicklog', 'WARNING'):
+            self.ingest()
+        self.assertEqual(ClickEvent.objects.count(), 1)
+        self.assertEqual(self.files(), [])
+
+    def test_malformed_lines_are_skipped(self):
+        with open(os.path.join(self.directory, 'host-1-1-1.ndjson'), 'w') as f:
+            f.write('{"t":1700000000.0,"c":"a1"}\nnot json\n{"c":"b2"}\n')
+        self.assertIn('skipped 2 malformed line(s)', self.ingest())
+        self.assertEqual(ClickEvent.objects.get().short_code, 'a1')
+
+    def test_segments_are_read_oldest_first(self):
+        for created_ms in (300, 20, 1000):
+            open(os.path.join(self.directory, f'host-1-{created_ms}-1.ndjson'), 'w').close()
+        self.assertEqual([name for name, _, _ in clicklog.list_segments(self.directory)],
+                         ['host-1-20-1.ndjson', 'host-1-300-1.ndjson', 'host-1-1000-1.ndjson'])
+
+
+@override_settings(CLICK_LOG_ENABLED=True)
+class RedirectLoggingTests(LinkCrushTestCase):
+    def test_redirect_appends_an_event(self):
+        url = URLModel.objects.create(original_url='https://example.com/')
+        with mock.patch.object(clicklog.click_log, 'append') as append:
+            self.client.get(f'/{url.short_code}/')
+        self.assertEqual(append.call_args.args[0], url.short_code)
@@ -0,0 +1,95 @@
+# backend/urls/tests/test_clicks.py
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+
+from urls import clicks, owners
+from urls.cache import get_link, link_cache
+from urls.clicks import ClickBuffer, click_buffer, record_click, write_click_counts
+from urls.models import URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class WriteClickCountsTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.a = URLModel.objects.create(original_url='https://example.com/a', owner=self.owner)
+        self.b = URLModel.objects.create(original_url='https://example.com/b')
+
+    def test_adds_counts_and_owner_totals(self):
+        write_click_counts({self.a.short_code: 3, self.b.short_code: 2, 'missing': 7})
+        self.a.refresh_from_db()
+        self.b.refresh_from_db()
+        self.assertEqual((self.a.click_count, self.b.click_count), (3, 2))
+        self.assertEqual(owners.get_totals(self.owner.id), (1, 3))
+
+    def test_failed_flush_applies_nothing(self):
+        # One code per batch, so the failure comes after a batch was written
+        with mock.patch.object(clicks, 'FLUSH_BATCH_SIZE', 1), \
+                mock.patch.object(owners, 'adjust', side_effect=RuntimeError('boom')):
+            with self.assertRaises(RuntimeError):
+                write_click_counts({self.a.short_code: 3, self.b.short_code: 2})
+        self.assertEqual(
+            sorted(URLModel.objects.values_list('click_count', flat=True)), [0, 0],
+        )
+
+    def test_reaching_max_clicks_expires_link_after_commit(self):
+        self.b.max_clicks = 2
+        self.b.save()
+        get_link(self.b.short_code)
+        with mock.patch.object(link_cache, 'invalidate_many', wraps=link_cache.invalidate_many) as invalidate:
+            with self.captureOnCommitCallbacks(execute=True):
+                write_click_counts({self.b.short_code: 2})
+                invalidate.assert_not_called()
+            invalidate.assert_called_once_with([self.b.short_code])
+        self.b.refresh_from_db()
+        self.assertTrue(self.b.is_expired())
+        self.assertIsNotNone(get_link(self.b.short_code)['expires_at'])
+
+
+class ClickBufferTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = URLModel.objects.create(original_url='https://example.com/')
+        self.buffer = ClickBuffer(interval=3600, threshold=1000)
+
+    def test_coalesces_per_code(self):
+        for _ in range(5):
+            self.buffer.record(self.url.short_code)
+        self.assertEqual(self.buffer.depth, 5)
+        self.assertEqual(self.buffer.flush(), 5)
+        self.assertEqual(self.buffer.depth, 0)
+        self.url.refresh_from_db()
+        self.assertEqual(self.url.click_count, 5)
+
+    def test_failed_flush_is_retried_exactly_once(self):
+        self.buffer.record(self.url.short_code, 3)
+        with mock.patch.object(clicks, 'write_click_counts', side_effect=RuntimeError('db down')):
+            self.assertEqual(self.buffer.flush(), 0)
+        self.assertEqual(self.buffer.failures, 1)
+        self.assertEqual(self.buffer.depth, 3)
+
+        self.buffer.record(self.url.short_code, 2)
+        self.assertEqual(self.buffer.flush(), 5)
+        self.assertEqual(self.buffer.flush(), 0)
+        self.url.refresh_from_db()
+        self.assertEqual(self.url.click_count, 5)
+
+
+class RecordClickTests(LinkCrushTestCase):
+    @override_settings(CLICK_BUFFER_ENABLED=True)
+    def test_buffered_click_makes_no_queries(self):
+        url = URLModel.objects.create(original_url='https://example.com/')
+        self.addCleanup(click_buffer.drain)
+        with self.assertNumQueries(0):
+            record_click(url.short_code)
+        self.assertEqual(click_buffer.drain(), {url.short_code: 1})
+
+    def test_unbuffered_click_is_written_immediately(self):
+        url = URLModel.objects.create(original_url='https://example.com/')
+        record_click(url.short_code)
+        url.refresh_from_db()
+        self.assertEqual(url.click_count, 1)
@@ -0,0 +1,80 @@
+# backend/urls/tests/test_codegen.py
+from unittest import skipUnless
+
+from django.db import connection, transaction
+from django.test import override_settings
+
+from urls.codegen import (
+    AllocatorExhausted, FeistelAllocator, RecyclingAllocator, SequenceAllocator, base62_decode,
+    base62_encode, claim_recycled, reserve_block,
+)
+from urls.models import RecycledCode, URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class Base62Tests(LinkCrushTestCase):
+    def test_round_trip(self):
+        for n in (0, 1, 61, 62, 3843, 62 ** 6 - 1):
+            self.assertEqual(base62_decode(base62_encode(n)), n)
+
+    def test_padding(self):
+        self.assertEqual(base62_encode(1, 6), '000001')
+
+
+class ReserveBlockTests(LinkCrushTestCase):
+    def test_blocks_do_not_overlap(self):
+        first = reserve_block('test:blocks', 10)
+        second = reserve_block('test:blocks', 5)
+        self.assertEqual(first[1] - first[0], 10)
+        self.assertEqual(second, (first[1], first[1] + 5))
+
+    @skipUnless(connection.vendor == 'postgresql', 'SQLite reserves on the caller connection')
+    def test_reservation_survives_caller_rollback(self):
+        try:
+            with transaction.atomic():
+                start, end = reserve_block('test:rollback', 10)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(reserve_block('test:rollback', 10)[0], end)
+
+
+class AllocatorTests(LinkCrushTestCase):
+    def test_sequence_codes_are_unique_across_blocks(self):
+        allocator = SequenceAllocator(6, block_size=3)
+        codes = [allocator.allocate() for _ in range(10)]
+        self.assertEqual(len(set(codes)), 10)
+        self.assertTrue(all(len(code) == 6 for code in codes))
+
+    def test_feistel_is_a_permutation(self):
+        allocator = FeistelAllocator(2, key='test')
+        values = [allocator.permute(n) for n in range(allocator.domain)]
+        self.assertEqual(sorted(values), list(range(allocator.domain)))
+
+    def test_feistel_exhaustion(self):
+        allocator = FeistelAllocator(1, key='test')
+        with self.assertRaises(AllocatorExhausted):
+            allocator.permute(allocator.domain)
+
+    @override_settings(SHORT_CODE_ALLOCATOR='feistel', SHORT_CODE_LENGTH=6)
+    def test_new_links_get_distinct_codes(self):
+        codes = {URLModel.objects.create(original_url=f'https://example.com/{i}').short_code for i in range(20)}
+        self.assertEqual(len(codes), 20)
+        self.assertTrue(all(len(code) == 6 for code in codes))
+
+
+@override_settings(SHORT_CODE_RECYCLE_AFTER=0)
+class RecyclingTests(LinkCrushTestCase):
+    def test_recycled_codes_come_first(self):
+        RecycledCode.objects.bulk_create([RecycledCode(short_code=code) for code in ('old001', 'old002')])
+        allocator = RecyclingAllocator(SequenceAllocator(6, block_size=10), block_size=10)
+        codes = [allocator.allocate() for _ in range(3)]
+        self.assertEqual(sorted(codes[:2]), ['old001', 'old002'])
+        self.assertNotIn(codes[2], ('old001', 'old002'))
+        self.assertFalse(RecycledCode.objects.exists())
+
+    @override_settings(SHORT_CODE_RECYCLE_AFTER=3600)
+    def test_codes_rest_before_reuse(self):
+        RecycledCode.objects.create(short_code='old001')
+        self.assertEqual(claim_recycled(10), [])
@@ -0,0 +1,91 @@
+# backend/urls/tests/test_expiry.py
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from urls import expiry, owners
+from urls.models import RecycledCode, URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class ExpiredRedirectTests(LinkCrushTestCase):
+    def test_past_expiry_is_gone(self):
+        url = URLModel.objects.create(
+            original_url='https://example.com/', expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        response = self.client.get(f'/{url.short_code}/')
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.json(), {'error': 'Short URL has expired'})
+
+    def test_future_expiry_caps_cache_max_age(self):
+        url = URLModel.objects.create(
+            original_url='https://example.com/', track_clicks=False,
+            expires_at=timezone.now() + timedelta(seconds=100),
+        )
+        response = self.client.get(f'/{url.short_code}/')
+        self.assertEqual(response.status_code, 302)
+        max_age = int(response.headers['Cache-Control'].rpartition('=')[2])
+        self.assertLessEqual(max_age, 100)
+
+    def test_max_clicks(self):
+        url = URLModel.objects.create(original_url='https://example.com/', max_clicks=2)
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(self.client.get(f'/{url.short_code}/').status_code, 302)
+        self.assertEqual(self.client.get(f'/{url.short_code}/').status_code, 410)
+        url.refresh_from_db()
+        self.assertEqual(url.click_count, 2)
+
+    def test_unknown_code(self):
+        response = self.client.get('/nope42/')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Short URL not found'})
+
+    def test_shortening_an_expired_url_replaces_it(self):
+        old = URLModel.objects.create(
+            original_url='https://example.com/', expires_at=timezone.now() - timedelta(seconds=1),
+        )
+        response = self.client.post('/api/shorten', {'url': 'https://example.com/'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(response.json()['shortCode'], old.short_code)
+        self.assertFalse(URLModel.objects.filter(pk=old.pk).exists())
+
+
+class PurgeTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        past = timezone.now() - timedelta(hours=1)
+        self.expired = [
+            URLModel.objects.create(original_url=f'https://example.com/{i}', owner=self.owner, expires_at=past)
+            for i in range(3)
+        ]
+        self.live = URLModel.objects.create(original_url='https://example.com/live', owner=self.owner)
+
+    def test_purge_deletes_only_expired(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expiry.purge_batch(batch_size=2), 2)
+            self.assertEqual(expiry.purge_batch(batch_size=2), 1)
+        self.assertEqual(list(URLModel.objects.all()), [self.live])
+        self.assertEqual(owners.get_totals(self.owner.id), (1, 0))
+
+    def test_command(self):
+        out = StringIO()
+        call_command('purge_expired', '--dry-run', stdout=out)
+        self.assertEqual(URLModel.objects.count(), 4)
+        call_command('purge_expired', stdout=out)
+        self.assertEqual(expiry.count_expired(), 0)
+        self.assertEqual(URLModel.objects.count(), 1)
+
+    @override_settings(SHORT_CODE_RECYCLE=True)
+    def test_recycle(self):
+        expiry.purge_batch()
+        self.assertEqual(
+            set(RecycledCode.objects.values_list('short_code', flat=True)),
+            {url.short_code for url in self.expired},
+        )
@@ -0,0 +1,125 @@
+# backend/urls/tests/test_export.py
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import timedelta
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from urls import export
+from urls.models import URLModel
+
+from .utils import LinkCrushTestCase
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ExportTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        URLModel.objects.bulk_create([
+            URLModel(original_url=f'https://example.com/{i}', short_code=f'exp{i:03}', click_count=i)
+            for i in range(5)
+        ])
+        self.codes = [f'exp{i:03}' for i in range(5)]
+
+    def test_batches_follow_chunk_size(self):
+        batches = list(export.iter_rows(URLModel.objects.all(), chunk_size=2))
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual([row[0] for batch in batches for row in batch], self.codes)
+
+    def test_csv(self):
+        text = ''.join(export.export_chunks(URLModel.objects.all(), 'csv', chunk_size=2))
+        rows = list(csv.DictReader(io.StringIO(text)))
+        self.assertEqual([row['short_code'] for row in rows], self.codes)
+        self.assertEqual(rows[3]['click_count'], '3')
+        self.assertEqual(list(rows[0]), list(export.EXPORT_FIELDS))
+
+    def test_csv_empty_selection_has_header(self):
+        text = ''.join(export.export_chunks(URLModel.objects.none(), 'csv'))
+        self.assertEqual(text.strip(), ','.join(export.EXPORT_FIELDS))
+
+    def test_ndjson(self):
+        lines = ''.join(export.export_chunks(URLModel.objects.all(), 'ndjson', chunk_size=2)).splitlines()
+        first = json.loads(lines[0])
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(set(first), {'shortCode', 'originalUrl', 'clickCount', 'createdAt'})
+        self.assertEqual(first['shortCode'], 'exp000')
+
+    def test_gzip_round_trip(self):
+        plain = ''.join(export.export_chunks(URLModel.objects.all(), 'ndjson'))
+        compressed = b''.join(export.export_chunks(URLModel.objects.all(), 'ndjson', gzip=True))
+        self.assertEqual(gzip.decompress(compressed).decode(), plain)
+
+
+class AdminExportTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_superuser('admin', password='pw'))
+        self.urls = [URLModel.objects.create(original_url=f'https://example.com/{i}') for i in range(3)]
+
+    def run_action(self, action, **headers):
+        return self.client.post('/admin/urls/urlmodel/', {
+            'action': action,
+            '_selected_action': [url.pk for url in self.urls[:2]],
+        }, headers=headers)
+
+    def test_streams_selected_rows(self):
+        response = self.run_action('export_selected_urls')
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment; filename="linkcrush-urls-', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['short_code'] for row in rows], [url.short_code for url in self.urls[:2]])
+
+    def test_gzip_when_accepted(self):
+        response = self.run_action('export_selected_urls_ndjson', **{'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+
+class ExportCommandTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.old = URLModel.objects.create(original_url='https://example.com/old')
+        URLModel.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=30))
+        self.new = URLModel.objects.create(original_url='https://example.com/new')
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def export(self, *args):
+        call_command('export_urls', '-o', self.path, *args, stderr=io.StringIO())
+
+    def test_csv_gzip_file(self):
+        self.export('--gzip', '--chunk-size', '1')
+        with gzip.open(self.path, 'rt', encoding='utf-8', newline='') as f:
+            codes = [row['short_code'] for row in csv.DictReader(f)]
+        self.assertEqual(codes, [self.old.short_code, self.new.short_code])
+
+    def test_since(self):
+        self.export('--format', 'ndjson', '--since', f'{timezone.now() - timedelta(days=1):%Y-%m-%d}')
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual([json.loads(line)['shortCode'] for line in f], [self.new.short_code])
+
+    def test_bad_since(self):
+        with self.assertRaisesMessage(CommandError, '--since must be a YYYY-MM-DD date'):
+            self.export('--since', 'yesterday')
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet(self):
+        import pyarrow.parquet as pq
+
+        self.export('--format', 'parquet')
+        self.assertEqual(pq.read_table(self.path).column('short_code').to_pylist(),
+                         [self.old.short_code, self.new.short_code])
@@ -0,0 +1,141 @@
+# backend/urls/tests/test_importer.py
+import csv
+import os
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
+
+from urls import owners
+from urls.cache import get_link
+from urls.importer import PostgresCopyLoader, prepare_batch
+from urls.models import ImportCheckpoint, URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class PrepareBatchTests(LinkCrushTestCase):
+    def test_validates_and_normalizes(self):
+        rows, rejected = prepare_batch([
+            {'shortCode': 'abc', 'originalUrl': 'example.com/a', 'clickCount': '4'},
+            {'code': 'bad code!', 'url': 'https://example.com/b'},
+            {'short_code': 'def', 'original_url': 'https://example.com/c', 'clicks': 'many'},
+            {'short_code': 'ghi', 'url': 'https://example.com/d', 'created_at': 'yesterday'},
+            'not a record',
+        ])
+        self.assertEqual(rejected, 4)
+        self.assertEqual([(row[0], row[1], row[3]) for row in rows], [('abc', 'http://example.com/a', 4)])
+
+
+class ImportConflictTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.existing = URLModel.objects.create(
+            short_code='keep01', original_url='https://example.com/old', click_count=10, owner=self.owner,
+        )
+        fd, self.path = tempfile.mkstemp(suffix='.csv')
+        self.addCleanup(os.remove, self.path)
+        with os.fdopen(fd, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['short_code', 'original_url', 'click_count', 'created_at'])
+            writer.writerow(['keep01', 'https://example.com/new', 5, '2024-01-01T00:00:00Z'])
+            writer.writerow(['fresh1', 'https://example.com/fresh', 3, '2024-01-02T00:00:00Z'])
+            writer.writerow(['fresh1', 'https://example.com/repeat', 1, '2024-01-03T00:00:00Z'])
+            writer.writerow(['bad code', 'https://example.com/x', 1, ''])
+
+    def run_import(self, policy):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('import_urls', self.path, '--on-conflict', policy, '--workers', '1',
+                         '--job', policy, stdout=out)
+        return out.getvalue()
+
+    def assert_fresh_imported(self):
+        fresh = URLModel.objects.get(short_code='fresh1')
+        self.assertEqual((fresh.original_url, fresh.click_count), ('https://example.com/fresh', 3))
+
+    def test_skip(self):
+        output = self.run_import('skip')
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.original_url, self.existing.click_count), ('https://example.com/old', 10))
+        self.assert_fresh_imported()
+        self.assertIn('1 inserted, 0 updated, 2 skipped, 1 rejected', output)
+
+    def test_add_clicks(self):
+        self.run_import('add-clicks')
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.original_url, self.existing.click_count), ('https://example.com/old', 15))
+        self.assertEqual(owners.get_totals(self.owner.id), (1, 15))
+        self.assertOwnerStatsConsistent()
+        self.assert_fresh_imported()
+
+    def test_add_clicks_expires_at_max_clicks(self):
+        URLModel.objects.filter(pk=self.existing.pk).update(max_clicks=12)
+        get_link('keep01')
+        self.run_import('add-clicks')
+        self.existing.refresh_from_db()
+        self.assertIsNotNone(self.existing.expires_at)
+        self.assertEqual(get_link('keep01')['expires_at'], self.existing.expires_at)
+
+    def test_replace(self):
+        get_link('keep01')
+        self.run_import('replace')
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.original_url, self.existing.click_count), ('https://example.com/new', 5))
+        self.assertEqual(owners.get_totals(self.owner.id), (1, 5))
+        self.assertEqual(get_link('keep01')['original_url'], 'https://example.com/new')
+        self.assertOwnerStatsConsistent()
+        self.assert_fresh_imported()
+
+    def test_error(self):
+        with self.assertRaisesMessage(CommandError, 'already exist'):
+            self.run_import('error')
+        self.assertFalse(URLModel.objects.filter(short_code='fresh1').exists())
+        self.assertEqual(ImportCheckpoint.objects.get(job='error').records_done, 0)
+
+    def test_rerun_resumes_from_checkpoint(self):
+        self.run_import('skip')
+        output = self.run_import('skip')
+        self.assertIn('0 inserted', output)
+        self.assertEqual(ImportCheckpoint.objects.get(job='skip').records_done, 4)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'COPY loader needs PostgreSQL')
+class PostgresCopyLoaderTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = User.objects.create_user('owner')
+        self.existing = URLModel.objects.create(
+            short_code='keep01', original_url='https://example.com/old', click_count=10, max_clicks=20,
+            owner=self.owner,
+        )
+        owners.get_totals(self.owner.id)
+
+    def load(self, *records):
+        rows, _ = prepare_batch([
+            {'short_code': code, 'url': f'https://example.com/{code}/{clicks}', 'clicks': clicks}
+            for code, clicks in records
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            return PostgresCopyLoader('add-clicks').load(rows)
+
+    def test_add_clicks_moves_owner_totals(self):
+        result = self.load(('keep01', 4), ('fresh1', 2))
+        self.assertEqual((result.inserted, result.updated, result.skipped), (1, 1, 0))
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.click_count, 14)
+        self.assertIsNone(self.existing.expires_at)
+        self.assertEqual(owners.get_totals(self.owner.id), (1, 14))
+        self.assertOwnerStatsConsistent()
+
+    def test_add_clicks_expires_at_max_clicks(self):
+        get_link('keep01')
+        self.load(('keep01', 10))
+        self.existing.refresh_from_db()
+        self.assertLessEqual(self.existing.expires_at, timezone.now())
+        self.assertEqual(get_link('keep01')['expires_at'], self.existing.expires_at)
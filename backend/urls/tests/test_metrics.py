@@ -0,0 +1,90 @@
+# backend/urls/tests/test_metrics.py
+import re
+
+from django.test import override_settings
+
+from urls import metrics, normalize
+from urls.models import URLModel
+
+from .utils import LinkCrushTestCase
+
+SAMPLE_RE = re.compile(r'^([a-z_]+)(\{[^}]*\})? (\S+)$')
+
+
+def parse_exposition(text):
+    """{(name, labels): value} for every sample; HELP/TYPE lines must precede their samples"""
+    samples = {}
+    declared = set()
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            declared.add(line.split()[2])
+            continue
+        if line.startswith('#'):
+            continue
+        name, labels, value = SAMPLE_RE.match(line).groups()
+        assert re.sub(r'_(bucket|sum|count)$', '', name) in declared or name in declared, name
+        samples[name, labels or ''] = float(value)
+    return samples
+
+
+class MetricsEndpointTests(LinkCrushTestCase):
+    def scrape(self, **kwargs):
+        return self.client.get('/api/metrics', **kwargs)
+
+    def test_exposition(self):
+        url = URLModel.objects.create(original_url='https://example.com/')
+        self.client.get(f'/{url.short_code}/')
+        response = self.scrape()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        samples = parse_exposition(response.content.decode())
+        self.assertGreaterEqual(samples['linkcrush_requests_total', '{view="redirect_url",status="302"}'], 1)
+        self.assertGreaterEqual(samples['linkcrush_request_duration_seconds_count', '{view="redirect_url"}'], 1)
+        self.assertIn(('linkcrush_link_cache_hit_ratio', '{tier="local"}'), samples)
+
+    def test_normalize_stages_are_exported(self):
+        normalize.clear_cache()
+        self.client.post('/api/shorten', {'url': 'https://example.com/?url=not-a-target'}, content_type='application/json')
+        samples = parse_exposition(self.scrape().content.decode())
+        for stage in normalize.STAGES:
+            self.assertIn(('linkcrush_normalize_stage_calls_total', f'{{stage="{stage}"}}'), samples)
+            self.assertIn(('linkcrush_normalize_stage_seconds_total', f'{{stage="{stage}"}}'), samples)
+        self.assertGreaterEqual(samples['linkcrush_normalize_stage_calls_total', '{stage="validate"}'], 1)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        self.assertEqual(self.scrape().status_code, 404)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_address_outside_allowed_networks_is_refused(self):
+        response = self.scrape()
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'error': 'Not allowed'})
+        self.assertEqual(self.scrape(REMOTE_ADDR='10.1.2.3').status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=[], METRICS_TOKEN='s3cret')
+    def test_bearer_token(self):
+        self.assertEqual(self.scrape().status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.scrape(HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'], RATE_LIMIT_TRUSTED_PROXIES=1)
+    def test_forwarded_address_behind_trusted_proxy(self):
+        response = self.scrape(REMOTE_ADDR='192.0.2.1', HTTP_X_FORWARDED_FOR='10.0.0.1')
+        self.assertEqual(response.status_code, 200)
+
+
+class MetricsPrimitivesTests(LinkCrushTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram('test_seconds', 'Test', ['view'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, 'v')
+        samples = {(name, dict(labels).get('le')): value for name, labels, value in histogram.collect()}
+        self.assertEqual(samples['test_seconds_bucket', '0.1'], 1)
+        self.assertEqual(samples['test_seconds_bucket', '1.0'], 2)
+        self.assertEqual(samples['test_seconds_bucket', '+Inf'], 3)
+        self.assertEqual(samples['test_seconds_count', None], 3)
+        self.assertAlmostEqual(samples['test_seconds_sum', None], 5.55)
+
+    def test_label_values_are_escaped(self):
+        self.assertEqual(metrics._format_labels([('path', 'a"b\\c\n')]), '{path="a\\"b\\\\c\\n"}')
@@ -0,0 +1,82 @@
+# backend/urls/tests/test_moderators.py
+from io import StringIO
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+
+from urls import moderators
+
+from .utils import LinkCrushTestCase
+
+
+class ModeratorsTestCase(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        moderators.forget_group()
+        self.addCleanup(moderators.forget_group)
+
+    def is_moderator(self, user):
+        return user.groups.filter(name=moderators.MODERATORS_GROUP).exists()
+
+
+class StaffGroupSignalTests(ModeratorsTestCase):
+    def test_new_staff_user_joins(self):
+        user = User.objects.create_user('mod', is_staff=True)
+        self.assertTrue(self.is_moderator(user))
+        self.assertFalse(self.is_moderator(User.objects.create_superuser('root')))
+
+    def test_flag_changes_are_synced(self):
+        user = User.objects.create_user('mod')
+        user.is_staff = True
+        user.save()
+        self.assertTrue(self.is_moderator(user))
+        user.is_superuser = True
+        user.save()
+        self.assertFalse(self.is_moderator(user))
+
+    def test_login_costs_no_group_queries(self):
+        user = User.objects.create_user('mod', is_staff=True)
+        moderators.group_id()
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
+        user = User.objects.get(pk=user.pk)
+        user.first_name = 'Mo'
+        with self.assertNumQueries(1):
+            user.save()
+
+    def test_deleted_group_is_looked_up_again(self):
+        Group.objects.get(pk=moderators.group_id()).delete()
+        self.assertIsNone(moderators._group_id)
+        user = User.objects.create_user('mod', is_staff=True)
+        self.assertTrue(self.is_moderator(user))
+
+
+class SyncModeratorsCommandTests(ModeratorsTestCase):
+    def setUp(self):
+        super().setUp()
+        # queryset.update() bypasses the signal, like a bulk import would
+        self.staff = [User.objects.create_user(f'staff{i}') for i in range(3)]
+        User.objects.filter(pk__in=[u.pk for u in self.staff]).update(is_staff=True)
+        self.demoted = User.objects.create_user('demoted', is_staff=True)
+        User.objects.filter(pk=self.demoted.pk).update(is_staff=False)
+        self.superuser = User.objects.create_superuser('root')
+
+    def sync(self, *args):
+        out = StringIO()
+        call_command('sync_moderators', *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_changes_nothing(self):
+        self.assertIn('Would add 3 user(s) to Moderators and remove 1', self.sync('--dry-run'))
+        self.assertFalse(any(self.is_moderator(user) for user in self.staff))
+        self.assertTrue(self.is_moderator(self.demoted))
+
+    def test_reconciles_in_a_fixed_number_of_queries(self):
+        moderators.group_id()
+        with self.assertNumQueries(3):
+            output = self.sync()
+        self.assertIn('Added 3 user(s) to Moderators and removed 1', output)
+        self.assertTrue(all(self.is_moderator(user) for user in self.staff))
+        self.assertFalse(self.is_moderator(self.demoted))
+        self.assertFalse(self.is_moderator(self.superuser))
+        self.assertIn('Added 0 user(s) to Moderators and removed 0', self.sync())
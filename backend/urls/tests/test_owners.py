@@ -0,0 +1,108 @@
+# backend/urls/tests/test_owners.py
+from django.contrib.auth.models import User
+
+from urls import owners
+from urls.models import OwnerStats, URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class MyURLsTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        self.mine = [
+            URLModel.objects.create(original_url=f'https://example.com/{i}', owner=self.user, click_count=i)
+            for i in range(3)
+        ]
+        URLModel.objects.create(original_url='https://example.com/theirs', owner=self.other, click_count=50)
+        self.client.force_login(self.user)
+
+    def test_requires_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/me/urls').status_code, 401)
+
+    def test_own_links_newest_first_with_totals(self):
+        data = self.client.get('/api/me/urls').json()
+        self.assertEqual([row['shortCode'] for row in data['results']],
+                         [url.short_code for url in reversed(self.mine)])
+        self.assertEqual(data['totals'], {'urlCount': 3, 'totalClicks': 3})
+        self.assertIsNone(data['nextCursor'])
+
+    def test_pages(self):
+        response = self.client.get('/api/me/urls', {'limit': 2})
+        data = response.json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(response['X-Next-Cursor'], data['nextCursor'])
+        rest = self.client.get('/api/me/urls', {'limit': 2, 'cursor': data['nextCursor']}).json()
+        self.assertEqual([row['shortCode'] for row in rest['results']], [self.mine[0].short_code])
+        self.assertEqual(rest['totals']['urlCount'], 3)
+
+    def test_bad_cursor(self):
+        response = self.client.get('/api/me/urls', {'cursor': 'nope'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+    def test_totals_are_one_lookup_once_counted(self):
+        owners.get_totals(self.user.pk)
+        # session, user, page, totals
+        with self.assertNumQueries(4):
+            self.client.get('/api/me/urls')
+
+
+class OwnerStatsConsistencyTests(LinkCrushTestCase):
+    """The incrementally kept counters match a recount after every kind of change"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('owner', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        self.url = URLModel.objects.create(original_url='https://example.com/a', owner=self.user, click_count=7)
+        URLModel.objects.create(original_url='https://example.com/b', owner=self.user, click_count=3)
+
+    def test_shorten(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/shorten', {'url': 'https://example.com/c'}, content_type='application/json')
+            self.client.post('/api/shorten/bulk', {'urls': ['https://example.com/d', 'https://example.com/e']},
+                             content_type='application/json')
+        self.assertEqual(owners.get_totals(self.user.pk), (5, 10))
+        self.assertOwnerStatsConsistent()
+
+    def test_clicks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(f'/{self.url.short_code}/')
+        self.assertEqual(owners.get_totals(self.user.pk), (2, 11))
+        self.assertOwnerStatsConsistent()
+
+    def test_delete(self):
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/urls/{self.url.short_code}/').status_code, 200)
+        self.assertEqual(owners.get_totals(self.user.pk), (1, 3))
+        self.assertOwnerStatsConsistent()
+
+    def test_reassign_and_overwrite(self):
+        self.url.owner = self.other
+        self.url.click_count = 1
+        self.url.save()
+        self.assertEqual(owners.get_totals(self.user.pk), (1, 3))
+        self.assertEqual(owners.get_totals(self.other.pk), (1, 1))
+        self.assertOwnerStatsConsistent()
+
+    def test_admin_reset(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='pw'))
+        self.client.post('/admin/urls/urlmodel/', {
+            'action': 'reset_click_counts', '_selected_action': [self.url.pk],
+        })
+        self.assertEqual(owners.get_totals(self.user.pk), (2, 3))
+        self.assertOwnerStatsConsistent()
+
+    def test_owner_without_a_row_is_recounted(self):
+        OwnerStats.objects.all().delete()
+        self.assertEqual(owners.get_totals(self.user.pk), (2, 10))
+        # A delta for an owner without a row is replaced by a recount
+        owners.adjust({self.other.pk: (0, 1)})
+        self.assertEqual(OwnerStats.objects.get(pk=self.other.pk).total_clicks, 0)
+        self.assertOwnerStatsConsistent()
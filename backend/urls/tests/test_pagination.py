@@ -0,0 +1,95 @@
+# backend/urls/tests/test_pagination.py
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from urls.models import URLModel
+from urls.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, iter_by_id, iter_newest_first, keyset_page,
+)
+
+from .utils import LinkCrushTestCase
+
+
+class KeysetPaginationTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        for i in range(25):
+            URLModel.objects.create(original_url=f'https://example.com/{i}')
+        # Spread creation times, with a run of ties that only id can order
+        for i, url in enumerate(URLModel.objects.order_by('id')):
+            url.created_at = now - timedelta(minutes=i if i < 10 else 10)
+            url.save(update_fields=['created_at'])
+        self.expected = list(
+            URLModel.objects.order_by('-created_at', '-id').values_list('short_code', flat=True)
+        )
+
+    def test_cursor_round_trip(self):
+        created_at = timezone.now()
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_invalid_cursor(self):
+        for cursor in ('garbage', 'W10', 'WyJ4IiwxXQ', 'WyIyMDI1LTAxLTAxVDAwOjAwOjAwWiIsIjEiXQ'):
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_pages_cover_every_row_once(self):
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = keyset_page(URLModel.objects.all(), cursor, page_size=7)
+            seen.extend(row.short_code for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(seen, self.expected)
+
+    def test_rows_created_after_the_first_page_do_not_shift_later_pages(self):
+        rows, cursor = keyset_page(URLModel.objects.all(), None, page_size=10)
+        URLModel.objects.create(original_url='https://example.com/late')
+        rest, _ = keyset_page(URLModel.objects.all(), cursor, page_size=100)
+        self.assertEqual([row.short_code for row in rows + rest], self.expected)
+
+    def test_stats_endpoint_follows_next_cursor_header(self):
+        seen = []
+        params = {'limit': 10}
+        while True:
+            response = self.client.get('/api/stats', params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(item['shortCode'] for item in response.json())
+            cursor = response.headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+            self.assertIn('rel="next"', response.headers['Link'])
+            params['cursor'] = cursor
+        self.assertEqual(seen, self.expected)
+
+    def test_stats_endpoint_rejects_bad_cursor(self):
+        response = self.client.get('/api/stats', {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+    def test_ndjson_stream(self):
+        response = self.client.get('/api/stats', {'stream': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['shortCode'] for line in lines], self.expected)
+
+    def test_ndjson_stream_reads_in_keyset_chunks(self):
+        with mock.patch('urls.views.STATS_STREAM_CHUNK_SIZE', 4), self.assertNumQueries(7):
+            response = self.client.get('/api/stats', {'stream': 'ndjson'})
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['shortCode'] for line in lines], self.expected)
+
+    def test_chunked_scans(self):
+        chunks = list(iter_newest_first(URLModel.objects.all(), ('short_code',), 10))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual([code for chunk in chunks for (code,) in chunk], self.expected)
+        # A full last chunk needs one more (empty) query to find the end
+        chunks = list(iter_by_id(URLModel.objects.all(), ('short_code',), 5))
+        self.assertEqual([len(chunk) for chunk in chunks], [5] * 5)
+        self.assertEqual([code for chunk in chunks for (code,) in chunk],
+                         list(URLModel.objects.order_by('id').values_list('short_code', flat=True)))
@@ -0,0 +1,85 @@
+# backend/urls/tests/test_ratelimit.py
+from unittest import mock
+
+from django.test import override_settings
+
+from urls.models import URLModel
+from urls.ratelimit import Policy, rate_limiter
+
+from .utils import LinkCrushTestCase
+
+LIMITS = {'shorten': '2/m', 'shorten_bulk': '1/m', 'redirect': '3/m'}
+
+
+class PolicyTests(LinkCrushTestCase):
+    def test_parse(self):
+        policy = Policy('redirect', '600/m:100')
+        self.assertEqual((policy.interval, policy.burst, policy.lease), (0.1, 100, 10))
+
+    def test_invalid(self):
+        for spec in ('0/m', '10/w', 'ten/m'):
+            with self.assertRaises(ValueError):
+                Policy('shorten', spec)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS=LIMITS)
+class RateLimitTests(LinkCrushTestCase):
+    def shorten(self, n, **extra):
+        return self.client.post(
+            '/api/shorten', {'url': f'https://example.com/{n}'}, content_type='application/json', **extra,
+        )
+
+    def check_shorten_limit(self):
+        self.assertEqual(self.shorten(1).status_code, 201)
+        self.assertEqual(self.shorten(2).status_code, 201)
+        denied = self.shorten(3)
+        self.assertEqual(denied.status_code, 429)
+        self.assertGreaterEqual(int(denied.headers['Retry-After']), 1)
+        # Another client has its own bucket
+        self.assertEqual(self.shorten(4, REMOTE_ADDR='10.0.0.2').status_code, 201)
+
+    @override_settings(RATE_LIMIT_BACKEND='local')
+    def test_local_buckets(self):
+        self.check_shorten_limit()
+
+    @override_settings(RATE_LIMIT_BACKEND='cache')
+    def test_shared_buckets(self):
+        self.check_shorten_limit()
+
+    @override_settings(RATE_LIMIT_BACKEND='cache')
+    def test_shared_bucket_is_used_across_workers(self):
+        self.assertTrue(rate_limiter.check('shorten', 'ip:1')[0])
+        self.assertTrue(rate_limiter.check('shorten', 'ip:1')[0])
+        # A fresh worker has no local state, only the shared bucket
+        rate_limiter.reset()
+        self.assertFalse(rate_limiter.check('shorten', 'ip:1')[0])
+
+    @override_settings(RATE_LIMIT_BACKEND='cache')
+    def test_cache_errors_fail_open(self):
+        with mock.patch('urls.ratelimit.caches') as caches:
+            caches.__getitem__.side_effect = ConnectionError
+            for _ in range(5):
+                self.assertTrue(rate_limiter.check('shorten', 'ip:1')[0])
+
+    @override_settings(RATE_LIMIT_BACKEND='local')
+    def test_refill(self):
+        with mock.patch('urls.ratelimit.time.time', return_value=1000.0):
+            rate_limiter.check('shorten', 'ip:1')
+            rate_limiter.check('shorten', 'ip:1')
+            self.assertFalse(rate_limiter.check('shorten', 'ip:1')[0])
+        with mock.patch('urls.ratelimit.time.time', return_value=1030.0):
+            self.assertTrue(rate_limiter.check('shorten', 'ip:1')[0])
+
+    @override_settings(RATE_LIMIT_BACKEND='local')
+    def test_redirects(self):
+        code = URLModel.objects.create(original_url='https://example.com/').short_code
+        statuses = [self.client.get(f'/{code}/').status_code for _ in range(4)]
+        self.assertEqual(statuses, [302, 302, 302, 429])
+        response = self.client.get(f'/{code}/')
+        self.assertEqual(response.json(), {'error': 'Too many requests'})
+        self.assertIn('Retry-After', response.headers)
+
+    def test_disabled(self):
+        with self.settings(RATE_LIMIT_ENABLED=False):
+            for n in range(5):
+                self.assertEqual(self.shorten(n).status_code, 201)
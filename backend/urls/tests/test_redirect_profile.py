@@ -0,0 +1,46 @@
+# backend/urls/tests/test_redirect_profile.py
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from urls.models import URLModel
+from urlshortener import settings_redirect
+
+from .utils import LinkCrushTestCase
+
+PROFILE = 'urlshortener.settings_redirect'
+
+
+@override_settings(ROOT_URLCONF=settings_redirect.ROOT_URLCONF, MIDDLEWARE=settings_redirect.MIDDLEWARE)
+class RedirectProfileTests(LinkCrushTestCase):
+    def test_redirects(self):
+        url = URLModel.objects.create(original_url='https://example.com/target')
+        response = self.client.get(f'/{url.short_code}/')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], 'https://example.com/target')
+
+    def test_missing_slash_is_appended(self):
+        url = URLModel.objects.create(original_url='https://example.com/target')
+        self.assertRedirects(self.client.get(f'/{url.short_code}'), f'/{url.short_code}/',
+                             status_code=301, fetch_redirect_response=False)
+
+    def test_health_and_metrics(self):
+        self.assertEqual(self.client.get('/api/health').status_code, 200)
+        self.assertEqual(self.client.get('/api/metrics').status_code, 200)
+
+    def test_api_and_admin_are_not_served(self):
+        self.assertEqual(self.client.post('/api/shorten', {'url': 'https://example.com/'}).status_code, 404)
+        self.assertEqual(self.client.get('/admin/').status_code, 404)
+
+
+class StartupReportTests(LinkCrushTestCase):
+    def test_redirect_profile_skips_heavy_imports(self):
+        out = StringIO()
+        call_command('startup_report', '--profile', PROFILE, '--runs', '1', '--json', stdout=out)
+        report = json.loads(out.getvalue())[PROFILE]
+        self.assertEqual(report['heavy'], [])
+        self.assertEqual((report['apps'], report['middleware']),
+                         (len(settings_redirect.INSTALLED_APPS), len(settings_redirect.MIDDLEWARE)))
+        self.assertGreater(report['rss_mb'], 0)
@@ -0,0 +1,83 @@
+# backend/urls/tests/test_redirects.py
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from urls.cache import get_link
+from urls.models import URLModel
+from urls.redirects import link_etag
+
+from .utils import LinkCrushTestCase
+
+
+@override_settings(REDIRECT_CACHE_MAX_AGE=600)
+class RedirectResponseTests(LinkCrushTestCase):
+    def create(self, target='https://example.com/target', **fields):
+        return URLModel.objects.create(original_url=target, **fields)
+
+    def get(self, url, if_none_match=None):
+        headers = {'If-None-Match': if_none_match} if if_none_match else {}
+        return self.client.get(f'/{url.short_code}/', headers=headers)
+
+    def clicks(self, url):
+        url.refresh_from_db()
+        return url.click_count
+
+    def test_tracked_link_is_temporary_and_uncached(self):
+        url = self.create(redirect_status=301)
+        response = self.get(url)
+        # Downgraded so every visit comes back and is counted
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], 'https://example.com/target')
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertEqual(self.clicks(url), 1)
+
+    def test_tracked_308_becomes_307(self):
+        self.assertEqual(self.get(self.create(redirect_status=308)).status_code, 307)
+
+    def test_untracked_link_keeps_status_and_is_cacheable(self):
+        url = self.create(redirect_status=301, track_clicks=False)
+        response = self.get(url)
+        self.assertEqual(response.status_code, 301)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=600')
+
+    def test_per_link_cache_max_age(self):
+        response = self.get(self.create(redirect_status=308, track_clicks=False, cache_max_age=30))
+        self.assertEqual(response.status_code, 308)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=30')
+        response = self.get(self.create('https://example.com/other', track_clicks=False, cache_max_age=0))
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+    def test_max_age_is_capped_at_expiry(self):
+        url = self.create(track_clicks=False, expires_at=timezone.now() + timedelta(seconds=90))
+        max_age = int(self.get(url)['Cache-Control'].rsplit('=', 1)[1])
+        self.assertTrue(85 <= max_age <= 90, max_age)
+
+    def test_matching_etag_gets_304(self):
+        url = self.create()
+        etag = self.get(url)['ETag']
+        self.assertEqual(etag, link_etag(url.short_code, get_link(url.short_code)))
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertEqual(response.content, b'')
+
+    def test_edit_changes_etag(self):
+        url = self.create()
+        etag = self.get(url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            url.original_url = 'https://example.com/moved'
+            url.save()
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], 'https://example.com/moved')
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_expired_link_is_gone(self):
+        url = self.create(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.get(url)
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.json(), {'error': 'Short URL has expired'})
+        self.assertEqual(self.clicks(url), 0)
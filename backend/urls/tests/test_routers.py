@@ -0,0 +1,116 @@
+# backend/urls/tests/test_routers.py
+import time
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from urls import routers
+from urls.middleware import REPLICA_PIN_COOKIE, ReplicaPinningMiddleware
+from urls.routers import ReplicaRouter, pin_primary, read_alias, read_replica
+
+from .utils import LinkCrushTestCase
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_HEALTH_INTERVAL=60)
+class ReplicaRouterTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        routers._health.clear()
+        self.addCleanup(routers._health.clear)
+        patcher = mock.patch.object(routers, '_check', return_value=(True, 0.0))
+        self.check = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_only_reads_in_read_replica_use_the_replica(self):
+        self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+        with read_replica():
+            self.assertEqual(read_alias(), 'replica1')
+            self.assertEqual(ReplicaRouter().db_for_write(None), DEFAULT_DB_ALIAS)
+        self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+
+    def test_pinned_client_reads_the_primary(self):
+        with read_replica(), pin_primary():
+            self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+        self.check.assert_not_called()
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.check.return_value = (False, 9.0)
+        with read_replica():
+            self.assertEqual(read_alias(), DEFAULT_DB_ALIAS)
+        self.assertEqual(routers.stats(), {'replica1': {'healthy': False, 'lag_seconds': 9.0}})
+
+    def test_health_is_rechecked_once_per_interval(self):
+        with read_replica():
+            read_alias()
+            read_alias()
+        self.assertEqual(self.check.call_count, 1)
+        with override_settings(REPLICA_HEALTH_INTERVAL=0), read_replica():
+            read_alias()
+        self.assertEqual(self.check.call_count, 2)
+
+    def test_replicas_are_not_migrated(self):
+        self.assertIs(ReplicaRouter().allow_migrate('replica1', 'urls'), False)
+        self.assertIsNone(ReplicaRouter().allow_migrate(DEFAULT_DB_ALIAS, 'urls'))
+
+
+class ReplicaCheckTests(LinkCrushTestCase):
+    # The primary stands in for a replica: the check only needs a connection
+    def test_reachable_database_is_healthy(self):
+        self.assertEqual(routers._check(DEFAULT_DB_ALIAS), (True, 0.0))
+
+    @override_settings(REPLICA_MAX_LAG=-1)
+    def test_lag_over_the_limit_is_unhealthy(self):
+        with self.assertLogs('urls.routers', 'WARNING'):
+            healthy, _ = routers._check(DEFAULT_DB_ALIAS)
+        self.assertFalse(healthy)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=30)
+class ReplicaPinningMiddlewareTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.factory = RequestFactory()
+        self.pinned = None
+
+        def view(request):
+            self.pinned = routers._pinned.get()
+            return HttpResponse(status=self.status)
+
+        self.status = 200
+        self.middleware = ReplicaPinningMiddleware(view)
+
+    def test_write_pins_the_client(self):
+        response = self.middleware(self.factory.post('/api/shorten'))
+        self.assertTrue(self.pinned)
+        cookie = response.cookies[REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 30)
+        self.assertTrue(cookie['httponly'])
+        self.assertAlmostEqual(int(cookie.value), time.time() + 30, delta=2)
+
+    def test_pinned_cookie_reads_the_primary(self):
+        request = self.factory.get('/abc123/')
+        request.COOKIES[REPLICA_PIN_COOKIE] = str(int(time.time() + 30))
+        response = self.middleware(request)
+        self.assertTrue(self.pinned)
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_expired_or_bad_cookie_is_ignored(self):
+        for value in (str(int(time.time() - 1)), 'garbage'):
+            with self.subTest(value=value):
+                request = self.factory.get('/abc123/')
+                request.COOKIES[REPLICA_PIN_COOKIE] = value
+                self.middleware(request)
+                self.assertFalse(self.pinned)
+
+    def test_failed_write_does_not_pin(self):
+        self.status = 400
+        response = self.middleware(self.factory.post('/api/shorten'))
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_unused_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaPinningMiddleware(lambda request: HttpResponse())
@@ -0,0 +1,96 @@
+# backend/urls/tests/test_shorten.py
+import json
+from unittest import mock
+
+from django.test import override_settings
+
+from urls.models import URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class ShortenTests(LinkCrushTestCase):
+    def test_creates_then_returns_existing(self):
+        first = self.client.post('/api/shorten', {'url': 'https://example.com/page'}, content_type='application/json')
+        self.assertEqual(first.status_code, 201)
+        second = self.client.post('/api/shorten', {'url': 'https://example.com/page'}, content_type='application/json')
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['shortCode'], first.json()['shortCode'])
+        self.assertEqual(second.json()['message'], 'URL already exists')
+
+    def test_dedupes_through_url_hash(self):
+        url = URLModel.objects.create(original_url='http://example.com/page')
+        self.assertEqual(url.url_hash, URLModel.hash_url('http://example.com/page'))
+        response = self.client.post('/api/shorten', {'url': 'example.com/page'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['shortCode'], url.short_code)
+
+    def test_invalid_url(self):
+        response = self.client.post('/api/shorten', {'url': 'javascript:alert(1)'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid URL format'})
+
+
+class BulkShortenTests(LinkCrushTestCase):
+    def post(self, body, content_type='application/json'):
+        if content_type == 'application/json':
+            body = json.dumps(body)
+        return self.client.post('/api/shorten/bulk', body, content_type=content_type)
+
+    def test_results_in_input_order(self):
+        existing = URLModel.objects.create(original_url='https://example.com/existing')
+        response = self.post([
+            'https://example.com/a',
+            {'url': 'https://example.com/existing'},
+            'javascript:alert(1)',
+            'https://example.com/b',
+        ])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        results = data['results']
+        self.assertEqual([r.get('created') for r in results], [True, False, None, True])
+        self.assertEqual(results[1]['shortCode'], existing.short_code)
+        self.assertEqual(results[2], {'url': 'javascript:alert(1)', 'error': 'Invalid URL format'})
+        self.assertEqual((data['created'], data['invalid']), (2, 1))
+        self.assertEqual(URLModel.objects.count(), 3)
+
+    def test_repeated_url_is_created_once(self):
+        response = self.post(['https://example.com/a', 'https://example.com/b', 'https://example.com/a'])
+        data = response.json()
+        self.assertEqual([r['created'] for r in data['results']], [True, True, False])
+        self.assertEqual(data['results'][0]['shortCode'], data['results'][2]['shortCode'])
+        self.assertEqual(data['created'], 2)
+        self.assertEqual(URLModel.objects.count(), 2)
+
+    def test_ndjson_body(self):
+        body = '"https://example.com/a"\n{"url": "https://example.com/b"}\n'
+        response = self.post(body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+
+    def test_expiry_applies_to_created_links(self):
+        response = self.post({'urls': ['https://example.com/a'], 'maxClicks': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(URLModel.objects.get().max_clicks, 5)
+
+    def test_empty_body(self):
+        response = self.post([])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Expected a non-empty list of URLs'})
+
+    @override_settings(BULK_SHORTEN_MAX_ITEMS=2)
+    def test_too_many_items(self):
+        response = self.post(['https://example.com/a', 'https://example.com/b', 'https://example.com/c'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Too many URLs (max 2)'})
+        self.assertFalse(URLModel.objects.exists())
+
+    @override_settings(BULK_SHORTEN_MAX_BYTES=100)
+    def test_oversized_body_is_refused_before_parsing(self):
+        with mock.patch('urls.views.URLModel.bulk_get_or_create') as bulk_get_or_create, \
+                mock.patch('rest_framework.parsers.JSONParser.parse') as parse:
+            response = self.post([f'https://example.com/{i}' for i in range(10)])
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json(), {'error': 'Request body too large (max 100 bytes)'})
+        parse.assert_not_called()
+        bulk_get_or_create.assert_not_called()
@@ -0,0 +1,95 @@
+# backend/urls/tests/test_summary.py
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.test import override_settings
+
+from urls import summary
+from urls.clicks import ClickBuffer, write_click_counts
+from urls.models import SummaryTotals, URLModel
+
+from .utils import LinkCrushTestCase
+
+
+class SummaryTotalsTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = URLModel.objects.create(original_url='https://example.com/a', click_count=4)
+        # Creates the totals row; deltas only move an existing row
+        summary.get_summary()
+
+    def totals(self):
+        return SummaryTotals.objects.values_list('total_urls', 'total_clicks').get(pk=summary.TOTALS_ID)
+
+    def assertTotalsMatchTable(self):
+        counted = URLModel.objects.aggregate(urls=Count('id'), clicks=Sum('click_count'))
+        self.assertEqual(self.totals(), (counted['urls'], counted['clicks'] or 0))
+
+    def test_create_and_delete_deltas(self):
+        self.assertEqual(self.totals(), (1, 4))
+        with self.captureOnCommitCallbacks(execute=True):
+            other = URLModel.objects.create(original_url='https://example.com/b', click_count=2)
+        self.assertEqual(self.totals(), (2, 6))
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertTotalsMatchTable()
+
+    def test_bulk_create_delta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            URLModel.bulk_get_or_create(['https://example.com/b', 'https://example.com/c'])
+        self.assertEqual(self.totals(), (3, 4))
+
+    def test_click_flush_delta(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(write_click_counts({self.url.short_code: 3, 'missing': 5}), 3)
+        self.assertTotalsMatchTable()
+
+    def test_rolled_back_create_is_not_counted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    URLModel.objects.create(original_url='https://example.com/b')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.totals(), (1, 4))
+
+    def test_delete_after_buffered_clicks_flushed(self):
+        owner = User.objects.create_user('owner')
+        self.url.owner = owner
+        self.url.save()
+        buffer = ClickBuffer(interval=3600, threshold=1000)
+        buffer.record(self.url.short_code, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer.flush()
+        self.client.force_login(owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/urls/{self.url.short_code}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.totals(), (0, 0))
+
+    def test_clicks_buffered_for_deleted_link_are_dropped(self):
+        buffer = ClickBuffer(interval=3600, threshold=1000)
+        buffer.record(self.url.short_code, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.url.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer.flush()
+        self.assertEqual(self.totals(), (0, 0))
+
+    @override_settings(SUMMARY_RESYNC_INTERVAL=0)
+    def test_resync_absorbs_drift(self):
+        SummaryTotals.objects.filter(pk=summary.TOTALS_ID).update(total_urls=99, total_clicks=99)
+        data = summary.get_summary()
+        self.assertEqual((data['total_urls'], data['total_clicks']), (1, 4))
+        self.assertTotalsMatchTable()
+
+
+class SummaryEndpointTests(LinkCrushTestCase):
+    def test_summary(self):
+        URLModel.objects.create(original_url='https://example.com/a', click_count=4)
+        top = URLModel.objects.create(original_url='https://example.com/b', click_count=6)
+        data = self.client.get('/api/stats/summary').json()
+        self.assertEqual((data['totalUrls'], data['totalClicks'], data['avgClicks']), (2, 10, 5.0))
+        self.assertEqual(data['topUrl']['shortCode'], top.short_code)
+        self.assertEqual(data['recentUrls'], 2)
@@ -0,0 +1,106 @@
+# backend/urls/tests/test_trending.py
+from collections import Counter
+from unittest import mock
+
+from urls import trending
+from urls.models import TrendingCount, URLModel
+from urls.trending import SpaceSaving, TrendingTracker, get_trending
+
+from .utils import LinkCrushTestCase
+
+
+class SpaceSavingTests(LinkCrushTestCase):
+    def test_exact_below_capacity(self):
+        sketch = SpaceSaving(10)
+        stream = ['a'] * 5 + ['b'] * 3 + ['c']
+        for code in stream:
+            sketch.add(code)
+        self.assertEqual(sketch.top(2), [('a', 5, 0), ('b', 3, 0)])
+
+    def test_heavy_hitters_survive_and_counts_are_upper_bounds(self):
+        sketch = SpaceSaving(5)
+        stream = [f'noise{i}' for i in range(200)]
+        stream[::4] = ['hot'] * len(stream[::4])
+        stream[1::4] = ['warm'] * len(stream[1::4])
+        for code in stream:
+            sketch.add(code)
+        self.assertLessEqual(len(sketch), 5)
+        truth = Counter(stream)
+        top = {code: (count, error) for code, count, error in sketch.top(2)}
+        self.assertEqual(set(top), {'hot', 'warm'})
+        for code, (count, error) in top.items():
+            self.assertLessEqual(truth[code], count)
+            self.assertLessEqual(count - error, truth[code])
+
+
+class TrendingTests(LinkCrushTestCase):
+    def setUp(self):
+        super().setUp()
+        self.links = [URLModel.objects.create(original_url=f'https://example.com/{i}') for i in range(3)]
+        self.codes = [url.short_code for url in self.links]
+
+    def tracker(self, worker):
+        tracker = TrendingTracker(interval=3600, capacity=100, publish_size=10)
+        tracker.worker = worker
+        return tracker
+
+    def test_sums_workers_and_ranks(self):
+        first, second = self.tracker('w1'), self.tracker('w2')
+        for code, n in zip(self.codes, (5, 1, 3)):
+            for _ in range(n):
+                first.record(code)
+        for _ in range(4):
+            second.record(self.codes[1])
+        first.flush()
+        second.flush()
+
+        result = get_trending('5m', 10)['results']
+        # Ties are ordered by short code
+        expected = sorted([(self.codes[0], 5), (self.codes[1], 5)]) + [(self.codes[2], 3)]
+        self.assertEqual([(row['short_code'], row['clicks']) for row in result], expected)
+        self.assertEqual(get_trending('1h', 1)['results'][0]['clicks'], 5)
+
+    def test_flush_overwrites_the_workers_rows(self):
+        tracker = self.tracker('w1')
+        tracker.record(self.codes[0])
+        tracker.flush()
+        tracker.record(self.codes[0])
+        tracker.flush()
+        self.assertEqual(
+            TrendingCount.objects.filter(period='5m', short_code=self.codes[0]).get().clicks, 2,
+        )
+
+    def test_failed_flush_is_retried(self):
+        tracker = self.tracker('w1')
+        tracker.record(self.codes[0])
+        with mock.patch.object(trending, '_upsert_counts', side_effect=RuntimeError('db down')):
+            tracker.flush()
+        self.assertEqual(tracker.failures, 1)
+        self.assertFalse(TrendingCount.objects.exists())
+        tracker.flush()
+        self.assertEqual(TrendingCount.objects.filter(short_code=self.codes[0]).count(), len(trending.WINDOWS))
+
+    def test_deleted_links_are_left_out(self):
+        tracker = self.tracker('w1')
+        for code in self.codes:
+            tracker.record(code)
+        tracker.flush()
+        self.links[0].delete()
+        codes = [row['short_code'] for row in get_trending('24h', 10)['results']]
+        self.assertEqual(sorted(codes), sorted(self.codes[1:]))
+
+    def test_endpoint(self):
+        tracker = self.tracker('w1')
+        tracker.record(self.codes[2])
+        tracker.flush()
+        response = self.client.get('/api/stats/trending', {'window': '5m', 'limit': 5})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['window'], '5m')
+        self.assertEqual(data['results'], [
+            {'shortCode': self.codes[2], 'originalUrl': 'https://example.com/2', 'clicks': 1},
+        ])
+
+    def test_endpoint_validation(self):
+        self.assertEqual(self.client.get('/api/stats/trending', {'window': '2d'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/stats/trending', {'limit': 'ten'}).status_code, 400)
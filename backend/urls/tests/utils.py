@@ -0,0 +1,55 @@
+# backend/urls/tests/utils.py
+"""
+Shared base for the urls test suite.
+"""
+
+from unittest import mock
+
+from django.core.cache import caches
+from django.db.models import Count, Sum
+from django.test import TestCase, override_settings
+
+from urls.buffering import BackgroundFlusher
+from urls.cache import link_cache
+from urls.models import OwnerStats, URLModel
+from urls.ratelimit import rate_limiter
+
+
+@override_settings(
+    CLICK_BUFFER_ENABLED=False,
+    ANALYTICS_ENABLED=False,
+    TRENDING_ENABLED=False,
+    CLICK_LOG_ENABLED=False,
+    RATE_LIMIT_ENABLED=False,
+    SHORT_CODE_FILTER_ENABLED=False,
+)
+class LinkCrushTestCase(TestCase):
+    """
+    Clicks are written straight through and no background flusher thread is
+    started, so every test decides when buffered state reaches the database.
+    Caches and rate limit buckets start empty.
+    """
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(BackgroundFlusher, 'ensure_started')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for cache in caches.all():
+            cache.clear()
+        link_cache.local.clear()
+        rate_limiter.reset()
+        self.addCleanup(rate_limiter.reset)
+
+    def assertOwnerStatsConsistent(self):
+        """Every OwnerStats row matches a recount of its owner's links"""
+        counted = {
+            row['owner_id']: (row['url_count'], row['total_clicks'] or 0)
+            for row in URLModel.objects.filter(owner__isnull=False).values('owner_id')
+            .annotate(url_count=Count('id'), total_clicks=Sum('click_count'))
+        }
+        for stats in OwnerStats.objects.all():
+            self.assertEqual(
+                (stats.url_count, stats.total_clicks), counted.get(stats.owner_id, (0, 0)),
+                f'OwnerStats of owner {stats.owner_id}',
+            )
@@ -0,0 +1,28 @@
+# backend/urls/throttling.py
+"""
+DRF throttles backed by the token bucket limiter (ratelimit.py).
+DRF answers denied requests with 429 and a Retry-After header.
+"""
+
+from rest_framework.throttling import BaseThrottle
+
+from .ratelimit import client_key, rate_limiter
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+
+    def allow_request(self, request, view):
+        allowed, self.retry_after = rate_limiter.check(self.scope, client_key(request))
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class ShortenThrottle(TokenBucketThrottle):
+    scope = 'shorten'
+
+
+class BulkShortenThrottle(TokenBucketThrottle):
+    scope = 'shorten_bulk'
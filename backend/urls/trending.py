@@ -0,0 +1,249 @@
+# backend/urls/trending.py
+"""
+Trending links (GET /api/stats/trending) from Space-Saving heavy-hitter sketches.
+
+Each worker keeps, per window (5m, 1h, 24h), a Space-Saving summary of the
+clicks in the current time slot: at most TRENDING_CAPACITY codes, O(1) per
+click, and any code with more than 1/capacity of the slot's clicks is
+guaranteed to be tracked. Counts are upper bounds, over by at most the count
+of the code they displaced.
+
+Every TRENDING_FLUSH_INTERVAL seconds a background thread publishes the top
+TRENDING_PUBLISH_SIZE entries of each changed slot to trending_counts, one row
+per (window, slot, worker, code) that the worker overwrites. Reads sum the
+rows of the slots inside the window across all workers, so trending reflects
+every worker with up to one flush interval of delay; results are cached for
+TRENDING_CACHE_SECONDS.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .buffering import BackgroundFlusher
+from .routers import read_replica
+
+logger = logging.getLogger(__name__)
+
+# Window name -> (window seconds, slot seconds)
+WINDOWS = {
+    '5m': (300, 30),
+    '1h': (3600, 300),
+    '24h': (86400, 3600),
+}
+
+# Slots older than the longest window (plus one slot) are deleted this often
+PRUNE_INTERVAL = 300
+
+CACHE_KEY = 'trending:v1:{window}:{limit}'
+
+# Rows per INSERT ... ON CONFLICT statement
+UPSERT_BATCH_SIZE = 500
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary (Metwally et al.) over stream-summary buckets, so
+    add() is O(1) even when it evicts the current minimum.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        # count -> codes with that count
+        self._buckets = {}
+        self._min = 0
+
+    def _place(self, code, count):
+        self.counts[code] = count
+        self._buckets.setdefault(count, set()).add(code)
+
+    def _unplace(self, code, count):
+        codes = self._buckets[count]
+        codes.discard(code)
+        if not codes:
+            del self._buckets[count]
+
+    def add(self, code):
+        count = self.counts.get(code)
+        if count is None and len(self.counts) >= self.capacity:
+            # Take over an entry with the minimum count; that count becomes the error bound
+            count = self._min
+            victim = next(iter(self._buckets[count]))
+            self._unplace(victim, count)
+            del self.counts[victim]
+            del self.errors[victim]
+            self.errors[code] = count
+        elif count is None:
+            count = 0
+            self.errors[code] = 0
+        else:
+            self._unplace(code, count)
+        self._place(code, count + 1)
+        # Counts only grow by one, so the new minimum is either unchanged or one higher
+        if count == 0:
+            self._min = 1
+        elif count == self._min and count not in self._buckets:
+            self._min = count + 1
+
+    def top(self, n):
+        """[(code, count, error)] for the n largest counts"""
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(code, count, self.errors[code]) for code, count in ranked]
+
+    def __len__(self):
+        return len(self.counts)
+
+
+def _upsert_counts(rows):
+    """INSERT rows of (period, slot, worker, short_code, clicks), overwriting clicks of existing ones"""
+    from .models import TrendingCount
+
+    if not rows:
+        return
+    qn = connection.ops.quote_name
+    table = qn(TrendingCount._meta.db_table)
+    keys = ', '.join(qn(c) for c in ('period', 'slot', 'worker', 'short_code'))
+    rows = sorted(rows)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            cursor.execute(
+                f"INSERT INTO {table} ({keys}, {qn('clicks')}) "
+                f"VALUES {', '.join(['(%s, %s, %s, %s, %s)'] * len(batch))} "
+                f"ON CONFLICT ({keys}) DO UPDATE SET clicks = EXCLUDED.clicks",
+                [value for row in batch for value in row],
+            )
+
+
+class TrendingTracker(BackgroundFlusher):
+    """
+    record() updates one sketch per window under a lock; slots that changed
+    since the last flush (including ones that just closed) are published.
+    """
+
+    thread_name = 'trending'
+
+    def __init__(self, interval, capacity, publish_size):
+        super().__init__(interval)
+        self.capacity = capacity
+        self.publish_size = publish_size
+        self._flush_lock = threading.Lock()
+        self._last_prune = 0.0
+        self.reset()
+
+    def reset(self):
+        self.worker = f'{socket.gethostname()}-{os.getpid()}'[:64]
+        # window -> (slot start, sketch) being filled
+        self._current = {}
+        # (window, slot start) -> sketch changed since its last publish
+        self._dirty = {}
+
+    def record(self, short_code):
+        self.ensure_started()
+        now = int(time.time())
+        with self._lock:
+            for window, (_, slot_seconds) in WINDOWS.items():
+                slot = now - now % slot_seconds
+                current = self._current.get(window)
+                if current is None or current[0] != slot:
+                    current = self._current[window] = (slot, SpaceSaving(self.capacity))
+                current[1].add(short_code)
+                self._dirty[(window, slot)] = current[1]
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, {}
+                # Copied under the lock (record() keeps counting), ranked outside it
+                snapshots = {key: dict(sketch.counts) for key, sketch in dirty.items()}
+            rows = []
+            for (window, slot), counts in snapshots.items():
+                slot_value = connection.ops.adapt_datetimefield_value(datetime.fromtimestamp(slot, dt_timezone.utc))
+                top = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:self.publish_size]
+                rows.extend((window, slot_value, self.worker, code, count) for code, count in top)
+            try:
+                with transaction.atomic():
+                    _upsert_counts(rows)
+                    if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+                        self.prune()
+                        self._last_prune = time.monotonic()
+            except Exception:
+                self.failures += 1
+                logger.exception("Trending flush failed; retrying %d slot(s) later", len(dirty))
+                with self._lock:
+                    for key, sketch in dirty.items():
+                        self._dirty.setdefault(key, sketch)
+                return
+            if rows:
+                self.flushes += 1
+
+    def prune(self):
+        from .models import TrendingCount
+
+        longest = max(window + slot for window, slot in WINDOWS.values())
+        TrendingCount.objects.filter(slot__lt=timezone.now() - timedelta(seconds=longest)).delete()
+
+    def stats(self):
+        return {
+            'codes': sum(len(sketch) for _, sketch in self._current.values()),
+            'pending_slots': len(self._dirty),
+            'flushes': self.flushes,
+            'failures': self.failures,
+        }
+
+
+tracker = TrendingTracker(settings.TRENDING_FLUSH_INTERVAL, settings.TRENDING_CAPACITY, settings.TRENDING_PUBLISH_SIZE)
+
+
+def record(short_code):
+    tracker.record(short_code)
+
+
+def get_trending(window, limit):
+    """
+    [{short_code, original_url, clicks}] for the window, most clicked first,
+    cached for TRENDING_CACHE_SECONDS
+    """
+    from .models import TrendingCount, URLModel
+
+    key = CACHE_KEY.format(window=window, limit=limit)
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    window_seconds, slot_seconds = WINDOWS[window]
+    now = int(time.time())
+    # Slots overlapping the window, including the one being filled
+    first_slot = now - window_seconds + slot_seconds
+    first_slot -= first_slot % slot_seconds
+    with read_replica():
+        counts = list(
+            TrendingCount.objects.filter(period=window, slot__gte=datetime.fromtimestamp(first_slot, dt_timezone.utc))
+            .values('short_code').annotate(clicks=Sum('clicks'))
+            .order_by('-clicks', 'short_code')[:limit * 2]
+        )
+        # Deleted (or purged) links drop out; the extra rows above cover them
+        urls = dict(
+            URLModel.objects.filter(short_code__in=[row['short_code'] for row in counts])
+            .order_by().values_list('short_code', 'original_url')
+        )
+    result = {
+        'results': [
+            {'short_code': row['short_code'], 'original_url': urls[row['short_code']], 'clicks': row['clicks']}
+            for row in counts if row['short_code'] in urls
+        ][:limit],
+        'computed_at': timezone.now(),
+    }
+    cache.set(key, result, settings.TRENDING_CACHE_SECONDS)
+    return result
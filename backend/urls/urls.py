@@ -1,18 +1,25 @@
 # backend/urls/urls.py
 from django.urls import path
-from . import views
+from . import redirect_views, views
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 urlpatterns = [
     path('shorten', views.shorten_url, name='shorten_url'),
+    path('shorten/bulk', views.shorten_bulk, name='shorten_bulk'),
     path('stats', views.get_stats, name='get_stats'),
+    path('stats/summary', views.get_stats_summary, name='get_stats_summary'),
+    path('stats/trending', views.get_stats_trending, name='get_stats_trending'),
     path('health', views.health_check, name='health_check'),
+    path('health/code-filter', views.code_filter_status, name='code_filter_status'),
+    path('metrics', redirect_views.metrics_view, name='metrics'),
     path('urls/<str:short_code>/', views.delete_url, name='delete_url'),
+    path('urls/<str:short_code>/timeseries', views.url_timeseries, name='url_timeseries'),
 
     # JWT Authentication endpoints
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('me', views.current_user, name='current_user'),
+    path('me/urls', views.my_urls, name='my_urls'),
 
     path('', views.api_info, name='api_info'),
 ]
\ No newline at end of file
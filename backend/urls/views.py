@@ -2,30 +2,40 @@
 """
 API views for Link Crush (improved)
 - Uses DRF parsing (request.data)
-- Normalizes and extracts redirect targets from tracking URLs
+- Normalizes and extracts redirect targets from tracking URLs (see normalize.py)
 - Clear logging and error handling
 """
 
+import json
 import logging
-from urllib.parse import urlparse, parse_qs, unquote
-import base64
+from datetime import timedelta
 
-from django.shortcuts import get_object_or_404, redirect
-from django.http import JsonResponse
-from django.views import View
-from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.shortcuts import get_object_or_404
+from django.http import StreamingHttpResponse
 from django.views.decorators.csrf import csrf_protect
-from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes, throttle_classes
+from rest_framework.parsers import JSONParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-
-import validators
-
-from .models import URLModel
+from rest_framework.utils.urls import replace_query_param
+
+from . import expiry, owners, summary, trending
+from .analytics import BUCKET_SECONDS
+from .bloom import code_filter
+from .models import ClickBreakdown, ClickRollup, URLModel
+from .normalize import normalize_url
+from .pagination import InvalidCursor, get_page_size, iter_newest_first, keyset_page
+from .parsers import NDJSONParser
+from .routers import read_alias, read_replica
 from .serializers import URLSerializer
+from .throttling import BulkShortenThrottle, ShortenThrottle
 
 logger = logging.getLogger(__name__)
 
@@ -34,87 +44,45 @@ def getCookie(name):
     # This would be implemented on the frontend
     pass
 
-# -------------------------
-# URL normalization helpers
-# -------------------------
-def _try_base64_decode(s: str):
-    """
-    Try to base64-decode a string and return decoded text if possible.
-    Return None on failure.
-    """
-    try:
-        padded = s + '=' * (-len(s) % 4)
-        decoded = base64.b64decode(padded)
-        return decoded.decode('utf-8')
-    except Exception:
-        return None
-
-def extract_redirect_target(candidate_url: str):
-    """
-    If candidate_url is a redirect/tracking URL containing parameters like
-    'u', 'url', 'q', 'redirect', try to extract and return a real target URL.
-    """
-    try:
-        parsed = urlparse(candidate_url)
-        qs = parse_qs(parsed.query)
-        for key in ('u', 'url', 'q', 'redirect', 'target'):
-            if key in qs and qs[key]:
-                v = qs[key][0]
-                v = unquote(v)
-
-                # try base64 decode if looks like that
-                maybe = _try_base64_decode(v)
-                if maybe:
-                    if urlparse(maybe).scheme in ('http', 'https') and urlparse(maybe).netloc:
-                        return maybe
-
-                # if the raw param value is a valid URL, return it
-                if urlparse(v).scheme in ('http', 'https') and urlparse(v).netloc:
-                    return v
-    except Exception:
-        logger.exception("extract_redirect_target failed for: %s", candidate_url)
-    return None
-
-def normalize_url(raw_url: str):
+def _parse_expiry(data):
     """
-    Normalize and validate the incoming URL string.
-    Returns a normalized URL string (with scheme) or None if invalid.
+    (expires_at, max_clicks) from the optional expiresAt (ISO 8601) or
+    expiresIn (seconds) and maxClicks fields; ValueError on bad input
     """
-    if not raw_url:
-        return None
-    raw = raw_url.strip()
-
-    # ensure scheme exists before parsing
-    parsed0 = urlparse(raw)
-    if not parsed0.scheme:
-        raw = 'http://' + raw
-        parsed0 = urlparse(raw)
-
-    # try strict validator first
-    try:
-        if validators.url(raw):
-            return raw
-    except Exception:
-        logger.debug("validators.url raised; falling back to parse-only check")
-
-    # try to extract target from common tracking params
-    target = extract_redirect_target(raw)
-    if target:
-        tparsed = urlparse(target)
-        if tparsed.scheme in ('http', 'https') and tparsed.netloc:
-            return target
-
-    # last-resort: accept basic parse with scheme/netloc
-    if parsed0.scheme in ('http', 'https') and parsed0.netloc:
-        return raw
-
-    return None
+    expires_at = None
+    if data.get('expiresAt') is not None and data.get('expiresIn') is not None:
+        raise ValueError('Use either expiresAt or expiresIn')
+    if data.get('expiresAt') is not None:
+        if not isinstance(data['expiresAt'], str):
+            raise ValueError('expiresAt must be an ISO 8601 datetime')
+        expires_at = _parse_timestamp(data['expiresAt'])
+    elif data.get('expiresIn') is not None:
+        seconds = data['expiresIn']
+        if not isinstance(seconds, int) or isinstance(seconds, bool) or seconds <= 0:
+            raise ValueError('expiresIn must be a positive number of seconds')
+        expires_at = timezone.now() + timedelta(seconds=seconds)
+    if expires_at is not None and expires_at <= timezone.now():
+        raise ValueError('Expiry must be in the future')
+
+    max_clicks = data.get('maxClicks')
+    if max_clicks is not None and (not isinstance(max_clicks, int) or isinstance(max_clicks, bool) or max_clicks <= 0):
+        raise ValueError('maxClicks must be a positive integer')
+    return expires_at, max_clicks
+
+def _expiry_fields(url_obj):
+    fields = {}
+    if url_obj.expires_at is not None:
+        fields['expiresAt'] = url_obj.expires_at.isoformat()
+    if url_obj.max_clicks is not None:
+        fields['maxClicks'] = url_obj.max_clicks
+    return fields
 
 # -------------------------
 # API endpoints
 # -------------------------
 
 @api_view(['POST'])
+@throttle_classes([ShortenThrottle])
 def shorten_url(request):
     """
     Create a shortened URL
@@ -122,70 +90,304 @@ def shorten_url(request):
     """
     try:
         data = request.data
-        logger.info("shorten_url parsed data: %s", data)
 
         raw = (data.get('url') or '').strip()
         normalized = normalize_url(raw)
-        logger.info("shorten_url normalized url: %s (from raw=%s)", normalized, raw)
+        logger.debug("shorten_url normalized url: %s (from raw=%s)", normalized, raw)
 
         if not normalized:
             return Response({'error': 'Invalid URL format'}, status=status.HTTP_400_BAD_REQUEST)
 
+        try:
+            expires_at, max_clicks = _parse_expiry(data)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
         original_url = normalized
+        owner = request.user if request.user and request.user.is_authenticated else None
 
-        # Check if URL already exists
-        existing_url = URLModel.objects.filter(original_url=original_url).first()
-        if existing_url:
+        # Dedupe through the unique url_hash index; concurrent duplicates
+        # are resolved by get_or_create catching the IntegrityError
+        lookup = {
+            'url_hash': URLModel.hash_url(original_url),
+            'defaults': {'original_url': original_url, 'owner': owner, 'expires_at': expires_at, 'max_clicks': max_clicks},
+        }
+        url_obj, created = URLModel.objects.get_or_create(**lookup)
+        if not created and url_obj.is_expired():
+            # Expired but not purged yet: replace it with a fresh link
+            expiry.delete_links([(url_obj.pk, url_obj.short_code, url_obj.owner_id, url_obj.click_count)])
+            url_obj, created = URLModel.objects.get_or_create(**lookup)
+        if not created:
             return Response({
-                'shortCode': existing_url.short_code,
-                'originalUrl': existing_url.original_url,
+                'shortCode': url_obj.short_code,
+                'originalUrl': url_obj.original_url,
+                **_expiry_fields(url_obj),
                 'message': 'URL already exists'
             }, status=status.HTTP_200_OK)
 
-        # Create new URL
-        if request.user and request.user.is_authenticated:
-            url_obj = URLModel.objects.create(original_url=original_url, owner=request.user)
-        else:
-            url_obj = URLModel.objects.create(original_url=original_url)
-        
         logger.info("Created URLModel id=%s short_code=%s", url_obj.pk, url_obj.short_code)
         
         return Response({
             'shortCode': url_obj.short_code,
-            'originalUrl': url_obj.original_url
+            'originalUrl': url_obj.original_url,
+            **_expiry_fields(url_obj),
         }, status=status.HTTP_201_CREATED)
 
     except Exception as e:
         logger.exception("Error in shorten_url")
         return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+def get_stats_summary(request):
+    """
+    Dashboard totals, served from the precomputed summary
+    GET /stats/summary
+    """
+    try:
+        data = summary.get_summary()
+        top_url = data['top_url']
+        return Response({
+            'totalUrls': data['total_urls'],
+            'totalClicks': data['total_clicks'],
+            'avgClicks': data['avg_clicks'],
+            'recentUrls': data['recent_urls'],
+            'topUrl': {
+                'shortCode': top_url['short_code'],
+                'originalUrl': top_url['original_url'],
+                'clickCount': top_url['click_count'],
+            } if top_url else None,
+            'computedAt': data['computed_at'].isoformat(),
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        logger.exception("Error in get_stats_summary")
+        return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Most links GET /stats/trending returns
+TRENDING_MAX_LIMIT = 100
+
+@api_view(['GET'])
+def get_stats_trending(request):
+    """
+    Most clicked links over a recent window, from the trending sketches
+    GET /stats/trending?window=5m|1h|24h&limit=<n>
+    """
+    window = request.query_params.get('window', '1h')
+    if window not in trending.WINDOWS:
+        return Response({'error': f"window must be one of: {', '.join(trending.WINDOWS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), TRENDING_MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        data = trending.get_trending(window, limit)
+        return Response({
+            'window': window,
+            'results': [
+                {'shortCode': row['short_code'], 'originalUrl': row['original_url'], 'clicks': row['clicks']}
+                for row in data['results']
+            ],
+            'computedAt': data['computed_at'].isoformat(),
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        logger.exception("Error in get_stats_trending")
+        return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@parser_classes([JSONParser, NDJSONParser])
+@throttle_classes([BulkShortenThrottle])
+def shorten_bulk(request):
+    """
+    Create shortened URLs in bulk
+    POST /shorten/bulk
+    Body: JSON array, {"urls": [...]} or NDJSON; items are URL strings or {"url": ...}.
+    The {"urls": [...]} form may set expiresAt/expiresIn/maxClicks for the created links.
+    Results are returned in input order.
+    """
+    # Refuse oversized bodies before anything reads them
+    max_bytes = settings.BULK_SHORTEN_MAX_BYTES
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    if content_length > max_bytes:
+        return Response({'error': f'Request body too large (max {max_bytes} bytes)'},
+                        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+    # Malformed bodies raise ParseError here and become a 400
+    items = request.data
+    try:
+        expires_at = max_clicks = None
+        if isinstance(items, dict):
+            try:
+                expires_at, max_clicks = _parse_expiry(items)
+            except ValueError as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            items = items.get('urls')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'Expected a non-empty list of URLs'}, status=status.HTTP_400_BAD_REQUEST)
+
+        max_items = settings.BULK_SHORTEN_MAX_ITEMS
+        if len(items) > max_items:
+            return Response({'error': f'Too many URLs (max {max_items})'}, status=status.HTTP_400_BAD_REQUEST)
+
+        raws = [item.get('url') if isinstance(item, dict) else item for item in items]
+        normalized = [normalize_url(raw.strip()) if isinstance(raw, str) else None for raw in raws]
+
+        owner = request.user if request.user and request.user.is_authenticated else None
+        resolved = URLModel.bulk_get_or_create(
+            [url for url in normalized if url], owner=owner, expires_at=expires_at, max_clicks=max_clicks,
+        )
+
+        results = []
+        created_count = 0
+        seen = set()
+        for raw, url in zip(raws, normalized):
+            if not url:
+                results.append({'url': raw, 'error': 'Invalid URL format'})
+                continue
+            short_code, created = resolved[url]
+            # Repeats of a URL in the same request resolve to the link its first occurrence created
+            created = created and url not in seen
+            seen.add(url)
+            created_count += created
+            results.append({'shortCode': short_code, 'originalUrl': url, 'created': created})
+
+        logger.info("shorten_bulk: %d item(s), %d created", len(results), created_count)
+        return Response({
+            'results': results,
+            'created': created_count,
+            'invalid': sum(1 for url in normalized if not url),
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.exception("Error in shorten_bulk")
+        return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# Rows fetched per round trip when streaming
+STATS_STREAM_CHUNK_SIZE = 2000
+
+def _stream_stats_ndjson(using):
+    chunks = iter_newest_first(
+        URLModel.objects.using(using), ('short_code', 'original_url', 'click_count'), STATS_STREAM_CHUNK_SIZE,
+    )
+    for chunk in chunks:
+        yield ''.join(
+            json.dumps({
+                'shortCode': short_code,
+                'originalUrl': original_url,
+                'clickCount': click_count,
+            }) + '\n'
+            for short_code, original_url, click_count in chunk
+        )
+
 @api_view(['GET'])
 def get_stats(request):
     """
-    Get statistics for all URLs
-    GET /stats
+    Get statistics for URLs, newest first
+    GET /stats?cursor=<cursor>&limit=<n>  (next page cursor in the Link and X-Next-Cursor headers)
+    GET /stats?stream=ndjson              (every URL as NDJSON, streamed in constant memory)
     """
     try:
-        urls = URLModel.objects.all().order_by('-created_at')
+        with read_replica():
+            # The stream is consumed after the view returns, so bind the database now
+            using = read_alias()
+        if request.query_params.get('stream') == 'ndjson':
+            return StreamingHttpResponse(_stream_stats_ndjson(using), content_type='application/x-ndjson')
+
+        queryset = URLModel.objects.using(using).only('id', 'short_code', 'original_url', 'click_count', 'created_at')
+        urls, next_cursor = keyset_page(queryset, request.query_params.get('cursor'), get_page_size(request))
         serializer = URLSerializer(urls, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+            response['Link'] = f'<{next_url}>; rel="next"'
+            response['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         logger.exception("Error in get_stats")
         return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-@method_decorator(csrf_exempt, name='dispatch')
-class RedirectView(View):
-    def get(self, request, short_code):
-        """Handle URL redirection"""
-        try:
-            url_obj = URLModel.objects.get(short_code=short_code)
-            url_obj.increment_click_count()
-            return redirect(url_obj.original_url, permanent=False)
-        except URLModel.DoesNotExist:
-            return JsonResponse({'error': 'Short URL not found'}, status=404)
-        except Exception as e:
-            logger.exception("Error in RedirectView")
-            return JsonResponse({'error': f'Server error: {str(e)}'}, status=500)
+TIMESERIES_DEFAULT_SPAN = {
+    ClickRollup.MINUTE: timedelta(hours=1),
+    ClickRollup.HOUR: timedelta(days=2),
+    ClickRollup.DAY: timedelta(days=30),
+}
+TIMESERIES_MAX_BUCKETS = 2000
+TIMESERIES_TOP_BREAKDOWNS = 10
+
+def _parse_timestamp(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f'Invalid timestamp: {value}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, timezone.utc)
+    return parsed
+
+@api_view(['GET'])
+def url_timeseries(request, short_code):
+    """
+    Click timeseries for one URL, read from the pre-aggregated rollups only
+    GET /urls/<short_code>/timeseries?granularity=minute|hour|day&start=<iso>&end=<iso>
+    """
+    granularity = request.query_params.get('granularity', ClickRollup.HOUR)
+    if granularity not in TIMESERIES_DEFAULT_SPAN:
+        return Response({'error': 'granularity must be minute, hour or day'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        end = _parse_timestamp(request.query_params['end']) if 'end' in request.query_params else timezone.now()
+        start = (
+            _parse_timestamp(request.query_params['start']) if 'start' in request.query_params
+            else end - TIMESERIES_DEFAULT_SPAN[granularity]
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end:
+        return Response({'error': 'start must be before end'}, status=status.HTTP_400_BAD_REQUEST)
+    # Align start to its bucket so a partially covered first bucket is included
+    start -= timedelta(seconds=start.timestamp() % BUCKET_SECONDS[granularity])
+    if (end - start).total_seconds() / BUCKET_SECONDS[granularity] > TIMESERIES_MAX_BUCKETS:
+        return Response(
+            {'error': f'Range too large for {granularity} granularity (max {TIMESERIES_MAX_BUCKETS} buckets)'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        url_id = URLModel.objects.filter(short_code=short_code).values_list('id', flat=True).first()
+        if url_id is None:
+            return Response({'error': 'Short URL not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        buckets = list(
+            ClickRollup.objects.filter(url_id=url_id, granularity=granularity, bucket__gte=start, bucket__lte=end)
+            .order_by('bucket')
+            .values_list('bucket', 'clicks')
+        )
+        breakdowns = {ClickBreakdown.REFERRER: [], ClickBreakdown.USER_AGENT: []}
+        rows = (
+            ClickBreakdown.objects.filter(url_id=url_id, day__gte=start.date(), day__lte=end.date())
+            .values('dimension', 'value')
+            .annotate(total=Sum('clicks'))
+            .order_by('-total')
+        )
+        for row in rows:
+            top = breakdowns.get(row['dimension'])
+            if top is not None and len(top) < TIMESERIES_TOP_BREAKDOWNS:
+                top.append({'value': row['value'], 'clicks': row['total']})
+
+        return Response({
+            'shortCode': short_code,
+            'granularity': granularity,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'total': sum(clicks for _, clicks in buckets),
+            'buckets': [{'bucket': bucket.isoformat(), 'clicks': clicks} for bucket, clicks in buckets],
+            'referrers': breakdowns[ClickBreakdown.REFERRER],
+            'userAgents': breakdowns[ClickBreakdown.USER_AGENT],
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        logger.exception("Error in url_timeseries")
+        return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
@@ -196,20 +398,23 @@ def delete_url(request, short_code):
     Only the owner or staff can delete. If owner is null, only staff can delete.
     """
     try:
-        url_obj = get_object_or_404(URLModel, short_code=short_code)
-
-        owner = getattr(url_obj, 'owner', None)
-
-        if owner:
-            # require owner or staff
-            if owner != request.user and not request.user.is_staff:
-                return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
-        else:
-            # no owner -> only staff can delete
-            if not request.user.is_staff:
-                return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
-
-        url_obj.delete()
+        with transaction.atomic():
+            # Locked until deleted, so a concurrent click flush can't change the
+            # click_count the owner and summary totals are reduced by
+            url_obj = get_object_or_404(URLModel.objects.select_for_update(), short_code=short_code)
+
+            owner = getattr(url_obj, 'owner', None)
+
+            if owner:
+                # require owner or staff
+                if owner != request.user and not request.user.is_staff:
+                    return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+            else:
+                # no owner -> only staff can delete
+                if not request.user.is_staff:
+                    return Response({'error': 'Not allowed'}, status=status.HTTP_403_FORBIDDEN)
+
+            url_obj.delete()
         return Response({"message": f"URL {short_code} deleted successfully."}, status=status.HTTP_200_OK)
     except Exception as e:
         logger.exception("Error deleting URL %s: %s", short_code, e)
@@ -227,6 +432,31 @@ def health_check(request):
         'version': '1.0.0'
     })
 
+@api_view(['GET'])
+def code_filter_status(request):
+    """
+    Short code Bloom filter status
+    GET /health/code-filter
+    """
+    data = code_filter.stats()
+    return Response({
+        'enabled': data['enabled'],
+        'active': data['active'],
+        'ready': data['ready'],
+        'items': data['items'],
+        'capacity': data['capacity'],
+        'bits': data['bits'],
+        'hashes': data['hashes'],
+        'errorRate': data['error_rate'],
+        'fillRatio': round(data['fill_ratio'], 6),
+        'estimatedFalsePositiveRate': round(data['estimated_fp_rate'], 6),
+        'lastBuildSeconds': round(data['last_build_seconds'], 3) if data['last_build_seconds'] is not None else None,
+        'builtAt': data['built_at'].isoformat() if data['built_at'] else None,
+        'rebuilds': data['rebuilds'],
+        'failures': data['failures'],
+        'negatives': data['negatives'],
+        'journalCodes': data['journal_codes'],
+    })
 
 # Root API info endpoint
 @api_view(['GET'])
@@ -239,9 +469,15 @@ def api_info(request):
         'version': '1.0.0',
         'endpoints': {
             'shorten': 'POST /api/shorten',
+            'shorten_bulk': 'POST /api/shorten/bulk',
             'stats': 'GET /api/stats',
+            'stats_summary': 'GET /api/stats/summary',
+            'stats_trending': 'GET /api/stats/trending',
             'redirect': 'GET /{short_code}',
-            'health': 'GET /api/health'
+            'health': 'GET /api/health',
+            'code_filter': 'GET /api/health/code-filter',
+            'metrics': 'GET /api/metrics',
+            'my_urls': 'GET /api/me/urls'
         }
     })
 
@@ -258,4 +494,36 @@ def current_user(request):
         "username": user.username,
         "is_staff": user.is_staff,
         "is_superuser": user.is_superuser,
-    })
\ No newline at end of file
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def my_urls(request):
+    """
+    The authenticated user's links, newest first, with their totals
+    GET /me/urls?cursor=<cursor>&limit=<n>  (next page cursor also in the Link and X-Next-Cursor headers)
+    """
+    try:
+        queryset = URLModel.objects.filter(owner=request.user).only(
+            'id', 'short_code', 'original_url', 'click_count', 'created_at',
+        )
+        urls, next_cursor = keyset_page(queryset, request.query_params.get('cursor'), get_page_size(request))
+        url_count, total_clicks = owners.get_totals(request.user.pk)
+        response = Response({
+            'results': URLSerializer(urls, many=True).data,
+            'nextCursor': next_cursor,
+            'totals': {
+                'urlCount': url_count,
+                'totalClicks': total_clicks,
+            },
+        }, status=status.HTTP_200_OK)
+        if next_cursor:
+            next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+            response['Link'] = f'<{next_url}>; rel="next"'
+            response['X-Next-Cursor'] = next_cursor
+        return response
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        logger.exception("Error in my_urls")
+        return Response({'error': f'Server error: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'urlshortener.settings')
+# Lets settings.py pick ASGI defaults (async redirects, per-request database
+# connections); .env and the environment still override them
+os.environ['URLSHORTENER_ASGI'] = '1'
 
 application = get_asgi_application()
@@ -38,8 +38,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'urls.middleware.MetricsMiddleware',
+    'urls.middleware.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'urls.middleware.AsyncWhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -70,6 +72,12 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'urlshortener.wsgi.application'
 
+# Set by asgi.py, so ASGI-specific defaults apply only when no value is configured
+IS_ASGI = os.getenv('URLSHORTENER_ASGI') == '1'
+
+# Route redirects to the native async view (on by default under ASGI)
+ASYNC_REDIRECTS = os.getenv('ASYNC_REDIRECTS', str(IS_ASGI)).lower() == 'true'
+
 # Database configuration
 DATABASES = {
     'default': {
@@ -82,9 +90,43 @@ DATABASES = {
         'OPTIONS': {
             'client_encoding': 'UTF8',
         },
+        # Keep connections open between requests; 0 closes them after every request.
+        # Defaults to 0 under ASGI, where persistent connections aren't reused across
+        # requests (see DATABASE_PGBOUNCER for pooling there).
+        'CONN_MAX_AGE': int(os.getenv('DATABASE_CONN_MAX_AGE', 0 if IS_ASGI else 60)),
+        # Ping reused connections once per request before the first query
+        'CONN_HEALTH_CHECKS': os.getenv('DATABASE_CONN_HEALTH_CHECKS', 'True').lower() == 'true',
     }
 }
 
+# DATABASE_HOST/PORT point at PgBouncer in transaction pooling mode. Server-side
+# cursors (QuerySet.iterator()) don't survive a pooled server connection being
+# handed to another client between transactions, so they are turned off.
+DATABASE_PGBOUNCER = os.getenv('DATABASE_PGBOUNCER', 'False').lower() == 'true'
+if DATABASE_PGBOUNCER:
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read replicas: comma-separated host[:port] list sharing the primary's name and
+# credentials. Redirect lookups, /api/stats and the dashboard summary read from
+# them (see urls/routers.py); keep REPLICA_PIN_SECONDS >= REPLICA_MAX_LAG so
+# clients always see their own writes.
+DATABASE_REPLICAS = []
+for i, replica in enumerate((h.strip() for h in os.getenv('DATABASE_REPLICA_HOSTS', '').split(',') if h.strip()), 1):
+    host, _, port = replica.partition(':')
+    DATABASES[f'replica{i}'] = {
+        **DATABASES['default'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{i}')
+
+DATABASE_ROUTERS = ['urls.routers.ReplicaRouter']
+REPLICA_MAX_LAG = float(os.getenv('REPLICA_MAX_LAG', 5))  # seconds; lagging replicas are skipped
+REPLICA_HEALTH_INTERVAL = float(os.getenv('REPLICA_HEALTH_INTERVAL', 5))
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -161,6 +203,9 @@ CORS_ALLOW_ALL_ORIGINS = DEBUG
 # Allow cookies / credentials
 CORS_ALLOW_CREDENTIALS = os.getenv("CORS_ALLOW_CREDENTIALS", "True").lower() == 'true'
 
+# Pagination headers readable by the frontends
+CORS_EXPOSE_HEADERS = ['Link', 'X-Next-Cursor']
+
 CORS_ALLOWED_HEADERS = [
     'accept',
     'accept-encoding',
@@ -173,9 +218,109 @@ CORS_ALLOWED_HEADERS = [
     'x-requested-with',
 ]
 
+# Cache configuration
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'unique-snowflake'),
+    }
+}
+
 # Custom settings
 SHORT_CODE_LENGTH = int(os.getenv('SHORT_CODE_LENGTH', 6))
+SHORT_CODE_ALLOCATOR = os.getenv('SHORT_CODE_ALLOCATOR', 'feistel')  # random | sequence | feistel | dotted path
+SHORT_CODE_BLOCK_SIZE = int(os.getenv('SHORT_CODE_BLOCK_SIZE', 100))
+SHORT_CODE_FEISTEL_KEY = os.getenv('SHORT_CODE_FEISTEL_KEY', '')  # defaults to a key derived from SECRET_KEY
+# Reuse codes of purged expired links, after they have rested SHORT_CODE_RECYCLE_AFTER seconds
+SHORT_CODE_RECYCLE = os.getenv('SHORT_CODE_RECYCLE', 'False').lower() == 'true'
+SHORT_CODE_RECYCLE_AFTER = int(os.getenv('SHORT_CODE_RECYCLE_AFTER', 30 * 86400))
 BASE_URL = os.getenv('BASE_URL', 'http://localhost:8000')
+BULK_SHORTEN_MAX_ITEMS = int(os.getenv('BULK_SHORTEN_MAX_ITEMS', 1000))
+# Larger bulk bodies are refused before parsing (default: one max-length URL per item)
+BULK_SHORTEN_MAX_BYTES = int(os.getenv('BULK_SHORTEN_MAX_BYTES', BULK_SHORTEN_MAX_ITEMS * 2100))
+
+# Memoized normalize_url results per process (0 disables)
+NORMALIZE_CACHE_SIZE = int(os.getenv('NORMALIZE_CACHE_SIZE', 10000))
+
+# Redirect lookup cache (per-process LRU in front of the shared CACHES tier)
+URL_CACHE_ALIAS = os.getenv('URL_CACHE_ALIAS', 'default')
+URL_CACHE_LOCAL_SIZE = int(os.getenv('URL_CACHE_LOCAL_SIZE', 10000))
+URL_CACHE_LOCAL_TTL = int(os.getenv('URL_CACHE_LOCAL_TTL', 60))
+URL_CACHE_SHARED_TTL = int(os.getenv('URL_CACHE_SHARED_TTL', 3600))
+
+# Bloom filter of existing short codes; redirects for codes it has never seen
+# answer 404 without a query. Needs a shared memcached or Redis cache at
+# URL_CACHE_ALIAS (workers journal their new codes there); off otherwise.
+SHORT_CODE_FILTER_ENABLED = os.getenv('SHORT_CODE_FILTER_ENABLED', 'False').lower() == 'true'
+SHORT_CODE_FILTER_CAPACITY = int(os.getenv('SHORT_CODE_FILTER_CAPACITY', 1_000_000))
+SHORT_CODE_FILTER_ERROR_RATE = float(os.getenv('SHORT_CODE_FILTER_ERROR_RATE', 0.01))
+SHORT_CODE_FILTER_REBUILD_INTERVAL = float(os.getenv('SHORT_CODE_FILTER_REBUILD_INTERVAL', 600))
+
+# Per-request latency/DB metrics exposed at /api/metrics
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+# Scrapers allowed without a token: addresses or networks (client address as resolved
+# for rate limiting, see RATE_LIMIT_TRUSTED_PROXIES)
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',') if ip.strip()
+]
+# Bearer token that allows scrapes from anywhere (empty: none)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Cache-Control max-age (seconds) for links with click tracking off and no per-link max-age
+REDIRECT_CACHE_MAX_AGE = int(os.getenv('REDIRECT_CACHE_MAX_AGE', 3600))
+
+# Write-behind click counting: clicks are flushed every CLICK_FLUSH_INTERVAL seconds
+# or once CLICK_FLUSH_THRESHOLD are pending (whichever comes first)
+CLICK_BUFFER_ENABLED = os.getenv('CLICK_BUFFER_ENABLED', 'True').lower() == 'true'
+CLICK_FLUSH_INTERVAL = float(os.getenv('CLICK_FLUSH_INTERVAL', 1.0))
+CLICK_FLUSH_THRESHOLD = int(os.getenv('CLICK_FLUSH_THRESHOLD', 1000))
+
+# Click analytics: per-minute/hour/day rollups written by a background aggregator
+ANALYTICS_ENABLED = os.getenv('ANALYTICS_ENABLED', 'True').lower() == 'true'
+ANALYTICS_FLUSH_INTERVAL = float(os.getenv('ANALYTICS_FLUSH_INTERVAL', 5.0))
+ANALYTICS_MAX_QUEUE = int(os.getenv('ANALYTICS_MAX_QUEUE', 100000))  # events; oldest dropped beyond this
+# Rollup/breakdown rows held while flushes fail; beyond this events wait in (and drop from) the queue
+ANALYTICS_MAX_PENDING = int(os.getenv('ANALYTICS_MAX_PENDING', 100000))
+
+# Per-click event log (ClickEvent): workers append NDJSON segments under CLICK_LOG_DIR,
+# manage.py ingest_clicks loads them. Keep CLICK_LOG_STALE_SECONDS well above
+# CLICK_LOG_SEGMENT_SECONDS: older .active segments are taken as left by dead workers.
+CLICK_LOG_ENABLED = os.getenv('CLICK_LOG_ENABLED', 'False').lower() == 'true'
+CLICK_LOG_DIR = os.getenv('CLICK_LOG_DIR', str(BASE_DIR / 'var' / 'clicklog'))
+CLICK_LOG_FLUSH_INTERVAL = float(os.getenv('CLICK_LOG_FLUSH_INTERVAL', 1.0))
+CLICK_LOG_BUFFER_BYTES = int(os.getenv('CLICK_LOG_BUFFER_BYTES', 64 * 1024))
+CLICK_LOG_MAX_BUFFER_BYTES = int(os.getenv('CLICK_LOG_MAX_BUFFER_BYTES', 16 * 1024 * 1024))  # newer events dropped beyond this
+CLICK_LOG_SEGMENT_BYTES = int(os.getenv('CLICK_LOG_SEGMENT_BYTES', 64 * 1024 * 1024))
+CLICK_LOG_SEGMENT_SECONDS = float(os.getenv('CLICK_LOG_SEGMENT_SECONDS', 300))
+CLICK_LOG_STALE_SECONDS = float(os.getenv('CLICK_LOG_STALE_SECONDS', 3600))
+CLICK_LOG_COUNTRY_HEADER = os.getenv('CLICK_LOG_COUNTRY_HEADER', 'CF-IPCountry')
+
+# Trending links (GET /api/stats/trending): per-worker heavy-hitter sketches of
+# TRENDING_CAPACITY codes per window, top TRENDING_PUBLISH_SIZE published every
+# TRENDING_FLUSH_INTERVAL seconds
+TRENDING_ENABLED = os.getenv('TRENDING_ENABLED', 'True').lower() == 'true'
+TRENDING_CAPACITY = int(os.getenv('TRENDING_CAPACITY', 1000))
+TRENDING_PUBLISH_SIZE = int(os.getenv('TRENDING_PUBLISH_SIZE', 100))
+TRENDING_FLUSH_INTERVAL = float(os.getenv('TRENDING_FLUSH_INTERVAL', 10.0))
+TRENDING_CACHE_SECONDS = int(os.getenv('TRENDING_CACHE_SECONDS', 10))
+
+# Dashboard summary: top URL / 7-day count refresh and full totals resync (seconds)
+SUMMARY_REFRESH_INTERVAL = int(os.getenv('SUMMARY_REFRESH_INTERVAL', 60))
+SUMMARY_RESYNC_INTERVAL = int(os.getenv('SUMMARY_RESYNC_INTERVAL', 3600))
+
+# Token bucket rate limits ('<requests>/<s|m|h|d>[:<burst>]', empty disables a scope).
+# Shorten endpoints are keyed by user (or IP when anonymous), redirects by IP.
+# 'cache' shares buckets across workers through RATE_LIMIT_CACHE_ALIAS; 'local' is per process.
+RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'False').lower() == 'true'
+RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'cache')  # cache | local
+RATE_LIMIT_CACHE_ALIAS = os.getenv('RATE_LIMIT_CACHE_ALIAS', 'default')
+RATE_LIMITS = {
+    'shorten': os.getenv('RATE_LIMIT_SHORTEN', '60/m'),
+    'shorten_bulk': os.getenv('RATE_LIMIT_SHORTEN_BULK', '10/m'),
+    'redirect': os.getenv('RATE_LIMIT_REDIRECT', '600/m'),
+}
+RATE_LIMIT_MAX_KEYS = int(os.getenv('RATE_LIMIT_MAX_KEYS', 100000))  # tracked clients per scope and worker
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 0))  # proxies appending X-Forwarded-For
 
 # Create static directories
 for static_dir in STATICFILES_DIRS:
@@ -0,0 +1,32 @@
+# backend/urlshortener/settings_redirect.py
+"""
+Redirect-only deployment profile: serves GET /<short_code>/ plus /api/health
+and /api/metrics, without the admin, sessions, messages, static files, DRF or
+simplejwt.
+
+    DJANGO_SETTINGS_MODULE=urlshortener.settings_redirect gunicorn urlshortener.wsgi
+
+Database, caches, click buffering and replicas come from settings.py, so these
+workers run next to full ones behind a load balancer that sends /api/ and
+/admin/ to the full profile. `manage.py startup_report` compares the two.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'django.contrib.auth',  # URLModel.owner
+    'urls.apps.UrlsConfig',
+]
+
+MIDDLEWARE = [
+    'urls.middleware.MetricsMiddleware',
+    'urls.middleware.ReplicaPinningMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    # APPEND_SLASH: /abc123 -> /abc123/
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'urlshortener.urls_redirect'
+
+TEMPLATES = []
@@ -0,0 +1,25 @@
+# backend/urlshortener/settings_test.py
+"""
+Test suite profile (backend/pytest.ini): settings.py on a throwaway SQLite
+database, so the tests run without a PostgreSQL server.
+
+    pytest
+    TEST_POSTGRES=True pytest   # the configured PostgreSQL server instead
+
+The PostgreSQL run also covers the raw SQL paths (COPY import, side-connection
+code reservation) that are skipped on SQLite.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+if os.getenv('TEST_POSTGRES', 'False').lower() != 'true':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'backend' / 'test.sqlite3',  # the test database itself is in memory
+        }
+    }
+    DATABASE_REPLICAS = []
+
+# Fast hashing for the users tests create
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
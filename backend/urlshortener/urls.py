@@ -1,10 +1,21 @@
 # backend/urlshortener/urls.py
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from urls.views import RedirectView
+from urls.redirect_views import AsyncRedirectView, RedirectView, health_check_async
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include('urls.urls')),
-    path('<str:short_code>/', RedirectView.as_view(), name='redirect_url'),
 ]
+
+if settings.ASYNC_REDIRECTS:
+    urlpatterns += [
+        path('api/health', health_check_async, name='health_check'),
+        path('api/', include('urls.urls')),
+        path('<str:short_code>/', AsyncRedirectView.as_view(), name='redirect_url'),
+    ]
+else:
+    urlpatterns += [
+        path('api/', include('urls.urls')),
+        path('<str:short_code>/', RedirectView.as_view(), name='redirect_url'),
+    ]
@@ -0,0 +1,23 @@
+# backend/urlshortener/urls_redirect.py
+"""
+URLconf for the redirect-only profile (settings_redirect.py)
+"""
+
+from django.conf import settings
+from django.urls import path
+from urls.redirect_views import (
+    AsyncRedirectView, RedirectView, health_check_async, health_check_sync, metrics_view,
+)
+
+if settings.ASYNC_REDIRECTS:
+    urlpatterns = [
+        path('api/health', health_check_async, name='health_check'),
+        path('api/metrics', metrics_view, name='metrics'),
+        path('<str:short_code>/', AsyncRedirectView.as_view(), name='redirect_url'),
+    ]
+else:
+    urlpatterns = [
+        path('api/health', health_check_sync, name='health_check'),
+        path('api/metrics', metrics_view, name='metrics'),
+        path('<str:short_code>/', RedirectView.as_view(), name='redirect_url'),
+    ]
@@ -11,21 +11,81 @@
 CREATE TABLE IF NOT EXISTS urls (
     id BIGSERIAL PRIMARY KEY,
     original_url VARCHAR(2048) NOT NULL,
+    url_hash VARCHAR(64) NULL,  -- sha256 of original_url, used for dedupe
     short_code VARCHAR(10) NOT NULL UNIQUE,
     click_count INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP(6) WITH TIME ZONE NOT NULL,
     updated_at TIMESTAMP(6) WITH TIME ZONE NOT NULL,
     owner_id BIGINT REFERENCES auth_user(id) ON DELETE SET NULL,
+    redirect_status SMALLINT NOT NULL DEFAULT 302 CHECK (redirect_status >= 0),  -- 301/302/307/308
+    cache_max_age INTEGER NULL CHECK (cache_max_age >= 0),  -- NULL: REDIRECT_CACHE_MAX_AGE
+    track_clicks BOOLEAN NOT NULL DEFAULT TRUE,
+    expires_at TIMESTAMP(6) WITH TIME ZONE NULL,  -- NULL: never expires
+    max_clicks INTEGER NULL CHECK (max_clicks >= 0),  -- reaching it sets expires_at
     
     -- Indexes for better performance
-    CONSTRAINT urls_short_code_unique UNIQUE (short_code)
+    CONSTRAINT urls_short_code_unique UNIQUE (short_code),
+    CONSTRAINT urls_url_hash_uniq UNIQUE (url_hash)
 );
 
 -- Create indexes
 CREATE INDEX IF NOT EXISTS urls_short_code_idx ON urls(short_code);
-CREATE INDEX IF NOT EXISTS urls_created_at_idx ON urls(created_at);
+CREATE INDEX IF NOT EXISTS urls_created_id_idx ON urls(created_at, id);
 CREATE INDEX IF NOT EXISTS urls_click_count_idx ON urls(click_count);
-CREATE INDEX IF NOT EXISTS urls_owner_id_idx ON urls(owner_id);
+CREATE INDEX IF NOT EXISTS urls_owner_created_idx ON urls(owner_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS urls_expires_at_idx ON urls(expires_at) WHERE expires_at IS NOT NULL;
+
+-- Per-owner link count and click total (GET /api/me/urls)
+CREATE TABLE IF NOT EXISTS owner_stats (
+    owner_id BIGINT PRIMARY KEY REFERENCES auth_user(id) ON DELETE CASCADE,
+    url_count BIGINT NOT NULL DEFAULT 0,
+    total_clicks BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP(6) WITH TIME ZONE NOT NULL
+);
+
+-- Dashboard link/click totals shared by every worker (single row)
+CREATE TABLE IF NOT EXISTS summary_totals (
+    id BIGSERIAL PRIMARY KEY,
+    total_urls BIGINT NOT NULL DEFAULT 0,
+    total_clicks BIGINT NOT NULL DEFAULT 0,
+    resynced_at TIMESTAMP(6) WITH TIME ZONE NOT NULL
+);
+
+-- Codes of purged expired links waiting to be reused (SHORT_CODE_RECYCLE)
+CREATE TABLE IF NOT EXISTS recycled_codes (
+    short_code VARCHAR(10) PRIMARY KEY,
+    released_at TIMESTAMP(6) WITH TIME ZONE NOT NULL
+);
+CREATE INDEX IF NOT EXISTS recycled_codes_released_at_idx ON recycled_codes(released_at);
+
+-- Per-click events loaded from the click event log (manage.py ingest_clicks)
+CREATE TABLE IF NOT EXISTS click_events (
+    id BIGSERIAL PRIMARY KEY,
+    short_code VARCHAR(10) NOT NULL,
+    clicked_at TIMESTAMP(6) WITH TIME ZONE NOT NULL,
+    referrer TEXT NOT NULL,
+    country VARCHAR(2) NOT NULL,  -- from CLICK_LOG_COUNTRY_HEADER, '' if absent
+    user_agent TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS click_events_code_time_idx ON click_events(short_code, clicked_at);
+
+-- Bytes of each log segment already loaded
+CREATE TABLE IF NOT EXISTS click_log_offsets (
+    segment VARCHAR(255) PRIMARY KEY,
+    "offset" BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP(6) WITH TIME ZONE NOT NULL
+);
+
+-- Per-worker trending counts: top codes of each window slot, overwritten every flush
+CREATE TABLE IF NOT EXISTS trending_counts (
+    id BIGSERIAL PRIMARY KEY,
+    period VARCHAR(4) NOT NULL,  -- '5m', '1h' or '24h'
+    slot TIMESTAMP(6) WITH TIME ZONE NOT NULL,
+    worker VARCHAR(64) NOT NULL,  -- <host>-<pid>
+    short_code VARCHAR(10) NOT NULL,
+    clicks BIGINT NOT NULL,
+    CONSTRAINT trending_counts_uniq UNIQUE (period, slot, worker, short_code)
+);
 
 -- Sample data for testing (optional)
 INSERT INTO urls (original_url, short_code, click_count, created_at, updated_at) VALUES 
@@ -3,6 +3,9 @@ import { AuthTokens, ShortenResponse, URLStats, User } from "./types";
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "/api";
 
+// Largest page /api/stats serves
+const STATS_PAGE_SIZE = 1000;
+
 const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
@@ -59,9 +62,18 @@ export const apiService = {
     };
   },
 
+  // /stats is cursor-paginated: follow X-Next-Cursor until the last page
   async getStats(): Promise<URLStats[]> {
-    const { data } = await api.get("/stats");
-    return data;
+    const stats: URLStats[] = [];
+    let cursor: string | undefined;
+    do {
+      const { data, headers } = await api.get("/stats", {
+        params: { limit: STATS_PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+      });
+      stats.push(...data);
+      cursor = headers["x-next-cursor"];
+    } while (cursor);
+    return stats;
   },
 
   async deleteUrl(shortCode: string): Promise<void> {
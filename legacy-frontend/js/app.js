@@ -251,15 +251,23 @@ class URLShortener {
     try {
       this.showStatsLoading(true);
 
-      const resp = await fetch(
-        `${this.API_BASE_URL.replace(/\/+$/, "")}/stats`
-      );
-
-      if (!resp.ok) {
-        throw new Error("Failed to fetch stats");
-      }
+      // /stats is cursor-paginated: follow X-Next-Cursor until the last page
+      const data = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ limit: "1000" });
+        if (cursor) params.set("cursor", cursor);
+        const resp = await fetch(
+          `${this.API_BASE_URL.replace(/\/+$/, "")}/stats?${params}`
+        );
+
+        if (!resp.ok) {
+          throw new Error("Failed to fetch stats");
+        }
 
-      const data = await resp.json();
+        data.push(...(await resp.json()));
+        cursor = resp.headers.get("X-Next-Cursor");
+      } while (cursor);
 
       if (data && data.length > 0) {
         this.displayStatistics(data);